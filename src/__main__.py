@@ -22,6 +22,7 @@ import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "1"
 
 # STL-IMPORTS
+import multiprocessing
 import sys
 
 # LOCAL-IMPORT
@@ -29,4 +30,6 @@ from app import App
 
 # PYTHON-MAIN
 if __name__ == "__main__":
+  # the render-process is spawned from the frozen exe as well
+  multiprocessing.freeze_support()
   App.main(sys.argv)
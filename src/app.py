@@ -17,7 +17,12 @@
 ################################################################################
 
 # LIBRARY IMPORT
-from typing import Any, Dict
+import argparse
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+import sys
+from time import perf_counter
+from typing import Any, Dict, Union
 import yaml
 import pygame as pg
 
@@ -26,11 +31,22 @@ from pyadditions.sys import EXIT_FAILURE, errorExit, fileExists
 from pyadditions.types import SingletonMeta
 from pyadditions.io import IOM, createIOManagerConfigFromDict
 import assets
-from constants import WINDOW_DIMENSIONS, WINDOW_TITLE, SCREEN_BACKGROUND_COLOR, CONFIGPATH, MAXFPS
+from constants import WINDOW_DIMENSIONS, WINDOW_TITLE, SCREEN_BACKGROUND_COLOR, CONFIGPATH, MAXFPS, IDLE_TIMEOUT, IDLE_WAIT, PYGAME_USEREVENT, GAME_UPDATE_EVENT, LAYER_CACHE_FOLDER, DEBUG_REFRESH_RATE, HEADLESS_WAIT, DASHBOARD_FPS
+from events import UpdateNotifier
+from view.dirty import UIDirtyTracker, mergeRects
+from view.headless import HeadlessScene, TerminalScene
+from view.layercache import LayerCache
 from view.menu import ClickButtonMenu
-from view.overlay import FPSOverlay
+from view.overlay import FPSOverlay, FrameTimeOverlay
+from view.quality import QualityGovernor
 from view.scene import SceneManager
 from view.window import DebugWindow, DebugInformationDict
+from command import CommandQueue
+from dashboard import DashboardScene, parsePorts
+from export import loadRequests, Recording, ReplayExporter
+from game import LevelManager
+from pacing import VirtualClock
+from remote import LevelMirror, RemoteScene, SessionPublisher, SharedLevelState, Simulation, getSessionName
 from server import ServerThread, SocketAddr
 
 
@@ -46,17 +62,279 @@ class App():
     @return       None
     """
     conf = Configurator()
+    if len(args) > 1 and args[1] == "export":
+      IOM.load(conf.iomConf)
+      App.export(conf, args[2:])
+      return
+    if len(args) > 1 and args[1] == "dashboard":
+      IOM.load(conf.iomConf)
+      App.dashboard(conf, args[2:])
+      return
     if conf.socketAddr.isBound():
       errorExit(f"SocketAddr {conf.socketAddr} is already taken", EXIT_FAILURE)
 
     IOM.load(conf.iomConf)
-    debugInformationDict = DebugInformationDict()
+    LevelManager().turbo = conf.turbo
+    if conf.virtualTime:
+      CommandQueue().setClock(VirtualClock())
+    if conf.renderer != "window":
+      App.serve(conf)
+      return
+    if conf.renderProcess:
+      App.simulate(conf)
+      return
 
     pg.init()
     IOM.debug("INITIALIZED pygame")
 
     serverThread = ServerThread(conf.socketProto, conf.socketAddr.port)
     serverThread.start()
+    publisher = App.createPublisher(conf)
+    App.gameloop(conf, CommandQueue(), publisher)
+    if publisher is not None:
+      publisher.close()
+    serverThread.join(0.1)
+
+  @staticmethod
+  def serve(conf: "Configurator") -> None:
+    """
+    Runs the server without a window (e.g. on machines without a display). The
+    Level is headless and rendered by a TerminalScene into the terminal or not
+    at all. Runs till it is interrupted (CTRL+C).
+
+    @param  conf  configuration of the app
+    """
+    # fonts of the WelcomeScene, no window is opened
+    pg.font.init()
+    LevelManager().headless = True
+
+    serverThread = ServerThread(conf.socketProto, conf.socketAddr.port)
+    serverThread.start()
+    if conf.renderer == "terminal":
+      scene = TerminalScene(sys.stdout, conf.headlessSpeed)
+    else:
+      scene = HeadlessScene(conf.headlessSpeed)
+    SceneManager().setGameScene(scene)
+
+    commandQueue = CommandQueue()
+    publisher = App.createPublisher(conf)
+    try:
+      while True:
+        commandQueue.waitAndProcess(HEADLESS_WAIT)
+        SceneManager().getScene().update()
+        if publisher is not None:
+          publisher.update()
+    except KeyboardInterrupt:
+      pass
+    finally:
+      scene.dispose()
+      if publisher is not None:
+        publisher.close()
+    IOM.debug("EXIT headless loop")
+    serverThread.join(0.1)
+
+  @staticmethod
+  def export(conf: "Configurator", args: list) -> None:
+    """
+    Exports the replay of recorded requests as frames without opening a window
+    or the server (see README, 2.5. Exporting Replays).
+
+    @param  conf  configuration of the app
+    @param  args  arguments from the commandline after 'export'
+    """
+    parser = argparse.ArgumentParser(
+        prog="karel_pbe export",
+        description="Simulates recorded requests on a map and exports a frame "
+        "after every Karel-Action."
+    )
+    parser.add_argument("map", help="name of the map to load first")
+    parser.add_argument(
+        "requests", help="file with a JSON-list of requests or one per line"
+    )
+    parser.add_argument(
+        "output", help="folder of the PNG-images or file of the RGB-stream"
+    )
+    parser.add_argument("--format", choices=("png", "rgb"), default="png")
+    parser.add_argument(
+        "--size", default="640x480", help="size of a frame as WIDTHxHEIGHT"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=mp.cpu_count(),
+        help="number of worker-processes"
+    )
+    options = parser.parse_args(args)
+
+    try:
+      size = tuple(int(value) for value in options.size.split("x"))
+      if len(size) != 2 or min(size) <= 0:
+        raise ValueError(options.size)
+      requests = loadRequests(options.requests)
+    except (OSError, ValueError) as err:
+      errorExit(f"could not read export-arguments: {err}", EXIT_FAILURE)
+
+    # fonts of the WelcomeScene, no window is opened
+    pg.font.init()
+    start = perf_counter()
+    try:
+      recording = Recording.record(options.map, requests)
+    except (KeyError, TypeError) as err:
+      errorExit(f"invalid request, missing or unknown {err}", EXIT_FAILURE)
+    if len(recording.frames) == 0:
+      errorExit(f"map '{options.map}' could not be loaded", EXIT_FAILURE)
+    exporter = ReplayExporter(
+        recording, options.output, options.format, size, options.workers,
+        conf.iomConf
+    )
+    frames = exporter.run()
+    IOM.out(
+        f"exported {frames} frames to '{options.output}' in "
+        f"{perf_counter() - start:.2f}s"
+    )
+
+  @staticmethod
+  def dashboard(conf: "Configurator", args: list) -> None:
+    """
+    Opens the dashboard, that shows the published sessions of other processes
+    in one window (see README, 2.6. Dashboard). Runs till the window is
+    closed.
+
+    @param  conf  configuration of the app
+    @param  args  arguments from the commandline after 'dashboard'
+    """
+    parser = argparse.ArgumentParser(
+        prog="karel_pbe dashboard",
+        description="Shows the sessions, that are published with "
+        "'publish_session: true', in one window."
+    )
+    parser.add_argument(
+        "ports",
+        nargs="+",
+        help="ports of the sessions, ranges as FIRST-LAST (e.g. 14480-14509)"
+    )
+    options = parser.parse_args(args)
+    try:
+      ports = parsePorts(options.ports)
+    except ValueError as err:
+      errorExit(str(err), EXIT_FAILURE)
+
+    pg.init()
+    screen = pg.display.set_mode(tuple(WINDOW_DIMENSIONS), pg.DOUBLEBUF)
+    pg.display.set_caption(f"{WINDOW_TITLE} - Dashboard")
+    IOM.debug(f"created dashboard for {len(ports)} sessions")
+    scene = DashboardScene(ports, screen.get_size())
+    clock = pg.time.Clock()
+
+    running = True
+    while running:
+      for event in pg.event.get():
+        if event.type == pg.QUIT:
+          running = False
+        scene.proccessEvent(event)
+      clock.tick(DASHBOARD_FPS)
+
+      scene.update()
+      dirtyRects = scene.getDirtyRects()
+      for rect in dirtyRects:
+        screen.set_clip(rect)
+        screen.fill(SCREEN_BACKGROUND_COLOR)
+        scene.render(screen)
+      screen.set_clip(None)
+      if dirtyRects:
+        pg.display.update(dirtyRects)
+    scene.dispose()
+    IOM.debug("EXIT dashboard")
+
+  @staticmethod
+  def simulate(conf: "Configurator") -> None:
+    """
+    Runs the simulation-process: the server and the Level run headless in this
+    process, the window is rendered by a spawned render-process, which reads
+    the state of the Level from shared memory.
+
+    @param  conf  configuration of the app
+    """
+    context = mp.get_context("spawn")
+    if conf.publishSession:
+      # the dashboard reads the same state as the render-process
+      shared = SharedLevelState(getSessionName(conf.socketAddr.port), True)
+    else:
+      shared = SharedLevelState()
+    (conn, childConn) = context.Pipe()
+    renderProcess = context.Process(
+        target=App.render,
+        args=(shared.name, childConn),
+        name="render",
+        daemon=True
+    )
+    renderProcess.start()
+    childConn.close()
+    IOM.debug(f"started render-process {renderProcess.pid}")
+
+    # fonts of the WelcomeScene, no window is opened in this process
+    pg.init()
+    LevelManager().headless = True
+    SceneManager().setGameScene(RemoteScene(conn))
+
+    serverThread = ServerThread(conf.socketProto, conf.socketAddr.port)
+    serverThread.start()
+    Simulation(shared, conn).run(renderProcess)
+
+    IOM.debug("EXIT simulation")
+    shared.close()
+    serverThread.join(0.1)
+
+  @staticmethod
+  def render(stateName: str, conn: Connection) -> None:
+    """
+    Runs the render-process, which mirrors the Level of the simulation-process
+    (see App.simulate).
+
+    @param  stateName   name of the SharedLevelState
+    @param  conn        connection to the simulation-process
+    """
+    conf = Configurator()
+    IOM.load(conf.iomConf)
+    LevelManager().turbo = conf.turbo
+    pg.init()
+    IOM.debug("INITIALIZED pygame")
+
+    mirror = LevelMirror(SharedLevelState(stateName), conn)
+    App.gameloop(conf, mirror)
+    mirror.close()
+
+  @staticmethod
+  def createPublisher(conf: "Configurator") -> Union[SessionPublisher, None]:
+    """
+    Creates the SessionPublisher of this process, if sessions are published.
+
+    @param  conf  configuration of the app
+    @return       SessionPublisher or None
+    """
+    if not conf.publishSession:
+      return None
+    return SessionPublisher(conf.socketAddr.port)
+
+  @staticmethod
+  def gameloop(
+      conf: "Configurator",
+      commandQueue: Union[CommandQueue, LevelMirror],
+      publisher: SessionPublisher = None
+  ) -> None:
+    """
+    Opens the window and runs the gameloop till it is closed.
+
+    @param  conf          configuration of the app
+    @param  commandQueue  source of the changes of the Level: the CommandQueue
+                          or a LevelMirror in the render-process
+    @param  publisher     publishes the Level for the dashboard, None if the
+                          session is not published
+    """
+    LayerCache().setFolder(conf.layerCache)
+    governor = QualityGovernor()
+    governor.configure(conf.adaptiveQuality, conf.maxfps)
+    debugInformationDict = DebugInformationDict()
 
     screen = pg.display.set_mode(tuple(WINDOW_DIMENSIONS), pg.DOUBLEBUF)
     pg.display.set_caption(WINDOW_TITLE)
@@ -67,65 +345,137 @@ class App():
     background.fill(SCREEN_BACKGROUND_COLOR)
 
     menuManager = assets.load.uimanager("theme/ClickButtonMenu.json")
-    dWindow = DebugWindow(menuManager, True)
+    menuTracker = UIDirtyTracker(menuManager)
+    dWindow = DebugWindow(menuManager, True, conf.debugRefreshRate)
     dWindow.loadView("view/DebugWindow_default.xml")
     rmenu = ClickButtonMenu(menuManager, "view/ClickButtonMenu.xml")
 
     fpsoverlay = FPSOverlay(visible=False)
+    frameoverlay = FrameTimeOverlay(conf.maxfps, visible=False)
+    frameStats = frameoverlay.stats
 
     gameloop = True
     clock = pg.time.Clock()
+    lastScene = None
+    lastInput = pg.time.get_ticks()
 
     # ----------------------------------------------------------------------------------------
     #                                  GAMELOOP START
     # ----------------------------------------------------------------------------------------
 
     while (gameloop):
+      # idle-mode: block till an event arrives or the next command can be
+      # applied, if there was no recent input and no debugging-tool is visible
+      commandWait = commandQueue.getWaitTime()
+      idle = conf.idleMode and not fpsoverlay.visible \
+        and not frameoverlay.visible and not dWindow.visible \
+        and pg.time.get_ticks() - lastInput > IDLE_TIMEOUT and commandWait != 0
+      if idle:
+        timeout = IDLE_WAIT
+        if commandWait is not None:
+          timeout = max(1, min(IDLE_WAIT, int(commandWait * 1000)))
+        events = [pg.event.wait(timeout)] + pg.event.get()
+      else:
+        events = pg.event.get()
+
       # get local variables
       scene = SceneManager().getScene()
       frametime = clock.tick(conf.maxfps)
       fps = clock.get_fps()
+      workStart = perf_counter()
+      frameStats.begin()
 
       # Event-handling
-      for event in pg.event.get():
+      fullRedraw = scene is not lastScene
+      if fullRedraw and lastScene is not None:
+        lastScene.dispose()
+      lastScene = scene
+      for event in events:
+        if event.type == pg.NOEVENT:
+          continue
         if event.type == pg.QUIT:
           gameloop = False
           break
+        if event == GAME_UPDATE_EVENT:
+          UpdateNotifier().acknowledge()
+        elif event.type != PYGAME_USEREVENT:
+          lastInput = pg.time.get_ticks()
+        if event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+          fullRedraw = True
         menuManager.process_events(event)
         rmenu.process_event(event)
         fpsoverlay.proccessEvent(event)
+        frameoverlay.proccessEvent(event)
         scene.proccessEvent(event)
+      frameStats.mark("events")
 
       # Updating components
       menuManager.update(frametime / 1000.0)
       scene.update(time_delta=frametime / 1000.0)
       fpsoverlay.update(fps)
+      frameoverlay.update()
+      if publisher is not None:
+        publisher.update()
 
       if dWindow.visible:
-        debugInformationDict.update(FPS=int(fps), FRAMETIME=frametime)
+        debugInformationDict.update(
+            FPS=int(fps),
+            FRAMETIME=frametime,
+            RENDER_QUALITY=governor.quality.name
+        )
 
       # get button presses
       if rmenu.getListItem("fps").check_pressed():
         fpsoverlay.toggle()
+      if rmenu.getListItem("frametimes").check_pressed():
+        frameoverlay.toggle()
       if rmenu.getListItem("debugwin").check_pressed():
         dWindow.set_position(pg.mouse.get_pos())
         dWindow.toggle()
 
-      # redner components
-      screen.blit(background, (0, 0))
-      scene.render(screen)
-      menuManager.draw_ui(screen)
-      fpsoverlay.render(screen)
-
-      # update buffer
-      pg.display.flip()
+      frameStats.mark("update")
+
+      # collect changed regions of all components
+      dirtyRects = scene.getDirtyRects()
+      dirtyRects += menuTracker.getDirtyRects()
+      dirtyRects += fpsoverlay.getDirtyRects()
+      dirtyRects += frameoverlay.getDirtyRects()
+      if fullRedraw:
+        dirtyRects = [screen.get_rect()]
+      dirtyRects = mergeRects(dirtyRects)
+
+      # redner components, only inside the changed regions
+      for rect in dirtyRects:
+        screen.set_clip(rect)
+        screen.blit(background, (0, 0))
+        scene.render(screen)
+        menuManager.draw_ui(screen)
+        fpsoverlay.render(screen)
+        frameoverlay.render(screen)
+      screen.set_clip(None)
+      frameStats.mark("render")
+
+      # update changed regions of buffer
+      if dirtyRects:
+        pg.display.update(dirtyRects)
+      frameStats.mark("flip")
+
+      # adapt render-quality to the time spent on this frame
+      governor.measure((perf_counter() - workStart) * 1000)
+
+      # apply commands of the client, till the next frame is due, World is
+      # repainted once in scene.update, commands count as input for idle-mode
+      budget = 0
+      if conf.maxfps > 0:
+        budget = 1 / conf.maxfps - (perf_counter() - workStart)
+      if commandQueue.process(budget) > 0:
+        lastInput = pg.time.get_ticks()
 
     # ----------------------------------------------------------------------------------------
     #                                   GAMELOOP END
     # ----------------------------------------------------------------------------------------
 
     IOM.debug("EXIT gameloop")
-    serverThread.join(0.1)
 
 
 class Configurator(metaclass=SingletonMeta):
@@ -136,12 +486,34 @@ class Configurator(metaclass=SingletonMeta):
   @param  socketAddr    socket address as SocketAddr
   @param  iomConf       configuration for iomanager
   @param  maxfps        maxfps of game
+  @param  idleMode      gameloop blocks on events, if nothing happens
+  @param  adaptiveQuality   render-quality adapts to the frame-time budget
+  @param  renderer          'window', 'terminal' or 'none'
+  @param  headlessSpeed     Karel-Actions per second without a window, None
+                            keeps the speed of the map
+  @param  renderProcess     window is rendered by a separate process
+  @param  publishSession    Level is published for the dashboard
+  @param  turbo             Karel-Actions are not held back by the speed of
+                            the Level
+  @param  virtualTime       Karel-Actions are paced in virtual time
+  @param  layerCache    folder of the static layer cache, None if disabled
+  @param  debugRefreshRate  refreshes of the DebugWindow per second
   """
 
   socketProto: str
   socketAddr: SocketAddr
   iomConf: Dict[str, Any]
   maxfps: int
+  idleMode: bool
+  adaptiveQuality: bool
+  renderer: str
+  headlessSpeed: float
+  renderProcess: bool
+  publishSession: bool
+  turbo: bool
+  virtualTime: bool
+  layerCache: str
+  debugRefreshRate: float
 
   def __init__(self) -> None:
     filepath = CONFIGPATH + "yaml"
@@ -155,6 +527,41 @@ class Configurator(metaclass=SingletonMeta):
         # MAXFPS
         self.maxfps = int(conf.get("maxfps", MAXFPS))
 
+        # IDLE-MODE
+        self.idleMode = bool(conf.get("idle_mode", True))
+
+        # ADAPTIVE-QUALITY
+        self.adaptiveQuality = bool(conf.get("adaptive_quality", True))
+
+        # RENDERER
+        self.renderer = str(conf.get("renderer", "window"))
+        if self.renderer not in ("window", "terminal", "none"):
+          errorExit(f"unknown renderer '{self.renderer}'", EXIT_FAILURE)
+        headlessSpeed = conf.get("headless_speed", None)
+        self.headlessSpeed = None if headlessSpeed is None else float(
+            headlessSpeed
+        )
+
+        # RENDER-PROCESS
+        self.renderProcess = bool(conf.get("render_process", False))
+
+        # DASHBOARD
+        self.publishSession = bool(conf.get("publish_session", False))
+
+        # TURBO-MODE
+        self.turbo = bool(conf.get("turbo", False))
+
+        # VIRTUAL-TIME
+        self.virtualTime = bool(conf.get("virtual_time", False))
+
+        # DEBUG-WINDOW
+        self.debugRefreshRate = float(
+            conf.get("debug_refresh_rate", DEBUG_REFRESH_RATE)
+        )
+
+        # LAYER-CACHE
+        self.layerCache = conf.get("layer_cache", LAYER_CACHE_FOLDER)
+
         # IOM-Configuration
         iomConf = conf.get("iomanager", {})
         iomConf = createIOManagerConfigFromDict(iomConf)
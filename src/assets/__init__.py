@@ -19,3 +19,5 @@
 # LOCAL IMPORT
 from . import load
 from . import color
+from . import text
+from . import atlas
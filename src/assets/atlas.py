@@ -0,0 +1,189 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from typing import Dict, List
+
+# LIBRARY IMPORT
+import pygame as pg
+from pygame import Rect, Surface, SRCALPHA
+
+# LOCAL IMPORT
+from constants import BEEPER_CACHE_SIZE, GAME_FONT, TILE_CACHE_SIZE, TILE_SIZE
+from pyadditions.types import LRUCache, SingletonFactoryMeta
+from . import load, text
+from .color import HexColor
+
+# angles of walls, bit n of a wall-mask is the wall at WALL_ANGLES[n]
+WALL_ANGLES = (0.0, 90.0, 180.0, 270.0)
+
+
+def wallBit(angle: float) -> int:
+  """
+  Returns the bit of a wall-mask, that represents a wall at angle.
+
+  @param  angle   angle of the wall, relative to 0 at EAST
+  @return         bit of the wall in a wall-mask
+  """
+  return 1 << WALL_ANGLES.index(angle % 360)
+
+
+class SpriteAtlas(metaclass=SingletonFactoryMeta):
+  """
+  Holds all pre-rendered sprites of the game for one tile-size. There is one
+  atlas per tile-size, which can be accessed through 'SpriteAtlas(tileSize)'.
+  All returned surfaces are shared and MUST NOT be modified.
+
+  @extends  SingletonFactoryMeta
+
+  @param  tileSize  width and height of a tile in px
+  @param  _walls    tile-surfaces with all 16 wall-combinations, indexed by mask
+  @param  _karel    rotated Karel-surfaces, indexed by angle
+  @param  _beepers  beeper-overlays, cached by number of beepers
+  @param  _tiles    composited tile-surfaces, cached by wall-mask and beepers
+  """
+
+  tileSize: int
+  _walls: List[Surface]
+  _karel: Dict[float, Surface]
+  _beepers: LRUCache
+  _tiles: LRUCache
+
+  def __init__(self, tileSize: int) -> None:
+    self.tileSize = tileSize
+    self._beepers = LRUCache(BEEPER_CACHE_SIZE)
+    self._tiles = LRUCache(TILE_CACHE_SIZE)
+
+    tileSurf = self._loadScaled("64x/tile.png")
+    self._walls = [
+        self._buildWalls(tileSurf, mask) for mask in range(2**len(WALL_ANGLES))
+    ]
+
+    karelSurf = self._loadScaled("64x/karel.png")
+    self._karel = {
+        angle: pg.transform.rotate(karelSurf, angle) for angle in WALL_ANGLES
+    }
+
+  def _loadScaled(self, filepath: str) -> Surface:
+    """
+    Loads an image and scales it to the tile-size of the atlas.
+
+    @param  filepath  filepath to image in ASSETS_FOLDER
+    @return           scaled image
+    """
+    surf = load.image(filepath)
+    if surf.get_size() != (self.tileSize, self.tileSize):
+      surf = pg.transform.smoothscale(surf, (self.tileSize, self.tileSize))
+    return surf
+
+  def _buildWalls(self, tileSurf: Surface, mask: int) -> Surface:
+    """
+    Composites the walls of a wall-mask onto a copy of the tile-surface.
+
+    @param  tileSurf  surface of an empty tile
+    @param  mask      wall-mask
+    @return           composited tile-surface
+    """
+    surf = tileSurf.copy()
+    size = self.tileSize
+    width = max(1, round(size / TILE_SIZE))
+    wallRects = (
+        Rect(size - width, 0, width, size),  # EAST
+        Rect(0, 0, size, width),  # NORTH
+        Rect(0, 0, width, size),  # WEST
+        Rect(0, size - width, size, width)  # SOUTH
+    )
+    for bit, rect in enumerate(wallRects):
+      if mask & (1 << bit):
+        pg.draw.rect(surf, HexColor("#000000"), rect)
+    return surf
+
+  def _buildBeepers(self, n: int) -> Surface:
+    """
+    Creates a Beeper-overlay with a counter on top if more than one Beeper are
+    present.
+
+    @param  n   number of Beepers
+    @return     beeper-overlay
+    """
+    surf = Surface((self.tileSize, self.tileSize), SRCALPHA)
+    surf.blit(self._loadScaled("64x/beeper.png"), (0, 0))
+    if n > 1:
+      fontSize = max(1, round(14 * self.tileSize / TILE_SIZE))
+      numFont = load.font(GAME_FONT, fontSize)
+      numSurf = text.render(numFont, str(n), HexColor("#000000"))
+      numRect = numSurf.get_rect()
+      numRect.center = (self.tileSize / 2, self.tileSize / 2)
+      surf.blit(numSurf, numRect)
+    return surf
+
+  def walls(self, mask: int) -> Surface:
+    """
+    Returns the tile-surface with all walls of a wall-mask.
+
+    @param  mask  wall-mask
+    @return       tile-surface with walls
+    """
+    return self._walls[mask]
+
+  def beepers(self, n: int) -> Surface:
+    """
+    Returns the overlay for n Beepers. If n is 0 None will be returned.
+
+    @param  n   number of Beepers
+    @return     beeper-overlay or None
+    """
+    if n <= 0:
+      return None
+    return self._beepers.getOrCreate(n, lambda: self._buildBeepers(n))
+
+  def tile(self, mask: int, beepers: int) -> Surface:
+    """
+    Returns the surface of a tile with walls and beepers. Tiles with the same
+    visual state share the same surface.
+
+    @param  mask      wall-mask
+    @param  beepers   number of Beepers
+    @return           tile-surface
+    """
+    if beepers <= 0:
+      return self._walls[mask]
+    return self._tiles.getOrCreate(
+        (mask, beepers), lambda: self._buildTile(mask, beepers)
+    )
+
+  def _buildTile(self, mask: int, beepers: int) -> Surface:
+    """
+    Composites the beeper-overlay onto the tile-surface of a wall-mask.
+
+    @param  mask      wall-mask
+    @param  beepers   number of Beepers
+    @return           composited tile-surface
+    """
+    surf = self._walls[mask].copy()
+    surf.blit(self.beepers(beepers), (0, 0))
+    return surf
+
+  def karel(self, angle: float) -> Surface:
+    """
+    Returns the surface of Karel rotated by angle.
+
+    @param  angle   angle of Karel, relative to 0 at EAST
+    @return         rotated Karel-surface
+    """
+    return self._karel[angle % 360]
@@ -22,6 +22,7 @@ import sys
 from io import BytesIO
 from xml.etree import cElementTree as ElementTree
 from xml.etree.ElementTree import Element
+from typing import Dict
 
 # LIBRARY IMPORT
 import pygame
@@ -30,8 +31,13 @@ from pygame.font import Font
 from pygame_gui.ui_manager import UIManager
 
 # LOCAL IMPORT
-from constants import ASSETS_FOLDER, WINDOW_DIMENSIONS
+from constants import ASSETS_FOLDER, FONT_CACHE_SIZE, IMAGE_CACHE_SIZE, WINDOW_DIMENSIONS
 from pyadditions.sys import fileExists
+from pyadditions.types import CacheInfo, LRUCache
+
+# caches of already loaded and converted assets
+_imageCache = LRUCache(IMAGE_CACHE_SIZE)
+_fontCache = LRUCache(FONT_CACHE_SIZE)
 
 
 def _getResourcePath(relativePath: str) -> str:
@@ -50,15 +56,21 @@ def _getResourcePath(relativePath: str) -> str:
     return os.path.join(sys._MEIPASS, ASSETS_FOLDER, relativePath)
 
 
-def image(filepath: str) -> Surface:
+def image(filepath: str, copy: bool = False) -> Surface:
   """
-  Loads image from ASSETS_FOLDER.
+  Loads image from ASSETS_FOLDER. Images are cached after the first load, so the
+  returned surface is shared and MUST NOT be modified. If the caller wants to
+  draw onto the image, copy has to be set.
 
   @param  filepath  filepath to image in ASSETS_FOLDER
+  @param  copy      returns a private copy of the image, if set
   @return           pg.Surface of image
   """
-  filepath = _getResourcePath(filepath)
-  return pygame.image.load(filepath).convert_alpha()
+  surf = _imageCache.getOrCreate(
+      filepath,
+      lambda: pygame.image.load(_getResourcePath(filepath)).convert_alpha()
+  )
+  return surf.copy() if copy else surf
 
 
 def binaryImage(bin_: bytes) -> Surface:
@@ -73,14 +85,25 @@ def binaryImage(bin_: bytes) -> Surface:
 
 def font(filepath: str, size: int) -> Font:
   """
-  Loads font from assets.
+  Loads font from assets. Fonts are cached by filepath and size, so the returned
+  font is shared and its style MUST NOT be modified.
 
   @param  filepath  filepath to font in ASSETS_FOLDER
   @param  size      fontsize
   @return           pg.Font of font
   """
-  filepath = _getResourcePath(filepath)
-  return Font(filepath, size)
+  return _fontCache.getOrCreate(
+      (filepath, size), lambda: Font(_getResourcePath(filepath), size)
+  )
+
+
+def cacheInfo() -> Dict[str, CacheInfo]:
+  """
+  Returns the statistics of the asset-caches.
+
+  @return   dict of CacheInfo for 'image' and 'font'
+  """
+  return dict(image=_imageCache.info(), font=_fontCache.info())
 
 
 def _xmlnodeToTuple(node: Element) -> tuple:
@@ -0,0 +1,73 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from typing import Tuple
+
+# LIBRARY IMPORT
+from pygame import Surface
+from pygame.font import Font
+
+# LOCAL IMPORT
+from constants import TEXT_CACHE_SIZE
+from pyadditions.types import CacheInfo, LRUCache
+from .color import HexColor
+
+# shared cache of rendered text-surfaces and measured text-sizes
+_textCache = LRUCache(TEXT_CACHE_SIZE)
+
+
+def render(
+    font: Font, text: str, color: HexColor, antialias: bool = True
+) -> Surface:
+  """
+  Renders text with a font. Surfaces are cached by font (which includes its
+  size), color and text, so the returned surface is shared and MUST NOT be
+  modified.
+
+  @param  font        font to render with
+  @param  text        text to render
+  @param  color       color of the text
+  @param  antialias   True if the text should be antialiased
+  @return             rendered text
+  """
+  key = ("render", font, text, tuple(color), antialias)
+  return _textCache.getOrCreate(
+      key, lambda: font.render(text, antialias, color)
+  )
+
+
+def size(font: Font, text: str) -> Tuple[int, int]:
+  """
+  Measures the size of text, if it would be rendered with a font. Sizes are
+  cached by font and text.
+
+  @param  font  font to measure with
+  @param  text  text to measure
+  @return       size of text in px
+  """
+  return _textCache.getOrCreate(("size", font, text), lambda: font.size(text))
+
+
+def cacheInfo() -> CacheInfo:
+  """
+  Returns the statistics of the text-cache.
+
+  @return   CacheInfo of the text-cache
+  """
+  return _textCache.info()
@@ -18,13 +18,21 @@
 
 # STL-IMPORT
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Lock
+from time import perf_counter, sleep
 from typing import Any, Dict, NamedTuple
 
 # LOCAL-IMPORT
+from pyadditions.io import IOM
 from pyadditions.types import SingletonMeta, classname
-from game import ActionExecutionError, Level, LevelManager, LevelState
-from view.scene import GameScene, SceneManager
-from constants import WINDOW_DIMENSIONS
+from events import UpdateNotifier
+from game import ActionExecutionError, InvalidArgumentError, Level, LevelManager, LevelState, RenderMode
+from view.scene import SceneManager
+from view.snapshot import SnapshotRenderer
+from constants import COMMAND_FRAME_BUDGET, COMMAND_TURBO_BUDGET, INFINITY, WINDOW_DIMENSIONS
+from pacing import IClockInterface, PacingScheduler
 
 
 class CommandResult(NamedTuple):
@@ -47,11 +55,22 @@ class Command(ABC):
 
   @extends  abc.ABC
 
+  @param  WAITS_ON_RUNNING  True if command is only applied, while the Level is
+    running (Karel-Actions and -Questions)
+  @param  IS_ACTION         True if command is a Karel-Action, after which
+    following commands are held back according to the speed of the Level
+  @param  READS_SNAPSHOT    True if command only reads the published state of
+    the Level (see Level.getSnapshot), so it is executed right away by the
+    server-thread instead of waiting in the CommandQueue
   @param  id_   numeric id of command (set by frontend, for identification of
     reply)
   @param  args  dict of commands, somewhat like 'kwargs'
   """
 
+  WAITS_ON_RUNNING = False
+  IS_ACTION = False
+  READS_SNAPSHOT = False
+
   id_: int
   args: Dict[str, Any]
 
@@ -72,12 +91,10 @@ class Command(ABC):
   def pushErrorWindow(
       self, error: RuntimeError, problem: str, p_solution: str
   ) -> None:
-    scene = SceneManager().getScene()
-    if isinstance(scene, GameScene):
-      scene.showErrorWindow(
-          classname(error), f"<b>PROBLEM:</b><br/>{problem}<br/> <br/>"
-          f"<b>POSSIBLE SOLUTION:</b><br/>{p_solution}"
-      )
+    SceneManager().getScene().showErrorWindow(
+        classname(error), f"<b>PROBLEM:</b><br/>{problem}<br/> <br/>"
+        f"<b>POSSIBLE SOLUTION:</b><br/>{p_solution}"
+    )
 
 
 class KarelMoveCommand(Command):
@@ -88,12 +105,13 @@ class KarelMoveCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+  IS_ACTION = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       level.karelMove()
-      level.pause()
       return CommandResult(self.id_, None)
     except RuntimeError as err:
       if isinstance(err, ActionExecutionError):
@@ -113,12 +131,13 @@ class KarelTurnLeftCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+  IS_ACTION = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       level.karelTurnLeft()
-      level.pause()
       return CommandResult(self.id_, None)
     except RuntimeError as err:
       return CommandResult(self.id_, classname(err))
@@ -132,12 +151,13 @@ class KarelPickBeeperCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+  IS_ACTION = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       level.karelPickBeeper()
-      level.pause()
       return CommandResult(self.id_, None)
     except RuntimeError as err:
       if isinstance(err, ActionExecutionError):
@@ -160,12 +180,13 @@ class KarelPutBeeperCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+  IS_ACTION = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       level.karelPutBeeper()
-      level.pause()
       return CommandResult(self.id_, None)
     except RuntimeError as err:
       if isinstance(err, ActionExecutionError):
@@ -187,10 +208,11 @@ class KarelFrontIsClearCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelFrontIsClear()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -204,10 +226,11 @@ class KarelRightIsClearCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelRightIsClear()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -221,10 +244,11 @@ class KarelLeftIsClearCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelLeftIsClear()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -239,10 +263,11 @@ class KarelBeeperInBagCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelBeeperInBag()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -257,10 +282,11 @@ class KarelBeeperPresentCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelBeeperPresent()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -274,10 +300,11 @@ class KarelFacingNorthCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelFacingNorth()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -291,10 +318,11 @@ class KarelFacingEastCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelFacingEast()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -308,10 +336,11 @@ class KarelFacingSouthCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelFacingSouth()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -325,10 +354,11 @@ class KarelFacingWestCommand(Command):
   @extends  Command
   """
 
+  WAITS_ON_RUNNING = True
+
   def execute(self) -> CommandResult:
     try:
       level = LevelManager().getCurrentLevel()
-      level.waitOnRunning()
       result = level.karelFacingWest()
       return CommandResult(self.id_, result)
     except RuntimeError as err:
@@ -346,8 +376,9 @@ class GameLoadWorldCommand(Command):
   def execute(self) -> CommandResult:
     try:
       bounds = WINDOW_DIMENSIONS - (320, 20)
-      LevelManager().setCurrentLevel(Level(self.args["map"], bounds))
-      SceneManager().setScene(GameScene())
+      level = Level(self.args["map"], bounds, LevelManager().headless)
+      LevelManager().setCurrentLevel(level)
+      SceneManager().loadGameScene()
       return CommandResult(self.id_, None)
     except RuntimeError as err:
       return CommandResult(self.id_, classname(err))
@@ -366,6 +397,70 @@ class GameCloseCommand(Command):
     return CommandResult(self.id_, None)
 
 
+class GameSetRenderModeCommand(Command):
+  """
+  sets, when the Karel-Actions of the loaded World are rendered: 'everyStep',
+  'finalOnly' (only while the game is not running, e.g. after EOS) or 'none'.
+  Takes effect immediately, when rendering resumes the World is redrawn from
+  its current state.
+
+  @extends  Command
+  """
+
+  def execute(self) -> CommandResult:
+    try:
+      mode = RenderMode.fromStr(self.args["mode"])
+      LevelManager().getCurrentLevel().setRenderMode(mode)
+      return CommandResult(self.id_, None)
+    except RuntimeError as err:
+      return CommandResult(self.id_, classname(err))
+
+
+class GameSetTurboCommand(Command):
+  """
+  enables or disables the turbo-mode: Karel-Actions are applied as fast as
+  they arrive, without waiting for the speed of the World, and the window only
+  shows the latest state once per frame.
+
+  @extends  Command
+  """
+
+  def execute(self) -> CommandResult:
+    try:
+      enabled = self.args["enabled"]
+      if not isinstance(enabled, bool):
+        raise InvalidArgumentError(f"turbo {enabled!r}")
+      LevelManager().turbo = enabled
+      return CommandResult(self.id_, None)
+    except RuntimeError as err:
+      return CommandResult(self.id_, classname(err))
+
+
+class GameSnapshotCommand(Command):
+  """
+  returns the latest state of the loaded World as base64-encoded PNG-image,
+  that fits into the given width and height. Is answered by the server-thread
+  without waiting for queued Karel-Actions; images are cached, till the state
+  of the World changes.
+
+  @extends  Command
+  """
+
+  READS_SNAPSHOT = True
+
+  def execute(self) -> CommandResult:
+    try:
+      level = LevelManager().getCurrentLevel()
+      if level is None:
+        return CommandResult(self.id_, None)
+      image = SnapshotRenderer().getPNG(
+          level, self.args["width"], self.args["height"]
+      )
+      return CommandResult(self.id_, image)
+    except RuntimeError as err:
+      return CommandResult(self.id_, classname(err))
+
+
 class CommandFactory(metaclass=SingletonMeta):
   """
   Factory-class for commands.
@@ -390,6 +485,9 @@ class CommandFactory(metaclass=SingletonMeta):
       facingSouth=KarelFacingSouthCommand,
       facingWest=KarelFacingWestCommand,
       loadWorld=GameLoadWorldCommand,
+      setRenderMode=GameSetRenderModeCommand,
+      setTurbo=GameSetTurboCommand,
+      snapshot=GameSnapshotCommand,
       EOS=GameCloseCommand
   )
 
@@ -406,3 +504,235 @@ class CommandFactory(metaclass=SingletonMeta):
     @return               corresporing Command
     """
     return self.COMMAND_TABLE[functionName](id_, args)
+
+
+class _QueuedCommand(NamedTuple):
+  """
+  Command, that waits in the CommandQueue.
+
+  @extends  NamedTuple
+
+  @param  command   command to apply
+  @param  future    receives the CommandResult, after command was applied
+  """
+
+  command: Command
+  future: Future
+
+
+class CommandQueue(metaclass=SingletonMeta):
+  """
+  Queue of the commands received by the server-thread. The commands are
+  applied by the gameloop on the main-thread, so that only the main-thread
+  touches the Level and pygame-objects. Every frame the commands are applied
+  till the next frame is due, as far as the speed of the Level allows:
+  Karel-commands are paced by a PacingScheduler to speed Karel-Actions per
+  second. In turbo-mode (see LevelManager.turbo) nothing is held back and
+  commands are applied for at least COMMAND_TURBO_BUDGET s per frame. The World
+  is repainted once per frame, no matter how many commands were applied.
+  While the gameloop waits for the next command, the server-thread answers
+  Karel-Questions itself, as they only read the Level.
+
+  @extends  SingletonMeta
+
+  @param  _queue      commands, that were not looked at yet
+  @param  _head       next command to apply, None if _queue has to be polled
+  @param  _scheduler  paces the Karel-Actions
+  @param  _lock       lock for access from the server-thread
+  @param  _waiting    set, while the gameloop waits for the next command
+  @param  _answered   number of Karel-Questions answered by the server-thread
+  """
+
+  _queue: Queue
+  _head: _QueuedCommand
+  _scheduler: PacingScheduler
+  _lock: Lock
+  _waiting: bool
+  _answered: int
+
+  def __init__(self) -> None:
+    self._queue = Queue()
+    self._head = None
+    self._scheduler = PacingScheduler()
+    self._lock = Lock()
+    self._waiting = False
+    self._answered = 0
+
+  def setClock(self, clock: IClockInterface) -> None:
+    """
+    Replaces the clock of the pacing, e.g. with a VirtualClock to fast-forward
+    paced runs in tests. Has to be called from the main-thread.
+
+    @param  clock   new clock
+    """
+    self._scheduler.setClock(clock)
+
+  def submit(self, command: Command) -> CommandResult:
+    """
+    Queues a command and waits, till the gameloop has applied it. Is called by
+    the server-thread, which sends the result back to the client. Commands,
+    that only read the published state of the Level, are executed right away,
+    Karel-Questions if the gameloop waits for commands and they can be applied
+    now.
+
+    @param  command   command to apply
+    @return           result of command
+    """
+    if command.READS_SNAPSHOT:
+      return self._execute(command)
+    if command.WAITS_ON_RUNNING and not command.IS_ACTION:
+      with self._lock:
+        if self._waiting and self._getCommandWaitTime(command) == 0:
+          self._answered += 1
+          return self._execute(command)
+    future = Future()
+    self._queue.put(_QueuedCommand(command, future))
+    UpdateNotifier().notify()
+    return future.result()
+
+  def getWaitTime(self) -> float:
+    """
+    Returns the time, till the next command can be applied. Has to be called
+    from the main-thread.
+
+    @return   time in s, 0 if the next command can be applied now, None if
+              there is no command or it waits for the Level to be started
+    """
+    if self._head is None:
+      try:
+        self._head = self._queue.get_nowait()
+      except Empty:
+        return None
+    return self._getCommandWaitTime(self._head.command)
+
+  def waitAndProcess(self, timeout: float) -> int:
+    """
+    Applies the queued commands, that can be applied now, or blocks till the
+    next one can be applied, but at most for timeout s. Is used by loops
+    without pygame-events (see App.serve and remote.Simulation).
+
+    @param  timeout   maximum time to wait in s
+    @return           number of applied commands
+    """
+    wait = self.getWaitTime()
+    if wait == 0:
+      return self.process(timeout)
+    if wait is not None or self._head is not None:
+      sleep(timeout if wait is None else min(wait, timeout))
+      return 0
+    self._waitForCommand(timeout)
+    return 0
+
+  def process(self, budget: float) -> int:
+    """
+    Applies the queued commands, till budget s are over, and waits for new
+    ones in that time, as clients send their next command right after
+    receiving the result. Once a command was applied, the commands may take at
+    least COMMAND_FRAME_BUDGET s (COMMAND_TURBO_BUDGET s in turbo-mode), so
+    that they are not held back by frames, that need all their time for
+    rendering.
+
+    @param  budget  time in s, till the next frame is due
+    @return         number of applied commands, including the Karel-Questions
+                    answered by the server-thread meanwhile
+    """
+    start = perf_counter()
+    answered = self._answered
+    applied = 0
+    while True:
+      remaining = budget - (perf_counter() - start)
+      if self._head is None and remaining > 0 and \
+          not self._waitForCommand(remaining):
+        break
+      if self.getWaitTime() != 0:
+        break
+      (command, future) = self._head
+      self._head = None
+      future.set_result(self._apply(command))
+      applied += 1
+
+      if applied == 1:
+        minimum = COMMAND_TURBO_BUDGET if LevelManager().turbo else \
+            COMMAND_FRAME_BUDGET
+        budget = max(budget, minimum)
+      if perf_counter() - start >= budget:
+        break
+    return applied + self._answered - answered
+
+  def _waitForCommand(self, timeout: float) -> bool:
+    """
+    Waits for the next command. Meanwhile the server-thread may answer
+    Karel-Questions itself (see 'submit').
+
+    @param  timeout   maximum time to wait in s
+    @return           True if a command was received
+    """
+    with self._lock:
+      self._waiting = True
+    try:
+      self._head = self._queue.get(timeout=timeout)
+      return True
+    except Empty:
+      return False
+    finally:
+      with self._lock:
+        self._waiting = False
+
+  def _getCommandWaitTime(self, command: Command) -> float:
+    """
+    Returns the time, till a command can be applied.
+
+    @param  command   command to check
+    @return           time in s, 0 if command can be applied now, None if it
+                      waits for the Level to be started
+    """
+    if not command.WAITS_ON_RUNNING:
+      return 0
+
+    level = LevelManager().getCurrentLevel()
+    if level is not None and level.state == LevelState.INIT:
+      return None
+    self._scheduler.setRate(self._getRate(level))
+    return self._scheduler.getWaitTime()
+
+  def _execute(self, command: Command) -> CommandResult:
+    """
+    Executes a command. Errors, that are not part of the API, are logged and
+    returned as the result, so that they can not stop the calling thread.
+
+    @param  command   command to execute
+    @return           result of command
+    """
+    try:
+      return command.execute()
+    except Exception as err:
+      IOM.error(f"could not execute {classname(command)}: {err}")
+      return CommandResult(command.id_, classname(err))
+
+  def _apply(self, command: Command) -> CommandResult:
+    """
+    Executes a command on the main-thread. A Karel-Action takes a token of the
+    PacingScheduler, so that the following Karel-commands are held back.
+
+    @param  command   command to execute
+    @return           result of command
+    """
+    result = self._execute(command)
+    level = LevelManager().getCurrentLevel()
+    if command.IS_ACTION and level is not None and level.playable():
+      self._scheduler.setRate(self._getRate(level))
+      self._scheduler.consume()
+    return result
+
+  @staticmethod
+  def _getRate(level: Level) -> float:
+    """
+    Returns the rate, at which the Karel-Actions of a Level are paced.
+
+    @param  level   current Level
+    @return         Karel-Actions per second, INFINITY if they are not paced
+                    (turbo-mode)
+    """
+    if level is None or LevelManager().turbo:
+      return INFINITY
+    return level.speed
@@ -16,6 +16,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
 ################################################################################
 
+# STL IMPORT
+from os import cpu_count
+
 # LIBRARY IMPORT
 from pygame import USEREVENT
 from pygame.event import Event
@@ -36,9 +39,8 @@ UTF8 = "utf-8"
 # Events
 PYGAME_USEREVENT = USEREVENT + 1
 GAME_START_EVENT = Event(PYGAME_USEREVENT, attr1="game_start_event")
-GAME_CONTINUE_EVENT = Event(PYGAME_USEREVENT, attr1="game_continue_event")
-GAME_ERROR_EVENT = Event(PYGAME_USEREVENT, attr1="game_error_event")
 GAME_FINISHED_EVENT = Event(PYGAME_USEREVENT, attr1="game_finished_event")
+GAME_UPDATE_EVENT = Event(PYGAME_USEREVENT, attr1="game_update_event")
 
 # WINDOW GEOMETRY AND ANCHORS
 WINDOW_DIMENSIONS = Vector2f(1200, 850)
@@ -56,8 +58,83 @@ GAME_FONT = "font/FiraCode-Regular.ttf"
 # SCREEN PROPERTIES
 WINDOW_TITLE = "Karel the robot - Server (x64)"
 MAXFPS = 144
+IDLE_TIMEOUT = 1000  # ms without input, before gameloop goes idle
+IDLE_WAIT = 500  # ms the idle gameloop blocks at most for events
+DEBUG_REFRESH_RATE = 10  # refreshes of the DebugWindow per second
 SCREEN_BACKGROUND_COLOR = HexColor("#dddddd")
 
+# ASSET CACHING
+IMAGE_CACHE_SIZE = 64
+FONT_CACHE_SIZE = 16
+BEEPER_CACHE_SIZE = 128
+TILE_CACHE_SIZE = 256
+TEXT_CACHE_SIZE = 256
+
+# SPRITES
+TILE_SIZE = 64
+# tile-size below which tiles are rasterized as flat colored cells
+FLAT_TILE_SIZE = 4
+
+# RASTERIZATION
+RASTER_THREADS = min(4, cpu_count() or 1)
+# number of px of a region, from which on it is rasterized in parallel bands
+RASTER_BAND_MIN_PIXELS = 512 * 512
+
+# LAYER CACHE
+LAYER_CACHE_FOLDER = ".cache/layers"
+# number of px, up to which the static layer of a World will be cached
+LAYER_CACHE_MAX_PIXELS = 2048 * 2048
+
+# COMMAND QUEUE
+COMMAND_FRAME_BUDGET = 0.004  # min. s per frame, the gameloop applies commands
+COMMAND_TURBO_BUDGET = 0.012  # s per frame in turbo-mode
+
+# PACING
+PACING_MIN_RATE = 0.1  # Karel-Actions per second
+PACING_MAX_RATE = 10000.0  # Karel-Actions per second
+PACING_MAX_LAG = 0.05  # s held back actions catch up for (e.g. slow frame)
+
+# RENDER PROCESS
+REMOTE_POLL_INTERVAL = 0.01  # s a process waits at most for the other one
+REMOTE_MAPNAME_SIZE = 256  # bytes reserved for the mapname in shared memory
+
+# DASHBOARD
+SESSION_PREFIX = "karel_pbe_"  # shared memory of a session is named by port
+DASHBOARD_FPS = 30
+DASHBOARD_FRAME_BUDGET = 0.008  # s per frame, sessions are redrawn
+# s without changes, after which a session is attached again (e.g. restarted)
+DASHBOARD_ATTACH_INTERVAL = 2.0
+
+# HEADLESS
+HEADLESS_WAIT = 0.01  # s the headless loop waits at most for the next command
+TERMINAL_FPS = 30  # frames per second of the terminal renderer
+
+# SNAPSHOT
+SNAPSHOT_MAX_SIZE = 4096  # max. width and height of a snapshot in px
+SNAPSHOT_CACHE_SIZE = 8  # encoded images of the latest state by size
+
+# EXPORT
+EXPORT_CHUNK_FRAMES = 256  # max. frames a worker exports at once
+EXPORT_COMPRESSION = 1  # zlib-level of exported PNG-images
+
+# FRAME STATISTICS
+FRAME_HISTORY = 240  # frames kept for the frame-time overlay
+FRAME_OVERLAY_INTERVAL = 0.25  # s between two redraws of the frame-time overlay
+FRAME_GRAPH_HEIGHT = 48  # px of the frame-time graph, that show 2x the budget
+# frames longer than FRAME_JANK_RATIO x the frame-time budget count as jank
+FRAME_JANK_RATIO = 1.5
+
+# ADAPTIVE QUALITY
+QUALITY_SMOOTHING = 0.1  # weight of the last frame in the average work-time
+QUALITY_DEGRADE_DELAY = 0.5  # s over budget, before the quality is lowered
+QUALITY_RESTORE_DELAY = 2.0  # s with headroom, before the quality is raised
+# share of the frame-time budget, a higher quality-level may use
+QUALITY_RESTORE_RATIO = 0.7
+
+# CAMERA
+ZOOM_TILE_SIZES = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96, 128)
+MINIMAP_SIZE = 160
+
 # CONFIG
 ASSETS_FOLDER = "assets"
 CONFIGPATH = "assets/pbe."
@@ -0,0 +1,282 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from math import ceil, sqrt
+from time import perf_counter
+from typing import Any, List, Tuple, Union
+
+# LIBRARY IMPORT
+import pygame as pg
+from pygame import Rect, Surface
+from pygame.event import Event
+from pygame.font import Font
+
+# LOCAL IMPORT
+from pyadditions.types import LRUCache
+import assets
+from assets.color import Basics
+from constants import DASHBOARD_ATTACH_INTERVAL, DASHBOARD_FRAME_BUDGET, GAME_FONT, WINDOW_DIMENSIONS
+from view.scene import ISceneInterface
+from view.snapshot import SnapshotRenderer
+from game import KarelOrientation, Level, LevelSnapshot, LevelState
+from remote import RemoteLevelState, SharedLevelState, getSessionName
+
+# Levels of the maps of the sessions by mapname, only their walls are used
+_levelCache = LRUCache(16)
+
+# px between two sessions
+_GAP = 2
+
+
+def parsePorts(values: List[str]) -> List[int]:
+  """
+  Parses ports from the commandline, either single ports or ranges.
+
+  @param  values  ports (e.g. '14480') or ranges (e.g. '14480-14509')
+  @return         list of ports
+  """
+  ports = []
+  for value in values:
+    (first, _, last) = value.partition("-")
+    ports += range(int(first), int(last or first) + 1)
+  if not ports or not all(0 < port < 65536 for port in ports):
+    raise ValueError(f"invalid ports {' '.join(values)}")
+  return ports
+
+
+class SessionView():
+  """
+  Cell of the DashboardScene, that shows the Level of a session (see
+  remote.SessionPublisher). The session is polled by its sequence, so the
+  cell is only redrawn, if the session changed. A session, that did not change
+  for DASHBOARD_ATTACH_INTERVAL s, is attached again, so that sessions, which
+  were started or restarted after the dashboard, are found.
+
+  @param  port          port of the server of the session
+  @param  rect          region of the cell on the screen
+  @param  surf          rendered cell
+  @param  dirty         True if the cell has to be redrawn
+  @param  drawnAt       time (perf_counter) of the last redraw
+  @param  _shared       state of the session, None if it is not running
+  @param  _seq          sequence of the drawn state, None if it was offline
+  @param  _changedAt    time (perf_counter) of the last change
+  @param  _attachedAt   time (perf_counter) of the last attach
+  """
+
+  port: int
+  rect: Rect
+  surf: Surface
+  dirty: bool
+  drawnAt: float
+  _shared: SharedLevelState
+  _seq: int
+  _changedAt: float
+  _attachedAt: float
+
+  def __init__(self, port: int, rect: Rect) -> None:
+    self.port = port
+    self.rect = rect
+    self.surf = Surface(rect.size)
+    self.dirty = True
+    self.drawnAt = 0.0
+    self._shared = None
+    self._seq = None
+    self._changedAt = 0.0
+    self._attachedAt = 0.0
+
+  def poll(self, now: float) -> None:
+    """
+    Marks the cell dirty, if the session changed since the last redraw.
+
+    @param  now   current time (perf_counter)
+    """
+    if now - max(self._changedAt, self._attachedAt) >= \
+        DASHBOARD_ATTACH_INTERVAL:
+      self._attach(now)
+    seq = None if self._shared is None else self._shared.getSequence()
+    if seq != self._seq:
+      self.dirty = True
+      self._changedAt = now
+
+  def _attach(self, now: float) -> None:
+    """
+    Attaches to the shared memory of the session again.
+
+    @param  now   current time (perf_counter)
+    """
+    self._attachedAt = now
+    try:
+      shared = SharedLevelState(getSessionName(self.port), track=False)
+    except FileNotFoundError:
+      shared = None
+    if self._shared is not None:
+      self._shared.close()
+    self._shared = shared
+
+  def redraw(self, font: Font) -> None:
+    """
+    Renders the latest state of the session into the cell.
+
+    @param  font  font of the label
+    """
+    (seq, state) = (None, None)
+    if self._shared is not None:
+      seq = self._shared.getSequence()
+      state = self._shared.read()
+    (self._seq, self.dirty, self.drawnAt) = (seq, False, perf_counter())
+
+    self.surf.fill(Basics.WHITE)
+    if state is None:
+      label = f"{self.port}  offline" if seq is None else \
+          f"{self.port}  no map loaded"
+    else:
+      label = f"{self.port}  {state.mapname}  {LevelState.toStr(state.state)}"
+    color = Basics.RED if state and state.state == LevelState.ERROR else \
+        Basics.BLACK
+    text = assets.text.render(font, label, color)
+    self.surf.blit(text, (_GAP, 0))
+    if state is None:
+      return
+
+    area = Rect(0, text.get_height(), *self.rect.size)
+    area.height -= text.get_height()
+    image = self._renderLevel(state, area.size)
+    if image is None:
+      text = assets.text.render(font, "map not found", Basics.RED)
+      self.surf.blit(text, text.get_rect(center=area.center))
+    else:
+      self.surf.blit(image, image.get_rect(center=area.center))
+
+  @staticmethod
+  def _renderLevel(state: RemoteLevelState,
+                   size: Tuple[int, int]) -> Union[Surface, None]:
+    """
+    Renders the state of a session with the walls of its map.
+
+    @param  state   state of the session
+    @param  size    maximum size of the image in px
+    @return         image, None if the map could not be loaded
+    """
+    try:
+      level = _levelCache.getOrCreate(
+          state.mapname, lambda: Level(state.mapname, WINDOW_DIMENSIONS, True)
+      )
+    except RuntimeError:
+      return None
+    if level.world.walls.shape != state.beepers.shape:
+      return None
+
+    snapshot = LevelSnapshot(
+        state.version, state.karelPosition,
+        KarelOrientation.fromAngle(state.karelOrientation),
+        state.karelBeeperbag, state.beepers
+    )
+    codes = SnapshotRenderer().render(level, snapshot, *size)
+    return pg.surfarray.make_surface(
+        SnapshotRenderer.PALETTE.take(codes, axis=0)
+    )
+
+  def close(self) -> None:
+    """Detaches from the session."""
+    if self._shared is not None:
+      self._shared.close()
+      self._shared = None
+
+
+class DashboardScene(ISceneInterface):
+  """
+  Shows the Levels of many sessions in a grid of cells at reduced scale (see
+  App.dashboard). Every frame only the cells of changed sessions are redrawn,
+  the ones, that waited the longest, first, till DASHBOARD_FRAME_BUDGET s are
+  spent. The rest follows in the next frames, so the frame-time does not grow
+  with the number of sessions.
+
+  @extends  ISceneInterface
+
+  @param  views         cells of the sessions
+  @param  _bounds       region of the screen
+  @param  _font         font of the labels
+  @param  _dirtyRects   regions of the screen, that changed since the last
+                        call of getDirtyRects, None if the whole screen did
+  """
+
+  views: List[SessionView]
+  _bounds: Rect
+  _font: Font
+  _dirtyRects: List[Rect]
+
+  def __init__(self, ports: List[int], size: Tuple[int, int]) -> None:
+    """
+    constructor
+
+    @param  ports   ports of the sessions
+    @param  size    size of the screen in px
+    """
+    (width, height) = size
+    columns = max(1, min(len(ports), round(sqrt(len(ports) * width / height))))
+    rows = ceil(len(ports) / columns)
+    (cellWidth, cellHeight) = (width // columns, height // rows)
+    cell = Rect(_GAP, _GAP, cellWidth - 2*_GAP, cellHeight - 2*_GAP)
+    self.views = [
+        SessionView(
+            port,
+            cell.move(
+                (index%columns) * cellWidth, (index//columns) * cellHeight
+            )
+        ) for (index, port) in enumerate(ports)
+    ]
+    self._bounds = Rect((0, 0), size)
+    self._font = assets.load.font(GAME_FONT, 14)
+    self._dirtyRects = None
+
+  def update(self, **kwargs) -> Union[Any, None]:
+    start = perf_counter()
+    for view in self.views:
+      view.poll(start)
+
+    dirty = sorted(
+        (view for view in self.views if view.dirty),
+        key=lambda view: view.drawnAt
+    )
+    for view in dirty:
+      if perf_counter() - start >= DASHBOARD_FRAME_BUDGET:
+        break
+      view.redraw(self._font)
+      if self._dirtyRects is not None:
+        self._dirtyRects.append(view.rect.copy())
+
+  def render(self, screen: Surface) -> None:
+    clip = screen.get_clip()
+    for view in self.views:
+      if view.rect.colliderect(clip):
+        screen.blit(view.surf, view.rect)
+
+  def proccessEvent(self, event: Event) -> Union[Any, None]:
+    pass
+
+  def getDirtyRects(self) -> List[Rect]:
+    if self._dirtyRects is None:
+      self._dirtyRects = []
+      return [self._bounds.copy()]
+    (dirtyRects, self._dirtyRects) = (self._dirtyRects, [])
+    return dirtyRects
+
+  def dispose(self) -> None:
+    for view in self.views:
+      view.close()
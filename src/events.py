@@ -0,0 +1,54 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+import threading
+
+# LIBRARY IMPORT
+import pygame as pg
+
+# LOCAL IMPORT
+from pyadditions.types import SingletonMeta
+from constants import GAME_UPDATE_EVENT
+
+
+class UpdateNotifier(metaclass=SingletonMeta):
+  """
+  Wakes up the gameloop, if it is idling, by posting GAME_UPDATE_EVENT. Multiple
+  notifications will be coalesced into one event, till the gameloop has
+  acknowledged it.
+
+  @extends  SingletonMeta
+
+  @param  _pending  set, if a GAME_UPDATE_EVENT is in the event-queue
+  """
+
+  _pending: threading.Event
+
+  def __init__(self) -> None:
+    self._pending = threading.Event()
+
+  def notify(self) -> None:
+    """Notifies the gameloop about a change. Can be called from any thread."""
+    if pg.display.get_init() and not self._pending.is_set():
+      self._pending.set()
+      pg.event.post(GAME_UPDATE_EVENT)
+
+  def acknowledge(self) -> None:
+    """Has to be called by the gameloop, when GAME_UPDATE_EVENT is received."""
+    self._pending.clear()
@@ -0,0 +1,326 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing as mp
+import os
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+# LIBRARY IMPORT
+import numpy as np
+
+# LOCAL IMPORT
+from pyadditions.io import IOM, createIOManagerDefaultConfig
+from pyadditions.types import LRUCache, classname
+from assets.atlas import WALL_ANGLES
+from constants import EXPORT_CHUNK_FRAMES, EXPORT_COMPRESSION, FLAT_TILE_SIZE, WINDOW_DIMENSIONS
+# view before game, as worker-processes import this module first (see app.py)
+from view.headless import HeadlessScene
+from view.scene import SceneManager
+from view.snapshot import SnapshotRenderer, encodePNG, encodeRGB, pad
+from command import Command, CommandFactory, GameLoadWorldCommand
+from game import KarelOrientation, Level, LevelManager, LevelSnapshot
+
+# columns of the frame-table of a Recording; the changed Tile is -1, if no
+# beepers changed
+_SEGMENT, _KAREL_X, _KAREL_Y, _DIRECTION = range(4)
+_TILE_X, _TILE_Y, _TILE_BEEPERS = range(4, 7)
+
+# Levels loaded by a worker-process by mapname
+_levelCache = LRUCache(4)
+
+
+def loadRequests(filepath: str) -> List[Dict[str, Any]]:
+  """
+  Loads recorded requests (see README, 3.2.2. Request) from a file, either as
+  JSON-list or as one request per line.
+
+  @param  filepath  path of the file
+  @return           list of requests
+  """
+  with open(filepath, "r") as stream:
+    text = stream.read()
+  if text.lstrip().startswith("["):
+    return json.loads(text)
+  return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class Recording(NamedTuple):
+  """
+  States of the Levels after every Karel-Action of a replay. Every frame only
+  holds the grid-cordinate and direction of Karel and the Tile, whose beepers
+  changed, so that the frames can be rendered in any order from the initial
+  state of the map.
+
+  @extends  NamedTuple
+  @param    mapnames  mapname of every loaded Level (segment)
+  @param    frames    frame-table as [frame, column]
+  """
+
+  mapnames: List[str]
+  frames: np.ndarray
+
+  @staticmethod
+  def record(mapname: str, requests: List[Dict[str, Any]]) -> "Recording":
+    """
+    Loads a map and applies requests to it without a window and without
+    waiting for the speed of the Level. A frame is recorded after the map was
+    loaded and after every command, that published a new state (see
+    Level.getSnapshot). Requests of 'loadWorld' start a new segment.
+
+    @param  mapname   name of the map to load first
+    @param  requests  recorded requests
+    @return           recorded frames, none if the map could not be loaded
+    """
+    LevelManager().headless = True
+    SceneManager().setGameScene(HeadlessScene())
+
+    mapnames = []
+    rows = []
+    if GameLoadWorldCommand(None, {"map": mapname}).execute().data is not None:
+      return Recording(
+          mapnames, np.zeros((0, _TILE_BEEPERS + 1), dtype=np.int64)
+      )
+    commands: List[Command] = [
+        CommandFactory().create(
+            request["function"], request["id"], request["args"]
+        ) for request in requests
+    ]
+
+    (lastLevel, lastSnapshot) = (None, None)
+    for command in [None] + commands:
+      if command is not None:
+        try:
+          command.execute()
+        except Exception as err:
+          IOM.error(f"could not execute {classname(command)}: {err}")
+
+      level = LevelManager().getCurrentLevel()
+      snapshot = level.getSnapshot()
+      (kx, ky) = level.world.kcsToGrid(snapshot.karelPosition)
+      tile = (-1, -1, 0)
+      if level is not lastLevel:
+        mapnames.append(level.mapname)
+      elif snapshot.version == lastSnapshot.version:
+        continue
+      elif snapshot.beepers is not lastSnapshot.beepers:
+        # beepers are only put or picked on the Tile of Karel
+        tile = (kx, ky, snapshot.beepers[ky, kx])
+
+      direction = WALL_ANGLES.index(snapshot.karelOrientation.angle % 360)
+      rows.append((len(mapnames) - 1, kx, ky, direction) + tile)
+      (lastLevel, lastSnapshot) = (level, snapshot)
+    return Recording(mapnames, np.array(rows, dtype=np.int64))
+
+
+class _ExportJob(NamedTuple):
+  """
+  Range of frames of one segment, that is exported by a worker-process.
+
+  @extends  NamedTuple
+  @param    mapname   mapname of the segment
+  @param    start     index of the first frame
+  @param    frames    rows of the frame-table of the range
+  @param    history   rows of the segment before the range, that changed
+                      beepers
+  @param    output    folder of the PNG-images or file of the RGB-stream
+  @param    format_   'png' or 'rgb'
+  @param    size      size of a frame in px as (width, height)
+  """
+
+  mapname: str
+  start: int
+  frames: np.ndarray
+  history: np.ndarray
+  output: str
+  format_: str
+  size: Tuple[int, int]
+
+
+def _exportFrames(job: _ExportJob) -> int:
+  """
+  Renders and writes a range of frames. Is executed by the worker-processes
+  of a ReplayExporter. The beepers are restored from the initial state of the
+  map and the changes before the range, after that only the Tiles changed by
+  a frame are redrawn.
+
+  @param  job   range of frames to export
+  @return       number of exported frames
+  """
+  level = _levelCache.getOrCreate(
+      job.mapname, lambda: Level(job.mapname, WINDOW_DIMENSIONS, True)
+  )
+  (rows, columns) = level.world.walls.shape
+  beepers = level.world.beepers.copy()
+  if len(job.history) > 0:
+    # only the last change of every Tile counts
+    flat = job.history[:, _TILE_Y] * columns + job.history[:, _TILE_X]
+    (_, last) = np.unique(flat[::-1], return_index=True)
+    last = len(flat) - 1 - last
+    beepers.flat[flat[last]] = job.history[last, _TILE_BEEPERS]
+
+  renderer = SnapshotRenderer()
+  (width, height) = job.size
+  incremental = renderer.getTileSize(level, width, height) >= FLAT_TILE_SIZE
+  frameSize = width * height * 3
+  stream = None
+  if job.format_ == "rgb":
+    stream = open(job.output, "r+b")
+    stream.seek(job.start * frameSize)
+
+  codes = None
+  lastKarel = None
+  try:
+    for (index, frame) in enumerate(job.frames, job.start):
+      karel = (int(frame[_KAREL_X]), int(frame[_KAREL_Y]))
+      if frame[_TILE_X] >= 0:
+        beepers[frame[_TILE_Y], frame[_TILE_X]] = frame[_TILE_BEEPERS]
+      snapshot = LevelSnapshot(
+          index, tuple(level.world.gridToKcs(*karel)),
+          KarelOrientation.fromAngle(WALL_ANGLES[frame[_DIRECTION]]), 0.0,
+          beepers
+      )
+
+      if codes is None or not incremental:
+        codes = renderer.render(level, snapshot, width, height)
+      else:
+        changed = {lastKarel, karel}
+        if frame[_TILE_X] >= 0:
+          changed.add((int(frame[_TILE_X]), int(frame[_TILE_Y])))
+        for pos in changed:
+          renderer.renderTile(codes, level, snapshot, pos)
+      lastKarel = karel
+
+      image = pad(codes, width, height)
+      if stream is None:
+        filepath = os.path.join(job.output, f"{index:06d}.png")
+        with open(filepath, "wb") as output:
+          output.write(encodePNG(image, EXPORT_COMPRESSION))
+      else:
+        stream.write(encodeRGB(image))
+  finally:
+    if stream is not None:
+      stream.close()
+  return len(job.frames)
+
+
+def _initWorker(iomConf: Dict[str, Any]) -> None:
+  """
+  Initializes a worker-process of a ReplayExporter.
+
+  @param  iomConf   configuration of the IOManager without streams, as they can
+                    not be passed to another process
+  """
+  IOM.load({**createIOManagerDefaultConfig(), **iomConf})
+
+
+class ReplayExporter():
+  """
+  Exports the frames of a Recording as numbered PNG-images (000000.png, ...)
+  into a folder or as raw RGB-stream (e.g. for 'ffmpeg -f rawvideo -pix_fmt
+  rgb24') into a file. Every frame has exactly the given size. The frame-range
+  is split into chunks of at most EXPORT_CHUNK_FRAMES frames, that are
+  rendered by a pool of worker-processes.
+
+  @param  recording   frames to export
+  @param  output      folder of the PNG-images or file of the RGB-stream
+  @param  format_     'png' or 'rgb'
+  @param  size        size of a frame in px as (width, height)
+  @param  workers     number of worker-processes, 1 exports in this process
+  @param  iomConf     configuration of the IOManager of the workers
+  """
+
+  recording: Recording
+  output: str
+  format_: str
+  size: Tuple[int, int]
+  workers: int
+  iomConf: Dict[str, Any]
+
+  def __init__(
+      self, recording: Recording, output: str, format_: str,
+      size: Tuple[int, int], workers: int, iomConf: Dict[str, Any]
+  ) -> None:
+    self.recording = recording
+    self.output = output
+    self.format_ = format_
+    self.size = size
+    self.workers = max(1, workers)
+    self.iomConf = iomConf
+
+  def createJobs(self) -> List[_ExportJob]:
+    """
+    Splits the frames into ranges, that do not cross segments, so that every
+    worker-process gets at least one range.
+
+    @return   ranges of frames to export
+    """
+    frames = self.recording.frames
+    chunk = -(-len(frames) // self.workers)
+    chunk = max(1, min(EXPORT_CHUNK_FRAMES, chunk))
+    segments = frames[:, _SEGMENT]
+    bounds = np.flatnonzero(np.diff(segments)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(frames)]))
+
+    jobs = []
+    for (segStart, segEnd) in zip(starts, ends):
+      mapname = self.recording.mapnames[segments[segStart]]
+      changes = frames[segStart:segEnd, _TILE_X] >= 0
+      for start in range(segStart, segEnd, chunk):
+        end = min(start + chunk, segEnd)
+        history = frames[segStart:start][changes[:start - segStart]]
+        jobs.append(
+            _ExportJob(
+                mapname, start, frames[start:end], history, self.output,
+                self.format_, self.size
+            )
+        )
+    return jobs
+
+  def run(self) -> int:
+    """
+    Exports all frames.
+
+    @return   number of exported frames
+    """
+    if self.format_ == "png":
+      os.makedirs(self.output, exist_ok=True)
+    else:
+      (width, height) = self.size
+      with open(self.output, "wb") as stream:
+        stream.truncate(len(self.recording.frames) * width * height * 3)
+
+    jobs = self.createJobs()
+    if self.workers == 1 or len(jobs) == 1:
+      return sum(map(_exportFrames, jobs))
+
+    iomConf = {
+        key: value
+        for (key, value) in self.iomConf.items()
+        if not key.endswith("_STREAM")
+    }
+    with ProcessPoolExecutor(
+        self.workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_initWorker,
+        initargs=(iomConf,)
+    ) as pool:
+      return sum(pool.map(_exportFrames, jobs))
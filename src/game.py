@@ -18,20 +18,26 @@
 
 # STL IMPORT
 from __future__ import annotations
-from typing import Dict, Any, List, Tuple, Union, NamedTuple
-from time import sleep
+from typing import Dict, Any, List, Set, Tuple, Union, NamedTuple
 import ast
 
 # LIBRARY IMPORT
-from pygame import Surface, Rect, SRCALPHA
+from pygame import Surface, Rect
+import numpy as np
 import pygame as pg
 
 # LOCAL IMPORT
 from pyadditions.io import IOM
 from pyadditions.types import EnumLike, SingletonMeta, Vector2f, promiseList
 import assets
+from assets.atlas import SpriteAtlas, wallBit
 from assets.color import HexColor
-from constants import GAME_CONTINUE_EVENT, GAME_ERROR_EVENT, GAME_FONT, GAME_START_EVENT, INFINITY
+from constants import GAME_START_EVENT, INFINITY, LAYER_CACHE_MAX_PIXELS, SCREEN_BACKGROUND_COLOR, TILE_SIZE
+from events import UpdateNotifier
+from view.camera import Camera, Minimap
+from view.layercache import LayerCache
+from view.quality import QualityGovernor
+from view.raster import TileRasterizer
 from view.window import DebugInformationDict
 
 
@@ -92,10 +98,7 @@ class ActionExecutionError(RuntimeError):
   @extends  RuntimeError
   """
 
-  def __init__(self, *args: object) -> None:
-    pg.event.post(GAME_ERROR_EVENT)
-    IOM.debug(f"POSTED '{GAME_ERROR_EVENT.attr1}'")
-    super().__init__(*args)
+  pass
 
 
 class MapLoadingError(RuntimeError):
@@ -124,6 +127,20 @@ class UnallowedActionError(RuntimeError):
     super().__init__(*args)
 
 
+class InvalidArgumentError(RuntimeError):
+  """
+  This error is produced, when a command is called with an argument, that is
+  not supported (e.g. an unknown render-mode). This error will be passed
+  through to frontend.
+
+  @extends  RuntimeError
+  """
+
+  def __init__(self, argument: str, *args: object) -> None:
+    IOM.error(f"captured invalid argument: {argument}")
+    super().__init__(*args)
+
+
 class _KarelOrientationTuple(NamedTuple):
   """
   This class specifies a Set of values, which specify a compass-direction in the
@@ -204,86 +221,49 @@ class Tile():
   in eighter compass-direction and has n Beepers on it, which can be picked up
   by Karel. A Tile has no information about its position in the Map.
 
-  @param  surf      render-surface as pygame.Surface
-  @param  rect      bounds of surf as pygame.Rect
-  @param  _walls    List of wall-angles present on Tile
-  @param  _beepers  number of Beepers present on Tile
+  The state of all Tiles is stored in the wall-mask and beeper arrays of the
+  World, a Tile is only a view on one cell of these arrays. Tiles do not own a
+  render-surface. All tiles with the same walls and number of Beepers share one
+  immutable surface from the SpriteAtlas (flyweight).
+
+  @param  surf      shared render-surface as pygame.Surface (read-only)
+  @param  _walls    wall-mask array of the World (see assets.atlas)
+  @param  _beepers  beeper array of the World
+  @param  _index    index of the Tile in both arrays as (gy, gx)
   """
 
-  surf: Surface
-  rect: Rect
-  _walls: List[float]
-  _beepers: int
+  __slots__ = ("_walls", "_beepers", "_index")
+
+  _walls: np.ndarray
+  _beepers: np.ndarray
+  _index: Tuple[int, int]
 
   def __init__(
-      self, pos: Tuple[float, float], walls: List[float], beepers: int
+      self, walls: np.ndarray, beepers: np.ndarray, index: Tuple[int, int]
   ) -> None:
-    self.surf = assets.load.image("64x/tile.png")
-    self.rect = self.surf.get_rect()
     self._walls = walls
     self._beepers = beepers
+    self._index = index
 
-    (self.rect.x, self.rect.y) = pos
-    self.rebuild()
-
-  def rebuild(self) -> None:
-    """Rebuilds the render-surface of Tile."""
-    self.surf = assets.load.image("64x/tile.png")
-    for angle in self._walls:
-      self._buildWall(angle)
-    self._buildBeepers()
-
-  def _buildWall(self, angle: float) -> None:
-    """
-    Creates a Wall-surface and renders it in position onto the render-surface
-    of Tile.
-
-    @param  angle    angle of the wall, relative to 0 at EAST
-    """
-    wallSurf = Surface((self.rect.width, self.rect.height), SRCALPHA)
-    pg.draw.rect(
-        wallSurf, HexColor("#000000"),
-        Rect(self.rect.width - 1, 0, 1, self.rect.height)
-    )
-    wallSurf = pg.transform.rotate(wallSurf, angle)
-    self.surf.blit(wallSurf, (0, 0))
-
-  def _buildBeepers(self) -> None:
-    """
-    Creates a Beeper-surface with a counter on top if more than one Beeper are
-    present and then renders it onto the render-surface of Tile.
-    """
-    if self._beepers > 0:
-      beeperSurf = assets.load.image("64x/beeper.png")
-      self.surf.blit(beeperSurf, (0, 0))
-    if self._beepers > 1:
-      beeperNumFont = assets.load.font(GAME_FONT, 14)
-      beeperNumSurf = beeperNumFont.render(
-          str(self._beepers), True, HexColor("#000000")
-      )
-      beeperNumRect = beeperNumSurf.get_rect()
-      beeperNumRect.center = (self.rect.width / 2, self.rect.height / 2)
-      self.surf.blit(beeperNumSurf, beeperNumRect)
+  @property
+  def surf(self) -> Surface:
+    return SpriteAtlas(TILE_SIZE).tile(self.getWalls(), self.getBeepers())
 
   def addWall(self, angle: float) -> None:
     """
-    Adds a Wall to the Tile and rerenders the Tile.
+    Adds a Wall to the Tile.
 
     @param  angle   angle of the wall, relative to 0 at EAST
     """
-    if angle not in self._walls:
-      self._walls.append(angle)
-      self.rebuild()
+    self._walls[self._index] |= wallBit(angle)
 
   def setBeepers(self, n: int) -> None:
     """
-    Sets the number of Beepers and rerenders the Tile.
+    Sets the number of Beepers on Tile.
 
     @param  n   number of Beepers
     """
-    if self._beepers != n:
-      self._beepers = n
-      self.rebuild()
+    self._beepers[self._index] = n
 
   def getBeepers(self) -> int:
     """
@@ -291,19 +271,27 @@ class Tile():
 
     @return   number of Beepers
     """
-    return self._beepers
+    return int(self._beepers[self._index])
+
+  def getWalls(self) -> int:
+    """
+    Returns the wall-mask of walls present on Tile.
+
+    @return   wall-mask (see assets.atlas)
+    """
+    return int(self._walls[self._index])
 
   def incrBeepers(self) -> None:
     """
-    Increments the number of Beepers on Tile by one and rerenders the Tile.
+    Increments the number of Beepers on Tile by one.
     """
-    self.setBeepers(self._beepers + 1)
+    self.setBeepers(self.getBeepers() + 1)
 
   def decrBeepers(self) -> None:
     """
-    Decrements the number of Beepers on Tile by one and rerenders the Tile.
+    Decrements the number of Beepers on Tile by one.
     """
-    self.setBeepers(self._beepers - 1)
+    self.setBeepers(self.getBeepers() - 1)
 
   def wallAt(self, angle: float) -> bool:
     """
@@ -312,7 +300,7 @@ class Tile():
     @param  angle   angle of the wall, relative to 0 at EAST
     @return         True if Wall is at angle
     """
-    return angle in self._walls
+    return bool(self.getWalls() & wallBit(angle))
 
 
 class Karel():
@@ -327,27 +315,26 @@ class Karel():
   @param  position      Coordinates of position of Karel (starts at (1, 1))
   """
 
-  surf: Surface
   rect: Rect
   beeperbag: float
   orientation: _KarelOrientationTuple
   position: Vector2f
 
   def __init__(self, conf: Dict[str, Any]) -> None:
-    self.surf = assets.load.image("64x/karel.png")
-    self.rect = self.surf.get_rect()
-    self.orientation = KarelOrientation.EAST
+    self.rect = Rect(0, 0, TILE_SIZE, TILE_SIZE)
+    self.orientation = conf["orientation"]
     self.beeperbag = conf["beeperbag"]
     self.position = conf["position"]
 
-    self.setOrientation(conf["orientation"])
+  @property
+  def surf(self) -> Surface:
+    """
+    Returns the pre-rotated sprite of Karel. It is only created on access, so
+    Karel can be used without a display (see Level.headless).
 
-  def rebuild(self) -> None:
-    """Rebuilds the render-surface of Karel."""
-    self.surf = assets.load.image("64x/karel.png")
-    oldOrientation = self.orientation
-    self.orientation = KarelOrientation.EAST
-    self.setOrientation(oldOrientation)
+    @return   render-surface of Karel
+    """
+    return SpriteAtlas(TILE_SIZE).karel(self.orientation.angle)
 
   def render(self, surf: Surface) -> None:
     """
@@ -361,15 +348,11 @@ class Karel():
 
   def setOrientation(self, orientation: _KarelOrientationTuple) -> None:
     """
-    Sets the compass-direction Karel is looking at and rotates render-surface.
+    Sets the compass-direction Karel is looking at.
 
     @param  orientation   new compass-direction as _KarelOrientationTuple
     """
-    if self.orientation != orientation:
-      self.surf = pg.transform.rotate(
-          self.surf, orientation.angle - self.orientation.angle
-      )
-      self.orientation = orientation
+    self.orientation = orientation
 
   def rotate90(self) -> None:
     """Rotates Karel by 90deg."""
@@ -398,16 +381,25 @@ class World():
   dataclass and specifies the rendering of the World-object. This class has no
   information on any game-logic or karel.
 
-  @param  tiles   a 2D-array of all tiles in the map KCS(1, 1) is INDEX(0, 0)
-  @param  size    the size of the world in measured in Tiles
-  @param  surf    render-surface as pygame.Surface
-  @param  rect    bounds of surf as pygame.Rect
+  The state of the Tiles is stored in two arrays, which are indexed by grid-
+  cordinates [gy, gx] (see view.camera.Camera), so KCS(1, 1) is
+  INDEX(height - 1, 0). Tiles are created on access as views on these arrays.
+  Walls are read-only after loading. The beeper array is copy-on-write: once it
+  is shared with a LevelSnapshot it becomes read-only, and the next modifying
+  access through 'editTileAtKCS' replaces it with a copy.
+
+  @param  walls     wall-masks of all tiles as numpy-array
+  @param  beepers   number of Beepers of all tiles as numpy-array
+  @param  size      the size of the world in measured in Tiles
+  @param  _staticLayer    rendered walls of the whole World, None if not loaded
+  @param  _staticTileSize tile-size of _staticLayer
   """
 
-  tiles: List[List[Tile]]
+  walls: np.ndarray
+  beepers: np.ndarray
   size: Vector2f
-  surf: Surface
-  rect: Rect
+  _staticLayer: Surface
+  _staticTileSize: int
 
   def __init__(self, conf: Dict[str, Any]) -> None:
     metadata = conf["metadata"]
@@ -419,51 +411,119 @@ class World():
     )
 
     self.size = conf["size"]
-    self.tiles = []
-    for i in range(self.size.y):
-      self.tiles.append([])
-      for j in range(self.size.x):
-        self.tiles[i].append(Tile((i, j), [], 0))
+    shape = (int(self.size.y), int(self.size.x))
+    self.walls = np.zeros(shape, dtype=np.uint8)
+    self.beepers = np.zeros(shape, dtype=np.int64)
+    self._staticLayer = None
+    self._staticTileSize = None
 
     for wall in conf["walls"]:
       wallPosition = wall["start"]
       wallOrientation = wall["orientation"]
       for i in range(wall["length"]):
-        self.tiles[wallPosition.y - 1][wallPosition.x -
-                                       1].addWall(wallOrientation.angle)
+        self.getTileAtKCS(wallPosition).addWall(wallOrientation.angle)
         if wallOrientation.isHorizontal():
           wallPosition.y += 1
         else:
           wallPosition.x += 1
 
     for beeper in conf["beepers"]:
-      beeperPosition = beeper["position"]
-      self.tiles[beeperPosition.y - 1][beeperPosition.x -
-                                       1].setBeepers(beeper["n"])
+      self.getTileAtKCS(beeper["position"]).setBeepers(beeper["n"])
+    self.walls.flags.writeable = False
 
-    tileDimension = Vector2f._make(self.tiles[0][0].surf.get_size())
-    self.surf = Surface(tuple(self.size * tileDimension))
-    self.rect = self.surf.get_rect()
-    for i, row in enumerate(reversed(self.tiles)):
-      for j, tile in enumerate(row):
-        tile.rect.x = j * tileDimension.x
-        tile.rect.y = i * tileDimension.y
+  def shareBeepers(self) -> np.ndarray:
+    """
+    Makes the beeper array read-only, so that it can be shared with other
+    threads. It will be copied on the next modification.
 
-    self.rebuild()
+    @return   read-only beeper array
+    """
+    self.beepers.flags.writeable = False
+    return self.beepers
 
-  def rebuild(self) -> None:
-    """Rebuilds the render-surface of World."""
-    for row in self.tiles:
-      for tile in row:
-        self.surf.blit(tile.surf, tile.rect)
+  def render(
+      self, destSurf: Surface, camera: Camera, beepers: np.ndarray
+  ) -> None:
+    """
+    Renders all Tiles, that are visible through the camera, on destination-
+    surface in a single pass. Tiles outside of the viewport will not be
+    touched, so the cost only depends on the size of the viewport.
+
+    @param  destSurf  destination-surface with the size of the viewport
+    @param  camera    camera of the viewport
+    @param  beepers   beeper array to render (e.g. of a LevelSnapshot)
+    """
+    (x0, y0, x1, y1) = camera.getVisibleRange()
+    if camera.tileSize != self._staticTileSize:
+      self._renderRegion(destSurf, camera, beepers, (x0, y0), (x1, y1))
+      return
+
+    # static layer holds all walls, only Beepers have to be rasterized
+    (ox, oy) = camera.getOffset()
+    destSurf.blit(self._staticLayer, (-ox, -oy))
+    TileRasterizer(camera.tileSize).renderBeepers(
+        destSurf, self.walls[y0:y1, x0:x1], beepers[y0:y1, x0:x1],
+        camera.getTileRect(x0, y0).topleft
+    )
 
-  def render(self, destSurf: Surface) -> None:
+  def loadStaticLayer(self, tileSize: int) -> None:
     """
-    Renders render-surface on destination-surface.
+    Loads the static layer (walls only) of the whole World at tile-size from
+    the LayerCache. If it is not cached, it will be rasterized and stored.
+    Walls never change during a game, so rendering at this tile-size only
+    has to blit the static layer and rasterize the Beepers on top.
 
-    @param  destSurf  destination-surface
+    @param  tileSize  tile-size of the static layer in px
     """
-    destSurf.blit(self.surf, self.rect)
+    (height, width) = self.walls.shape
+    if width * height * tileSize**2 > LAYER_CACHE_MAX_PIXELS:
+      return
+
+    rasterizer = TileRasterizer(tileSize)
+    key = LayerCache.makeKey(self.walls, tileSize, rasterizer.spriteHash)
+    layer = LayerCache().load(key, (width * tileSize, height * tileSize))
+    if layer is None:
+      layer = rasterizer.rasterize(self.walls, np.zeros_like(self.beepers))
+      LayerCache().store(key, layer)
+    (self._staticLayer, self._staticTileSize) = (layer, tileSize)
+
+  def renderTile(
+      self, destSurf: Surface, camera: Camera, beepers: np.ndarray,
+      gridPos: Tuple[int, int]
+  ) -> None:
+    """
+    Renders a single Tile on destination-surface.
+
+    @param  destSurf  destination-surface with the size of the viewport
+    @param  camera    camera of the viewport
+    @param  beepers   beeper array to render (e.g. of a LevelSnapshot)
+    @param  gridPos   grid-cordinate of the Tile
+    """
+    (gx, gy) = gridPos
+    self._renderRegion(destSurf, camera, beepers, (gx, gy), (gx + 1, gy + 1))
+
+  def _renderRegion(
+      self, destSurf: Surface, camera: Camera, beepers: np.ndarray,
+      start: Tuple[int, int], end: Tuple[int, int]
+  ) -> None:
+    """
+    Rasterizes a region of grid-cordinates and renders it on destination-
+    surface.
+
+    @param  destSurf  destination-surface with the size of the viewport
+    @param  camera    camera of the viewport
+    @param  beepers   beeper array to render
+    @param  start     top-left grid-cordinate of the region
+    @param  end       bottom-right grid-cordinate of the region (exclusive)
+    """
+    (x0, y0), (x1, y1) = start, end
+    if x1 <= x0 or y1 <= y0:
+      return
+    rasterizer = TileRasterizer(camera.tileSize)
+    rasterizer.render(
+        destSurf, self.walls[y0:y1, x0:x1], beepers[y0:y1, x0:x1],
+        camera.getTileRect(x0, y0).topleft
+    )
 
   def getTileAtKCS(
       self, pos: Union[Tuple[float, float], List[float], Vector2f]
@@ -475,7 +535,31 @@ class World():
     @param  pos   cordinate in the KCS (Karel Cordinate System)
     @return       coresponding tile as Tile
     """
-    return self.tiles[int(pos[1]) - 1][int(pos[0]) - 1]
+    return self.getTileAtGrid(*self.kcsToGrid(pos))
+
+  def editTileAtKCS(
+      self, pos: Union[Tuple[float, float], List[float], Vector2f]
+  ) -> Tile:
+    """
+    Returns the coresponding Tile for a cordinate in the KCS, whose Beepers can
+    be modified. If the beeper array is shared, it is copied first.
+
+    @param  pos   cordinate in the KCS (Karel Cordinate System)
+    @return       coresponding tile as Tile
+    """
+    if not self.beepers.flags.writeable:
+      self.beepers = self.beepers.copy()
+    return self.getTileAtKCS(pos)
+
+  def getTileAtGrid(self, gx: int, gy: int) -> Tile:
+    """
+    Returns the coresponding Tile for a grid-cordinate (see view.camera.Camera).
+
+    @param  gx  grid-x-cordinate
+    @param  gy  grid-y-cordinate
+    @return     coresponding tile as Tile
+    """
+    return Tile(self.walls, self.beepers, (gy, gx))
 
   def isOutOfBoundsKCS(
       self, pos: Union[Tuple[float, float], List[float], Vector2f]
@@ -489,23 +573,26 @@ class World():
     pos = Vector2f._make(pos)
     return pos < (1, 1) or pos > self.size
 
-  def rebuildTileAtKCS(
+  def kcsToGrid(
       self, pos: Union[Tuple[float, float], List[float], Vector2f]
-  ) -> None:
+  ) -> Tuple[int, int]:
     """
-    Rebuilds Tile at a scpecific cordinate in KCS.
+    Converts a cordinate in KCS to a grid-cordinate (see view.camera.Camera).
 
     @param  pos   cordinate in the KCS (Karel Cordinate System)
+    @return       grid-cordinate
     """
-    tile = self.getTileAtKCS(pos)
-    tile.rebuild()
-    self.surf.blit(tile.surf, tile.rect)
+    return (int(pos[0]) - 1, int(self.size.y) - int(pos[1]))
 
-  def repaintTileAtKCS(
-      self, pos: Union[Tuple[float, float], List[float], Vector2f]
-  ) -> None:
-    tile = self.getTileAtKCS(pos)
-    self.surf.blit(tile.surf, tile.rect)
+  def gridToKcs(self, gx: int, gy: int) -> Vector2f:
+    """
+    Converts a grid-cordinate (see view.camera.Camera) to a cordinate in KCS.
+
+    @param  gx  grid-x-cordinate
+    @param  gy  grid-y-cordinate
+    @return     cordinate in the KCS (Karel Cordinate System)
+    """
+    return Vector2f(gx + 1, int(self.size.y) - gy)
 
 
 class LevelState(EnumLike):
@@ -513,7 +600,6 @@ class LevelState(EnumLike):
 
   INIT = 1
   RUNNING = 2
-  PAUSE = 3
   ERROR = 4
   FINISHED = 5
 
@@ -527,8 +613,6 @@ class LevelState(EnumLike):
     """
     if state == LevelState.INIT:
       return "LS_INIT"
-    elif state == LevelState.PAUSE:
-      return "LS_PAUSE"
     elif state == LevelState.RUNNING:
       return "LS_RUNNING"
     elif state == LevelState.ERROR:
@@ -537,44 +621,127 @@ class LevelState(EnumLike):
       return "LS_FINISHED"
 
 
+class RenderMode(EnumLike):
+  """
+  Enum which describes, when Karel-Actions are rendered. In FINAL_ONLY the
+  Level is only rendered, while it is not running (e.g. after EOS or an error).
+  """
+
+  EVERY_STEP = 1
+  FINAL_ONLY = 2
+  NONE = 3
+
+  @staticmethod
+  def fromStr(name: str) -> int:
+    """
+    Converts the name of a render-mode in the API to RenderMode.
+
+    @param  name  name of the render-mode ('everyStep', 'finalOnly', 'none')
+    @return       render-mode as RenderMode
+    """
+    if name == "everyStep":
+      return RenderMode.EVERY_STEP
+    elif name == "finalOnly":
+      return RenderMode.FINAL_ONLY
+    elif name == "none":
+      return RenderMode.NONE
+    raise InvalidArgumentError(f"render-mode '{name}'")
+
+
+class LevelSnapshot(NamedTuple):
+  """
+  Immutable state of a Level after a Karel-Action. Snapshots are published by
+  the thread, that executes the Karel-Actions, and read by the main-thread
+  without any locks, so a frame never shows a half-executed action.
+
+  @extends  NamedTuple
+  @param    version           number of published snapshots before this one
+  @param    karelPosition     cordinate of Karel in KCS
+  @param    karelOrientation  compass-direction, Karel is looking at
+  @param    karelBeeperbag    num of beepers available to Karel
+  @param    beepers           read-only beeper array of the World as [gy, gx]
+  """
+
+  version: int
+  karelPosition: Tuple[float, float]
+  karelOrientation: _KarelOrientationTuple
+  karelBeeperbag: float
+  beepers: np.ndarray
+
+
 class Level():
   """
   The main datastructure that describes the game-world. It holds all information
   about the logic of the game. It also holds all game-objects and is responsible
-  for rendering and scaling the World and Karel.
-
-  @param  surf        render-surface as pygame.Surface
-  @param  rect        bounds of surf as pygame.Rect
-  @param  state       state of the Level as LevelState
-  @param  speed       current Karel-Actions per seconds
-  @param  world       World-object
-  @param  karel       Karel-object
-  @param  scaledSurf  scaled surface, if world is to big for bounds, else None
-  @param  scaledRatio ratio in which the world is scaled, default: 1.0
-  @param  isScaled    True if world is in scaled mode
+  for rendering the World and Karel through a camera.
+
+  The render-surface has the size of the viewport (limited by bounds) and is
+  only redrawn on the main thread. If only single Tiles changed (e.g. after a
+  Karel-Action), only those Tiles are repainted at the current tile-size, the
+  whole viewport is only redrawn if the camera changed. Karel-Actions publish
+  a LevelSnapshot and mark the changed Tiles, rendering only reads the latest
+  snapshot. A headless Level has no viewport and is never rendered (e.g. in
+  the simulation-process, see remote.py). While the render-mode suppresses
+  rendering, changed Tiles are not tracked; once rendering resumes, the whole
+  viewport and minimap are rebuilt from the latest snapshot.
+
+  @param  surf          render-surface with the size of the viewport
+  @param  rect          bounds of surf as pygame.Rect
+  @param  mapname       name of the loaded map
+  @param  headless      True if the Level has no viewport
+  @param  state         state of the Level as LevelState
+  @param  renderMode    when Karel-Actions are rendered as RenderMode
+  @param  speed         current Karel-Actions per seconds
+  @param  world         World-object
+  @param  karel         Karel-object
+  @param  camera        camera of the viewport
+  @param  minimap       minimap, that is shown if the World is not fully visible
+  @param  _viewSurf     subsurface of surf inside the 1px frame
+  @param  _cameraState  state of the camera at the last redraw
+  @param  _framesSinceRedraw  number of updates since the last redraw
+  @param  _changedTiles KCS-cordinates of changed Tiles since the last update
+  @param  _skippedTiles True if Tiles changed, while rendering was suppressed
+  @param  _snapshot     latest published LevelSnapshot
+  @param  _dragging     True if the viewport is currently dragged with the mouse
+  @param  _needsRedraw  True if surf has to be redrawn on the next update
+  @param  _dirtyRects   regions of surf, that were redrawn since last render
   """
 
   surf: Surface
   rect: Rect
+  _dirtyRects: List[Rect]
 
+  mapname: str
+  headless: bool
   state: int
+  renderMode: int
   speed: float
   world: World
   karel: Karel
 
-  scaledSurf: Surface
-  scaledRatio: float
-  isScaled: bool
+  camera: Camera
+  minimap: Minimap
+  _viewSurf: Surface
+  _cameraState: Tuple[int, Tuple[int, int]]
+  _framesSinceRedraw: int
+  _changedTiles: List[Vector2f]
+  _skippedTiles: bool
+  _snapshot: LevelSnapshot
+  _dragging: bool
+  _needsRedraw: bool
 
   def __init__(
-      self, mapname: str, bounds: Union[Tuple[float, float], List[float],
-                                        Vector2f]
+      self,
+      mapname: str,
+      bounds: Union[Tuple[float, float], List[float], Vector2f],
+      headless: bool = False
   ) -> None:
     """
     constructor
 
     @param  mapname   name of map
     @param  bounds    bounds of surface
+    @param  headless  True if the Level should not create a viewport
     """
     try:
       mapXml = assets.load.xml(f"map/{mapname}.xml")
@@ -582,23 +749,47 @@ class Level():
     except Exception as e:
       raise MapLoadingError(e)
 
+    self.mapname = mapname
+    self.headless = headless
     self.world = World(map_["world"])
     self.karel = Karel(map_["karel"])
     self.speed = map_["speed"]
-    self.surf = Surface((self.world.rect.width + 2, self.world.rect.height + 2))
-    self.rect = self.surf.get_rect()
     self.state = LevelState.INIT
+    self.renderMode = RenderMode.EVERY_STEP
 
-    # scaling
-    self.isScaled = False
-    self.scaledRatio = 1.0
-    self.scaledSurf = None
+    self.surf = self.rect = self._viewSurf = None
+    self.camera = self.minimap = None
+    if not headless:
+      self._createViewport(bounds)
 
-    scaledRatio = min(bounds[0] / self.rect.width, bounds[1] / self.rect.height)
-    if scaledRatio < 1.0:
-      self.setScaledRect(scaledRatio)
+    self._cameraState = None
+    self._framesSinceRedraw = 0
+    self._changedTiles = []
+    self._skippedTiles = False
+    self._snapshot = None
+    self._dragging = False
+    self._dirtyRects = []
 
-    self.repaint()
+    self._publish()
+
+  def _createViewport(
+      self, bounds: Union[Tuple[float, float], List[float], Vector2f]
+  ) -> None:
+    """
+    Creates the render-surface, the camera and the minimap of the Level.
+
+    @param  bounds    bounds of surface
+    """
+    worldSize = self.world.size * TILE_SIZE + (2, 2)
+    self.surf = Surface(
+        (min(bounds[0], worldSize.x), min(bounds[1], worldSize.y))
+    )
+    self.rect = self.surf.get_rect()
+    self._viewSurf = self.surf.subsurface(self.rect.inflate(-2, -2))
+    self.camera = Camera(Vector2f(*self._viewSurf.get_size()), self.world.size)
+    self.minimap = Minimap(self.world.walls, self.world.beepers)
+    self.world.loadStaticLayer(self.camera.getFitTileSize())
+    self.minimap.rect.bottomright = (self.rect.width - 9, self.rect.height - 9)
 
   def playable(self) -> bool:
     """
@@ -608,77 +799,269 @@ class Level():
     """
     return (self.state == LevelState.RUNNING)
 
-  def pause(self) -> None:
-    self._changeLevelState(LevelState.PAUSE)
-    pg.time.set_timer(GAME_CONTINUE_EVENT, int(1000 / self.speed), 1)
+  def isRendered(self) -> bool:
+    """
+    Checks, wether Karel-Actions are currently rendered in the render-mode.
 
-  def setScaledRect(self, scaledRatio: float) -> None:
+    @return   True if changes of the level are rendered
     """
-    Rescales the rect of Level using scaledRatio, initializes scaledSurf and
-    sets the level in scaled mode.
+    if self.renderMode == RenderMode.FINAL_ONLY:
+      return self.state != LevelState.RUNNING
+    return self.renderMode == RenderMode.EVERY_STEP
 
-    @param  scaledRatio   ratio the surf should be scaled to
+  def setRenderMode(self, mode: int) -> None:
     """
-    self.isScaled = True
-    self.scaledRatio = scaledRatio
-    self.rect.width = self.rect.width * self.scaledRatio
-    self.rect.height = self.rect.height * self.scaledRatio
+    Sets, when Karel-Actions are rendered. Takes effect on the next update.
 
-    self.scaledSurf = Surface((self.rect.width, self.rect.height))
+    @param  mode  new render-mode as RenderMode
+    """
+    self.renderMode = mode
+    self.repaint()
 
-  def repaint(self) -> None:
-    """Repaint the game surface (scaled surface to if in scaled mode)."""
-    self.surf.fill(HexColor("#000000"))
-    self.surf.blit(self.world.surf, (1, 1))
+  def repaint(
+      self, *positions: Union[Tuple[float, float], List[float], Vector2f]
+  ) -> None:
+    """
+    Marks Tiles for a repaint on the next update. If no positions are given,
+    the whole level will be redrawn. Can be called from any thread. Headless
+    Levels are never rendered, so nothing will be marked.
+
+    @param  positions   cordinates in KCS of the changed Tiles
+    """
+    if self.headless:
+      return
+    if not self.isRendered():
+      self._skippedTiles = True
+      return
+    for pos in positions:
+      self._changedTiles.append(Vector2f(pos[0], pos[1]))
+    if not positions:
+      self._needsRedraw = True
+    UpdateNotifier().notify()
+
+  def _publish(
+      self, *positions: Union[Tuple[float, float], List[float], Vector2f]
+  ) -> None:
+    """
+    Publishes the current state as new LevelSnapshot and marks Tiles for a
+    repaint (see 'repaint'). The snapshot is published first, so that the main-
+    thread never repaints a Tile with an older state.
 
-    karelAbsolutePosition = self.world.getTileAtKCS(self.karel.position).rect
-    self.surf.blit(
-        self.karel.surf,
-        (karelAbsolutePosition.x + 1, karelAbsolutePosition.y + 1)
+    @param  positions   cordinates in KCS of the changed Tiles
+    """
+    version = 0 if self._snapshot is None else self._snapshot.version + 1
+    self._snapshot = LevelSnapshot(
+        version, tuple(self.karel.position), self.karel.orientation,
+        self.karel.beeperbag, self.world.shareBeepers()
     )
+    self.repaint(*positions)
 
-    # render scaled-version onto scaledSurf, if in scaled mode
-    if self.isScaled:
-      self.scaledSurf.blit(
-          pg.transform.smoothscale(
-              self.surf, (self.rect.width, self.rect.height)
-          ), (0, 0)
-      )
+  def getSnapshot(self) -> LevelSnapshot:
+    """
+    Returns the latest published state of the Level.
+
+    @return   latest LevelSnapshot
+    """
+    return self._snapshot
+
+  def applyState(
+      self, karelPosition: Tuple[float, float], karelOrientation: float,
+      karelBeeperbag: float, beepers: np.ndarray
+  ) -> None:
+    """
+    Takes over the state of Karel and the Beepers from a Level in another
+    process (see remote.LevelMirror) and repaints the Tiles, that changed.
+
+    @param  karelPosition     cordinate of Karel in KCS
+    @param  karelOrientation  angle of the compass-direction, Karel is looking
+    @param  karelBeeperbag    num of beepers available to Karel
+    @param  beepers           beeper array of the World as [gy, gx], is owned
+                              by the Level afterwards
+    """
+    changed = [
+        self.world.gridToKcs(gx, gy)
+        for (gy, gx) in np.argwhere(beepers != self.world.beepers)
+    ]
+    if changed:
+      self.world.beepers = beepers
+
+    oldPosition = Vector2f(*self.karel.position)
+    self.karel.position = Vector2f(*karelPosition)
+    self.karel.setOrientation(KarelOrientation.fromAngle(karelOrientation))
+    self.karel.beeperbag = karelBeeperbag
+    self._publish(oldPosition, self.karel.position, *changed)
 
   def update(self, speed: float) -> None:
     """Update level and information about level"""
     self.speed = speed
-    DebugInformationDict().update(
-        KAREL_POSITION=self.karel.position,
-        KAREL_ORIENTATION=
-        f"{self.karel.orientation.name} / {self.karel.orientation.angle}",
-        KAREL_BEEPER_BAG=self.karel.beeperbag,
-        MAP_RENDER_SCALE=self.scaledRatio
+    if not self.isRendered():
+      return
+
+    # under load the World is only redrawn every n-th frame (UI every frame)
+    self._framesSinceRedraw += 1
+    worldInterval = QualityGovernor().quality.worldInterval
+    if self._framesSinceRedraw < worldInterval:
+      if self._needsRedraw or self._changedTiles or self._skippedTiles:
+        UpdateNotifier().notify()
+      return
+
+    changedTiles = set()
+    while self._changedTiles:
+      changedTiles.add(self.world.kcsToGrid(self._changedTiles.pop()))
+    # read after the changed Tiles, so it is at least as new as their changes
+    snapshot = self._snapshot
+    if self._skippedTiles:
+      self._skippedTiles = False
+      self._needsRedraw = True
+      self.minimap.rebuild(snapshot.beepers)
+    for gridPos in changedTiles:
+      self.minimap.updateTile(gridPos, snapshot.beepers)
+
+    self.camera.follow(self.world.kcsToGrid(snapshot.karelPosition))
+    cameraState = self.camera.getState()
+    if self._needsRedraw or cameraState != self._cameraState:
+      self._needsRedraw = False
+      self._cameraState = cameraState
+      self._framesSinceRedraw = 0
+      self._redraw(snapshot)
+    elif changedTiles:
+      self._framesSinceRedraw = 0
+      self._redrawTiles(snapshot, changedTiles)
+
+    if DebugInformationDict().isActive():
+      orientation = snapshot.karelOrientation
+      DebugInformationDict().update(
+          KAREL_POSITION=Vector2f(*snapshot.karelPosition),
+          KAREL_ORIENTATION=f"{orientation.name} / {orientation.angle}",
+          KAREL_BEEPER_BAG=snapshot.karelBeeperbag,
+          MAP_RENDER_SCALE=self.camera.tileSize / TILE_SIZE
+      )
+
+  def _redraw(self, snapshot: LevelSnapshot) -> None:
+    """
+    Redraws the visible part of World, Karel and the minimap onto surf.
+
+    @param  snapshot  state of the Level to render
+    """
+    self.surf.fill(SCREEN_BACKGROUND_COLOR)
+    self.world.render(self._viewSurf, self.camera, snapshot.beepers)
+
+    karelGridPos = self.world.kcsToGrid(snapshot.karelPosition)
+    atlas = SpriteAtlas(self.camera.tileSize)
+    karelSurf = atlas.karel(snapshot.karelOrientation.angle)
+    self._viewSurf.blit(karelSurf, self.camera.getTileRect(*karelGridPos))
+
+    frameRect = self.camera.getWorldRect().move(1, 1).inflate(2, 2)
+    pg.draw.rect(
+        self.surf, HexColor("#000000"), frameRect.clip(self.surf.get_rect()), 1
     )
 
+    if not self.camera.showsWholeWorld():
+      self.minimap.render(self.surf, self.camera, karelGridPos)
+    self._dirtyRects = [self.surf.get_rect()]
+
+  def _redrawTiles(
+      self, snapshot: LevelSnapshot, gridPositions: Set[Tuple[int, int]]
+  ) -> None:
+    """
+    Repaints single Tiles (and Karel, if on one of them) onto surf, without
+    touching the rest of the viewport.
+
+    @param  snapshot        state of the Level to render
+    @param  gridPositions   grid-cordinates of the changed Tiles
+    """
+    atlas = SpriteAtlas(self.camera.tileSize)
+    karelSurf = atlas.karel(snapshot.karelOrientation.angle)
+    viewRect = self._viewSurf.get_rect()
+    karelGridPos = self.world.kcsToGrid(snapshot.karelPosition)
+
+    for gridPos in gridPositions:
+      tileRect = self.camera.getTileRect(*gridPos)
+      if not viewRect.colliderect(tileRect):
+        continue
+      self.world.renderTile(
+          self._viewSurf, self.camera, snapshot.beepers, gridPos
+      )
+      if gridPos == karelGridPos:
+        self._viewSurf.blit(karelSurf, tileRect)
+      self._dirtyRects.append(tileRect.move(1, 1).clip(viewRect.move(1, 1)))
+
+    if not self.camera.showsWholeWorld():
+      self.minimap.render(self.surf, self.camera, karelGridPos)
+      self._dirtyRects.append(self.minimap.rect.inflate(2, 2))
+
   def render(self, destSurf: Surface) -> None:
     """
     Renders render-surface on destination-surface.
 
     @param  destSurf  destination-surface
     """
-    if self.isScaled:
-      destSurf.blit(self.scaledSurf, self.rect)
-    else:
-      destSurf.blit(self.surf, self.rect)
+    destSurf.blit(self.surf, self.rect)
+
+  def getDirtyRects(self) -> List[Rect]:
+    """
+    Returns the regions of the destination-surface, that have been redrawn
+    since the last call.
+
+    @return   list of dirty rects
+    """
+    (dirtyRects, self._dirtyRects) = (self._dirtyRects, [])
+    return [rect.move(self.rect.topleft) for rect in dirtyRects]
 
   def proccessEvent(self, event: pg.event.Event) -> None:
     """
-    Processes a pygame event.
+    Processes a pygame event. Input-events are used to control the camera:
+    mouse-wheel and +/- zoom, dragging and arrow-keys pan, a click on the
+    minimap centers the viewport, F toggles following Karel and HOME resets the
+    camera.
 
     @param  event   pygame event
     """
-    if event == GAME_ERROR_EVENT:
-      self._changeLevelState(LevelState.ERROR)
     if event == GAME_START_EVENT:
       self._changeLevelState(LevelState.RUNNING)
-    if event == GAME_CONTINUE_EVENT:
-      self._changeLevelState(LevelState.RUNNING)
+
+    if event.type == pg.MOUSEWHEEL:
+      mousePos = pg.mouse.get_pos()
+      if self.rect.collidepoint(mousePos):
+        self.camera.zoom(
+            event.y,
+            (mousePos[0] - self.rect.x - 1, mousePos[1] - self.rect.y - 1)
+        )
+    elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
+      if self.rect.collidepoint(event.pos):
+        localPos = (event.pos[0] - self.rect.x, event.pos[1] - self.rect.y)
+        if not self.camera.showsWholeWorld() and \
+            self.minimap.collidepoint(localPos):
+          self.camera.following = False
+          self.camera.centerOn(self.minimap.toGrid(localPos))
+        else:
+          self._dragging = True
+    elif event.type == pg.MOUSEBUTTONUP and event.button == 1:
+      self._dragging = False
+    elif event.type == pg.MOUSEMOTION and self._dragging:
+      if event.buttons[0]:
+        self.camera.pan((-event.rel[0], -event.rel[1]))
+      else:
+        self._dragging = False
+    elif event.type == pg.KEYDOWN:
+      step = max(self.camera.viewSize) / 4
+      if event.key == pg.K_LEFT:
+        self.camera.pan((-step, 0))
+      elif event.key == pg.K_RIGHT:
+        self.camera.pan((step, 0))
+      elif event.key == pg.K_UP:
+        self.camera.pan((0, -step))
+      elif event.key == pg.K_DOWN:
+        self.camera.pan((0, step))
+      elif event.key in (pg.K_PLUS, pg.K_EQUALS, pg.K_KP_PLUS):
+        self.camera.zoom(1)
+      elif event.key in (pg.K_MINUS, pg.K_KP_MINUS):
+        self.camera.zoom(-1)
+      elif event.key == pg.K_f:
+        self.camera.following = not self.camera.following
+      elif event.key == pg.K_HOME:
+        self.camera.following = True
+        self.camera.setTileSize(self.camera.getFitTileSize())
 
   def _changeLevelState(self, state: int) -> None:
     """
@@ -690,6 +1073,7 @@ class Level():
         f"levelstate changed from '{LevelState.toStr(self.state)}' to '{LevelState.toStr(state)}'"
     )
     self.state = state
+    UpdateNotifier().notify()
 
   def startLevel(self) -> None:
     """
@@ -703,12 +1087,12 @@ class Level():
           f"can not start level: wrong state '{LevelState.toStr(self.state)}'"
       )
 
-  def waitOnRunning(self) -> None:
-    """Stops the thread, till the level has been started."""
-    if self.state == LevelState.INIT or self.state == LevelState.PAUSE:
-      # IOM.out(f"WAIT FOR '{GAME_START_EVENT.attr1}' or '{GAME_CONTINUE_EVENT.attr1}'")
-      while self.state == LevelState.INIT or self.state == LevelState.PAUSE:
-        sleep(0.07)
+  def _failAction(self) -> None:
+    """
+    Puts the level into the error state and raises an ActionExecutionError.
+    """
+    self._changeLevelState(LevelState.ERROR)
+    raise ActionExecutionError()
 
   def karelMove(self) -> None:
     """
@@ -717,11 +1101,11 @@ class Level():
     """
     if self.playable():
       if self.karelFrontIsClear():
-        self.world.rebuildTileAtKCS(self.karel.position)
+        oldPosition = Vector2f(*self.karel.position)
         self.karel.position += self.karel.orientation.vector
-        self.repaint()
+        self._publish(oldPosition, self.karel.position)
       else:
-        raise ActionExecutionError()
+        self._failAction()
     else:
       raise UnallowedActionError("karelMove")
 
@@ -731,9 +1115,8 @@ class Level():
     a Error is raised.
     """
     if self.playable():
-      self.world.rebuildTileAtKCS(self.karel.position)
       self.karel.rotate90()
-      self.repaint()
+      self._publish(self.karel.position)
     else:
       raise UnallowedActionError("karelTurnLeft")
 
@@ -744,12 +1127,11 @@ class Level():
     """
     if self.playable():
       if self.karelBeeperPresent():
-        self.world.getTileAtKCS(self.karel.position).decrBeepers()
+        self.world.editTileAtKCS(self.karel.position).decrBeepers()
         self.karel.incrBeeperbag()
-        self.world.repaintTileAtKCS(self.karel.position)
-        self.repaint()
+        self._publish(self.karel.position)
       else:
-        raise ActionExecutionError()
+        self._failAction()
     else:
       raise UnallowedActionError("karelPickBeeper")
 
@@ -760,12 +1142,11 @@ class Level():
     """
     if self.playable():
       if self.karelBeeperInBag():
-        self.world.getTileAtKCS(self.karel.position).incrBeepers()
+        self.world.editTileAtKCS(self.karel.position).incrBeepers()
         self.karel.decrBeeperbag()
-        self.world.repaintTileAtKCS(self.karel.position)
-        self.repaint()
+        self._publish(self.karel.position)
       else:
-        raise ActionExecutionError()
+        self._failAction()
     else:
       raise UnallowedActionError("karelPutBeeper")
 
@@ -902,12 +1283,19 @@ class LevelManager(metaclass=SingletonMeta):
   @extends  SingletonMeta
 
   @param  currentLevel  current level
+  @param  headless      True if Levels are loaded without a viewport
+  @param  turbo         True if Karel-Actions are not held back by the speed
+                        of the Level (turbo-mode)
   """
 
   currentLevel: Level
+  headless: bool
+  turbo: bool
 
   def __init__(self, level: Level = None) -> None:
     self.currentLevel = level
+    self.headless = False
+    self.turbo = False
 
   def setCurrentLevel(self, level: Level) -> None:
     """
@@ -0,0 +1,174 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from abc import ABC, abstractmethod
+from math import isinf
+from time import perf_counter
+
+# LOCAL IMPORT
+from constants import INFINITY, PACING_MAX_LAG, PACING_MAX_RATE, PACING_MIN_RATE
+
+# missing tokens, below which an action is applied right away (rounding of the
+# clock)
+_TOKEN_EPSILON = 1e-6
+
+
+class IClockInterface(ABC):
+  """Interface of a clock of the PacingScheduler"""
+
+  @abstractmethod
+  def now(self) -> float:
+    """
+    Returns the current time of the clock.
+
+    @return   time in s
+    """
+    raise NotImplementedError()
+
+  @abstractmethod
+  def skip(self, delay: float) -> bool:
+    """
+    Skips a wait of the PacingScheduler, if the clock allows it.
+
+    @param  delay   time to wait in s
+    @return         True if the time was skipped
+    """
+    raise NotImplementedError()
+
+
+class MonotonicClock(IClockInterface):
+  """
+  Real time (perf_counter), waits can not be skipped.
+
+  @extends  IClockInterface
+  """
+
+  def now(self) -> float:
+    return perf_counter()
+
+  def skip(self, delay: float) -> bool:
+    return False
+
+
+class VirtualClock(IClockInterface):
+  """
+  Virtual time for tests. The time only passes, when the PacingScheduler has to
+  wait, and then jumps right to the end of the wait. Paced runs are fast-
+  forwarded, while every action is applied at the same virtual time, at which
+  it would be applied in real time without any jitter.
+
+  @extends  IClockInterface
+
+  @param  _now  current virtual time in s
+  """
+
+  _now: float
+
+  def __init__(self, start: float = 0.0) -> None:
+    self._now = start
+
+  def now(self) -> float:
+    return self._now
+
+  def skip(self, delay: float) -> bool:
+    self._now += delay
+    return True
+
+
+class PacingScheduler():
+  """
+  Token-bucket, that paces Karel-Actions to a rate between PACING_MIN_RATE and
+  PACING_MAX_RATE per second. The bucket is refilled continuously from the
+  clock and every action takes one token, so the time between two actions is
+  not rounded to frames or timer-ticks. The bucket holds the tokens of at most
+  PACING_MAX_LAG s (at least one), so actions, that were held back by a slow
+  frame, catch up for at most that time.
+
+  @param  clock       clock, the bucket is refilled from
+  @param  rate        actions per second, INFINITY if they are not paced
+  @param  _tokens     actions, that can be applied right away
+  @param  _updatedAt  time of the clock, at which _tokens was refilled
+  """
+
+  clock: IClockInterface
+  rate: float
+  _tokens: float
+  _updatedAt: float
+
+  def __init__(self, clock: IClockInterface = None) -> None:
+    self.rate = INFINITY
+    self.setClock(MonotonicClock() if clock is None else clock)
+
+  def setClock(self, clock: IClockInterface) -> None:
+    """
+    Replaces the clock and refills the bucket with one token.
+
+    @param  clock   new clock
+    """
+    self.clock = clock
+    self._tokens = 1.0
+    self._updatedAt = clock.now()
+
+  def setRate(self, rate: float) -> None:
+    """
+    Sets the rate, the tokens collected so far are kept.
+
+    @param  rate  actions per second, INFINITY disables the pacing
+    """
+    if rate == self.rate:
+      return
+    self._refill()
+    if not isinf(rate):
+      rate = min(max(rate, PACING_MIN_RATE), PACING_MAX_RATE)
+    self.rate = rate
+
+  def getWaitTime(self) -> float:
+    """
+    Returns the time, till the next action can be applied. A VirtualClock
+    skips the wait.
+
+    @return   time in s, 0 if the next action can be applied now
+    """
+    self._refill()
+    missing = 1.0 - self._tokens
+    if missing <= _TOKEN_EPSILON:
+      return 0
+    wait = missing / self.rate
+    if self.clock.skip(wait):
+      self._refill()
+      self._tokens = max(self._tokens, 1.0)
+      return 0
+    return wait
+
+  def consume(self) -> None:
+    """Takes the token of an applied action."""
+    self._refill()
+    self._tokens -= 1.0
+
+  def _refill(self) -> None:
+    """Adds the tokens of the time since the last refill."""
+    now = self.clock.now()
+    if isinf(self.rate):
+      self._tokens = 1.0
+    else:
+      capacity = max(1.0, self.rate * PACING_MAX_LAG)
+      self._tokens = min(
+          capacity, self._tokens + (now - self._updatedAt) * self.rate
+      )
+    self._updatedAt = now
@@ -19,7 +19,9 @@
 # STL IMPORT
 from __future__ import annotations
 from abc import ABC, ABCMeta, abstractmethod
-from typing import Any, Dict, Iterable, Union, List
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Union, List
 
 
 def promiseList(val: Any) -> List[Any]:
@@ -117,18 +119,21 @@ class SingletonMeta(type):
 
 class SingletonFactoryMeta(type):
   """
-  Metaclass for Singletons that are identified through a string.
+  Metaclass for Singletons that are identified through a string (or any other
+  hashable first argument). Instances are stored per class, so different
+  classes can use the same identifier.
 
-  @param  _INSTANCES  dict of instances of class
+  @param  _INSTANCES  dict of instances of class, indexed by (class, identifier)
   """
 
   _INSTANCES: dict = {}
 
   def __call__(cls, *args: Any, **kwargs: Any) -> Any:
-    if not cls._INSTANCES.get(args[0]):
-      cls._INSTANCES[args[0]] = \
+    key = (cls, args[0])
+    if not cls._INSTANCES.get(key):
+      cls._INSTANCES[key] = \
         super(SingletonFactoryMeta, cls).__call__(*args, **kwargs)
-    return cls._INSTANCES.get(args[0])
+    return cls._INSTANCES.get(key)
 
 
 class Flag(metaclass=SingletonFactoryMeta):
@@ -147,6 +152,116 @@ class Flag(metaclass=SingletonFactoryMeta):
     return self.value
 
 
+class CacheInfo(NamedTuple):
+  """
+  Statistics of a LRUCache.
+
+  @param  hits      number of lookups, that were served from the cache
+  @param  misses    number of lookups, that had to create a new entry
+  @param  size      current number of entries
+  @param  capacity  maximum number of entries
+  """
+
+  hits: int
+  misses: int
+  size: int
+  capacity: int
+
+
+class LRUCache():
+  """
+  Bounded and threadsafe key-value-store. If the capacity is exceeded, the least
+  recently used entry will be evicted.
+
+  @param  capacity  maximum number of entries
+  @param  hits      number of lookups, that were served from the cache
+  @param  misses    number of lookups, that had to create a new entry
+  @param  _internal entries in order of their last usage
+  @param  _lock     lock for access from multiple threads
+  """
+
+  capacity: int
+  hits: int
+  misses: int
+  _internal: OrderedDict[Hashable, Any]
+  _lock: Lock
+
+  def __init__(self, capacity: int) -> None:
+    self.capacity = capacity
+    self.hits = 0
+    self.misses = 0
+    self._internal = OrderedDict()
+    self._lock = Lock()
+
+  def __len__(self) -> int:
+    return len(self._internal)
+
+  def __contains__(self, key: Hashable) -> bool:
+    return key in self._internal
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    """
+    Returns the value to a given key and marks it as recently used.
+
+    @param  key       key of entry
+    @param  default   value, that is returned if key does not exist
+    @return           value of entry or default
+    """
+    with self._lock:
+      if key in self._internal:
+        self.hits += 1
+        self._internal.move_to_end(key)
+        return self._internal[key]
+      self.misses += 1
+      return default
+
+  def put(self, key: Hashable, value: Any) -> None:
+    """
+    Inserts a value into the cache and evicts the least recently used entry, if
+    capacity is exceeded.
+
+    @param  key     key of entry
+    @param  value   value of entry
+    """
+    with self._lock:
+      self._internal[key] = value
+      self._internal.move_to_end(key)
+      while len(self._internal) > self.capacity:
+        self._internal.popitem(last=False)
+
+  def getOrCreate(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+    """
+    Returns the value to a given key. If the key does not exist, the value will
+    be created by factory and inserted into the cache.
+
+    @param  key       key of entry
+    @param  factory   function without arguments, that creates the value
+    @return           value of entry
+    """
+    with self._lock:
+      if key in self._internal:
+        self.hits += 1
+        self._internal.move_to_end(key)
+        return self._internal[key]
+      self.misses += 1
+    value = factory()
+    self.put(key, value)
+    return value
+
+  def clear(self) -> None:
+    """Removes all entries from the cache. Counters will not be reset."""
+    with self._lock:
+      self._internal.clear()
+
+  def info(self) -> CacheInfo:
+    """
+    Returns the statistics of the cache.
+
+    @return   statistics as CacheInfo
+    """
+    return CacheInfo(self.hits, self.misses, len(self._internal), self.capacity)
+
+
 class Vector2f():
 
   x: float = None
@@ -0,0 +1,597 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from multiprocessing.connection import Connection
+from multiprocessing import resource_tracker
+from multiprocessing.process import BaseProcess
+from multiprocessing.shared_memory import SharedMemory
+import struct
+from time import sleep
+from typing import Any, List, NamedTuple, Tuple, Union
+
+# LIBRARY IMPORT
+import numpy as np
+import pygame as pg
+from pygame import Rect, Surface
+from pygame.event import Event
+
+# LOCAL IMPORT
+from command import CommandQueue, GameLoadWorldCommand
+from constants import REMOTE_MAPNAME_SIZE, REMOTE_POLL_INTERVAL, SESSION_PREFIX
+from game import Level, LevelManager, LevelState
+from pyadditions.io import IOM
+from view.scene import ISceneInterface, SceneManager
+
+# header of the shared state: seq, generation, version, beeperVersion, width,
+# height, karel x, karel y, karel orientation, beeperbag, level state, render-
+# mode, mapname
+_HEADER = struct.Struct(f"<QQQQIIddddii{REMOTE_MAPNAME_SIZE}s")
+_SEQ = struct.Struct("<Q")
+
+
+def _createBlock(name: Union[str, None], size: int) -> SharedMemory:
+  """
+  Creates a block of shared memory. A block with the same name, that was left
+  behind by a crashed process, is replaced.
+
+  @param  name  name of the block, None for a random name
+  @param  size  size of the block in bytes
+  @return       created block
+  """
+  try:
+    return SharedMemory(name=name, create=True, size=size)
+  except FileExistsError:
+    IOM.debug(f"replacing stale shared memory '{name}'")
+    stale = SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+    return SharedMemory(name=name, create=True, size=size)
+
+
+def _attachBlock(name: str, track: bool) -> SharedMemory:
+  """
+  Attaches to an existing block of shared memory.
+
+  @param  name    name of the block
+  @param  track   False removes the block from the resource-tracker of this
+                  process, which would otherwise remove the block on exit,
+                  even though another process owns it
+  @return         attached block
+  """
+  block = SharedMemory(name=name)
+  if not track:
+    resource_tracker.unregister(block._name, "shared_memory")
+  return block
+
+
+def getSessionName(port: int) -> str:
+  """
+  Returns the name of the SharedLevelState of a published session.
+
+  @param  port  port of the server of the session
+  @return       name of the header block
+  """
+  return f"{SESSION_PREFIX}{port}"
+
+
+class RemoteLevelState(NamedTuple):
+  """
+  State of the Level of the simulation-process, as read from shared memory.
+
+  @extends  NamedTuple
+  @param    generation        number of the loaded Level, 0 if none was loaded
+  @param    version           version of the LevelSnapshot
+  @param    mapname           name of the map of the Level
+  @param    state             state of the Level as LevelState
+  @param    renderMode        render-mode of the Level as RenderMode
+  @param    karelPosition     cordinate of Karel in KCS
+  @param    karelOrientation  angle of the compass-direction, Karel is looking
+  @param    karelBeeperbag    num of beepers available to Karel
+  @param    beepers           copy of the beeper array of the World as [gy, gx]
+  """
+
+  generation: int
+  version: int
+  mapname: str
+  state: int
+  renderMode: int
+  karelPosition: Tuple[float, float]
+  karelOrientation: float
+  karelBeeperbag: float
+  beepers: np.ndarray
+
+
+class SharedLevelState():
+  """
+  State of the current Level in shared memory, written by the simulation-
+  process and read by the render-process. The header block is guarded by a
+  sequence-lock: the writer makes the sequence odd before and even after
+  writing, the reader retries till it read the same even sequence before and
+  after copying. Neither side ever blocks the other one.
+
+  The beeper array lives in a data block per loaded Level, which is named
+  after the header block and the generation. Walls never change, so the
+  render-process loads them from the same map. A published session (see
+  SessionPublisher) is written under a fixed name, so that any number of
+  readers can attach to it by name.
+
+  @param  name            name of the header block
+  @param  _header         header block
+  @param  _data           data block of the current generation
+  @param  _owner          True if this process created the blocks (writer)
+  @param  _track          False if the blocks are not registered with the
+                          resource-tracker of this process (reader)
+  @param  _seq            last written sequence (writer)
+  @param  _generation     generation of _data
+  @param  _beeperVersion  version of the beepers in _data
+  @param  _level          last written Level (writer)
+  @param  _written        (version, state, render-mode) of the last write
+                          (writer)
+  @param  _beepers        last written beeper array (writer) or last read copy
+                          (reader)
+  """
+
+  name: str
+  _header: SharedMemory
+  _data: SharedMemory
+  _owner: bool
+  _track: bool
+  _seq: int
+  _generation: int
+  _beeperVersion: int
+  _level: Level
+  _written: Tuple[int, int, int]
+  _beepers: np.ndarray
+
+  def __init__(
+      self, name: str = None, create: bool = False, track: bool = True
+  ) -> None:
+    """
+    constructor
+
+    @param  name    name of an existing header block to read from, None creates
+                    a new one to write to
+    @param  create  creates a header block with name to write to
+    @param  track   False for readers, that were not started by the writer
+                    (e.g. the dashboard), see _attachBlock
+    """
+    self._owner = name is None or create
+    self._track = track or self._owner
+    if self._owner:
+      self._header = _createBlock(name, _HEADER.size)
+      self._header.buf[:_HEADER.size] = bytes(_HEADER.size)
+    else:
+      self._header = _attachBlock(name, self._track)
+    self.name = self._header.name
+    self._data = None
+    self._seq = 0
+    self._generation = 0
+    self._beeperVersion = 0
+    self._level = None
+    self._written = None
+    self._beepers = None
+
+  def getSequence(self) -> int:
+    """
+    Returns the current sequence, which changes on every write.
+
+    @return   sequence of the header block
+    """
+    return _SEQ.unpack_from(self._header.buf)[0]
+
+  def publish(self, level: Level) -> None:
+    """
+    Writes the latest LevelSnapshot and the state of a Level, if they changed
+    since the last call. Has to be called from a single thread.
+
+    @param  level   current Level
+    """
+    snapshot = level.getSnapshot()
+    written = (snapshot.version, level.state, level.renderMode)
+    if level is self._level and written == self._written:
+      return
+
+    if level is not self._level:
+      self._allocate(level)
+    self._written = written
+
+    self._seq += 1
+    _SEQ.pack_into(self._header.buf, 0, self._seq)
+    if snapshot.beepers is not self._beepers:
+      self._beepers = snapshot.beepers
+      self._beeperVersion += 1
+      self._getDataView()[:] = snapshot.beepers
+    (height, width) = snapshot.beepers.shape
+    _HEADER.pack_into(
+        self._header.buf, 0, self._seq, self._generation, snapshot.version,
+        self._beeperVersion, width, height, *snapshot.karelPosition,
+        snapshot.karelOrientation.angle, snapshot.karelBeeperbag, level.state,
+        level.renderMode, level.mapname.encode()
+    )
+    self._seq += 1
+    _SEQ.pack_into(self._header.buf, 0, self._seq)
+
+  def _allocate(self, level: Level) -> None:
+    """
+    Creates the data block for a newly loaded Level and removes the old one.
+
+    @param  level   newly loaded Level
+    """
+    if len(level.mapname.encode()) > REMOTE_MAPNAME_SIZE:
+      raise ValueError(f"mapname '{level.mapname}' is too long")
+    oldData = self._data
+    self._generation += 1
+    self._data = _createBlock(
+        f"{self.name}_{self._generation}", max(1, level.world.beepers.nbytes)
+    )
+    if oldData is not None:
+      oldData.close()
+      oldData.unlink()
+    (self._level, self._beepers) = (level, None)
+
+  def _getDataView(self) -> np.ndarray:
+    """
+    Returns the beeper array in the data block (writer). The view MUST NOT
+    outlive the call, as the block can not be closed while it is referenced.
+
+    @return   view on the data block as [gy, gx]
+    """
+    shape = self._level.world.beepers.shape
+    return np.ndarray(shape, dtype=np.int64, buffer=self._data.buf)
+
+  def read(self) -> Union[RemoteLevelState, None]:
+    """
+    Reads a consistent state of the Level. The beeper array is only copied,
+    if it changed since the last call.
+
+    @return   state of the Level, None if no Level was loaded yet
+    """
+    while True:
+      seq = self.getSequence()
+      if seq & 1:
+        sleep(0)
+        continue
+
+      (
+          _, generation, version, beeperVersion, width, height, x, y, angle,
+          beeperbag, state, renderMode, mapname
+      ) = _HEADER.unpack_from(self._header.buf)
+      if generation == 0:
+        return None
+
+      beepers = self._beepers
+      if (generation, beeperVersion) != (self._generation, self._beeperVersion):
+        try:
+          beepers = self._readBeepers(generation, (height, width))
+        except FileNotFoundError:
+          # the writer moved on to the next Level already
+          continue
+
+      if self.getSequence() != seq:
+        continue
+      (self._beeperVersion, self._beepers) = (beeperVersion, beepers)
+      return RemoteLevelState(
+          generation, version,
+          mapname.rstrip(b"\0").decode(), state, renderMode, (x, y), angle,
+          beeperbag, beepers
+      )
+
+  def _readBeepers(self, generation: int, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Copies the beeper array out of the data block of a generation.
+
+    @param  generation  generation of the data block
+    @param  shape       shape of the beeper array
+    @return             copy of the beeper array
+    """
+    if generation != self._generation:
+      data = _attachBlock(f"{self.name}_{generation}", self._track)
+      if self._data is not None:
+        self._data.close()
+      (self._data, self._generation) = (data, generation)
+    return np.ndarray(shape, dtype=np.int64, buffer=self._data.buf).copy()
+
+  def close(self) -> None:
+    """
+    Closes the shared memory. The writer also removes it, readers, that are
+    still attached, read that no Level is loaded.
+    """
+    if self._owner:
+      self._seq += 1
+      _SEQ.pack_into(self._header.buf, 0, self._seq)
+      self._header.buf[_SEQ.size:_HEADER.size] = bytes(_HEADER.size - _SEQ.size)
+      self._seq += 1
+      _SEQ.pack_into(self._header.buf, 0, self._seq)
+    for block in (self._data, self._header):
+      if block is not None:
+        block.close()
+        if self._owner:
+          block.unlink()
+    self._data = None
+
+
+class SessionPublisher():
+  """
+  Publishes the current Level of this process as session under the port of
+  its server, so that a dashboard in another process can show it (see
+  dashboard.py). Is updated by the loop, that applies the commands.
+
+  @param  _shared   state, that is read by the dashboard
+  """
+
+  _shared: SharedLevelState
+
+  def __init__(self, port: int) -> None:
+    self._shared = SharedLevelState(getSessionName(port), create=True)
+    IOM.debug(f"publishing session as '{self._shared.name}'")
+
+  def update(self) -> None:
+    """
+    Publishes the current Level, if it changed. Has to be called from the
+    main-thread.
+    """
+    level = LevelManager().getCurrentLevel()
+    if level is not None:
+      self._shared.publish(level)
+
+  def close(self) -> None:
+    """Removes the session."""
+    self._shared.close()
+
+
+class RemoteScene(ISceneInterface):
+  """
+  GameScene of the simulation-process. Nothing is rendered, ErrorWindows are
+  forwarded to the render-process.
+
+  @extends  ISceneInterface
+
+  @param  _conn   connection to the render-process
+  """
+
+  _conn: Connection
+
+  def __init__(self, conn: Connection) -> None:
+    self._conn = conn
+
+  def reset(self) -> None:
+    pass
+
+  def showErrorWindow(self, title: str, content: str) -> None:
+    self._conn.send(("error", (title, content)))
+
+  def render(self, screen: Surface) -> None:
+    pass
+
+  def update(self, **kwargs) -> Union[Any, None]:
+    pass
+
+  def proccessEvent(self, event: Event) -> Union[Any, None]:
+    pass
+
+  def getDirtyRects(self) -> List[Rect]:
+    return []
+
+  def dispose(self) -> None:
+    pass
+
+
+class Simulation():
+  """
+  Headless gameloop of the simulation-process. It applies the commands of the
+  client to a headless Level and publishes its state to the SharedLevelState
+  after every batch. The start-button, speed-slider and turbo-button of the
+  render-process arrive as messages over the pipe, a turbo-mode set by the
+  client is sent back.
+
+  @param  _shared   state, that is read by the render-process
+  @param  _conn     connection to the render-process
+  @param  _turbo    turbo-mode known to the render-process
+  """
+
+  _shared: SharedLevelState
+  _conn: Connection
+  _turbo: bool
+
+  def __init__(self, shared: SharedLevelState, conn: Connection) -> None:
+    self._shared = shared
+    self._conn = conn
+    self._turbo = LevelManager().turbo
+
+  def run(self, renderProcess: BaseProcess) -> None:
+    """
+    Runs the loop till the render-process quits.
+
+    @param  renderProcess   process, that renders the Level
+    """
+    commandQueue = CommandQueue()
+    while renderProcess.is_alive() and self._processMessages():
+      commandQueue.waitAndProcess(REMOTE_POLL_INTERVAL)
+      level = LevelManager().getCurrentLevel()
+      if level is not None:
+        self._shared.publish(level)
+      if LevelManager().turbo != self._turbo:
+        self._turbo = LevelManager().turbo
+        self._conn.send(("turbo", self._turbo))
+
+  def _processMessages(self) -> bool:
+    """
+    Applies the messages of the render-process.
+
+    @return   False if the render-process quit
+    """
+    try:
+      while self._conn.poll():
+        (kind, value) = self._conn.recv()
+        level = LevelManager().getCurrentLevel()
+        if kind == "quit":
+          return False
+        elif kind == "start" and level.state == LevelState.INIT:
+          level._changeLevelState(LevelState.RUNNING)
+        elif kind == "speed":
+          level.speed = value
+        elif kind == "turbo":
+          (LevelManager().turbo, self._turbo) = (value, value)
+    except (EOFError, OSError):
+      return False
+    return True
+
+
+class LevelMirror():
+  """
+  Mirrors the Level of the simulation-process in the render-process. It
+  replaces the CommandQueue in the gameloop (same 'getWaitTime' and 'process'),
+  so the Level is still only touched by the main-thread. Changed Tiles are
+  found by comparing the beeper arrays, so only they are repainted.
+
+  @param  _shared         state, that is written by the simulation-process
+  @param  _conn           connection to the simulation-process
+  @param  _seq            sequence of the last applied state
+  @param  _generation     generation of the mirrored Level
+  @param  _version        version of the last applied LevelSnapshot
+  @param  _mirroredState  last LevelState taken over from the simulation
+  @param  _localState     LevelState of the mirrored Level after the last call
+  @param  _speed          last speed sent to the simulation
+  @param  _turbo          turbo-mode known to the simulation
+  """
+
+  _shared: SharedLevelState
+  _conn: Connection
+  _seq: int
+  _generation: int
+  _version: int
+  _mirroredState: int
+  _localState: int
+  _speed: float
+  _turbo: bool
+
+  def __init__(self, shared: SharedLevelState, conn: Connection) -> None:
+    self._shared = shared
+    self._conn = conn
+    self._seq = None
+    self._generation = 0
+    self._version = None
+    self._mirroredState = None
+    self._localState = None
+    self._speed = None
+    self._turbo = LevelManager().turbo
+
+  def getWaitTime(self) -> float:
+    """
+    Returns the time, till the state of the simulation should be read again.
+
+    @return   time in s, 0 if the state or messages changed
+    """
+    if self._shared.getSequence() != self._seq or self._conn.poll():
+      return 0
+    return REMOTE_POLL_INTERVAL
+
+  def process(self, budget: float) -> int:
+    """
+    Takes over the latest state of the simulation and forwards the local input
+    (start-button, speed-slider and turbo-button). While the render-mode
+    suppresses rendering, Karel and the Beepers are not taken over.
+
+    @param  budget  time in s, till the next frame is due (unused)
+    @return         number of applied states
+    """
+    try:
+      self._processMessages()
+    except (EOFError, OSError):
+      IOM.debug("simulation-process quit")
+      pg.event.post(Event(pg.QUIT))
+      return 0
+
+    self._seq = self._shared.getSequence()
+    remote = self._shared.read()
+    if remote is None:
+      return 0
+    if remote.generation != self._generation and not self._load(remote):
+      return 0
+
+    level = LevelManager().getCurrentLevel()
+    self._forwardInput(level)
+    if remote.state != self._mirroredState:
+      self._mirroredState = remote.state
+      level._changeLevelState(remote.state)
+    self._localState = level.state
+    if remote.renderMode != level.renderMode:
+      level.setRenderMode(remote.renderMode)
+    if remote.version == self._version or not level.isRendered():
+      return 0
+    self._version = remote.version
+    level.applyState(
+        remote.karelPosition, remote.karelOrientation, remote.karelBeeperbag,
+        remote.beepers
+    )
+    return 1
+
+  def _load(self, remote: RemoteLevelState) -> bool:
+    """
+    Loads the map of a new Level of the simulation and shows the GameScene. If
+    the map can not be loaded, it is tried again on the next call of process.
+
+    @param  remote  state of the new Level
+    @return         True if the map was loaded
+    """
+    result = GameLoadWorldCommand(None, {"map": remote.mapname}).execute()
+    if result.data is not None:
+      IOM.error(f"could not mirror map '{remote.mapname}': {result.data}")
+      return False
+    self._generation = remote.generation
+    self._version = None
+    self._mirroredState = LevelManager().getCurrentLevel().state
+    self._localState = self._mirroredState
+    self._speed = None
+    return True
+
+  def _forwardInput(self, level: Level) -> None:
+    """
+    Sends the changes of the local input to the simulation.
+
+    @param  level   mirrored Level
+    """
+    if level.state != self._localState and level.state == LevelState.RUNNING:
+      self._conn.send(("start", None))
+    if level.speed != self._speed:
+      self._speed = level.speed
+      self._conn.send(("speed", level.speed))
+    if LevelManager().turbo != self._turbo:
+      self._turbo = LevelManager().turbo
+      self._conn.send(("turbo", self._turbo))
+
+  def _processMessages(self) -> None:
+    """
+    Applies the messages of the simulation (e.g. ErrorWindows or a turbo-mode
+    set by the client).
+    """
+    while self._conn.poll():
+      (kind, value) = self._conn.recv()
+      if kind == "error":
+        SceneManager().getScene().showErrorWindow(*value)
+      elif kind == "turbo":
+        (LevelManager().turbo, self._turbo) = (value, value)
+
+  def close(self) -> None:
+    """Tells the simulation to quit and closes the shared memory."""
+    try:
+      self._conn.send(("quit", None))
+    except OSError:
+      pass
+    self._shared.close()
@@ -27,6 +27,7 @@ import atexit
 
 # LOCAL IMPORT
 import rpc
+from command import CommandQueue
 from pyadditions.types import Interface, NotInstanceable, interfacemethod
 from pyadditions.io import IOM
 from constants import UTF8, MAX_CONNECTIONS, UDP_MAX_PKG_SIZE, TCP_MAX_PKG_SIZE
@@ -273,8 +274,10 @@ class ServerThread(threading.Thread):
     while running:
       (data, sender) = self._server.recv()
       if data:
+        # commands are applied by the gameloop, this thread only waits
         command = rpc.createCommandFromStr(data)
-        resultStr = rpc.createRPCStrFromCommandResult(command.execute())
+        result = CommandQueue().submit(command)
+        resultStr = rpc.createRPCStrFromCommandResult(result)
         self._server.send(resultStr, sender)
       else:
         running = False
@@ -18,7 +18,14 @@
 
 # LOCAL IMPORT
 from . import elements
+from . import dirty
+from . import quality
+from . import camera
+from . import raster
+from . import layercache
 from . import overlay
 from . import window
 from . import menu
 from . import scene
+from . import headless
+from . import snapshot
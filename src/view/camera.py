@@ -0,0 +1,366 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from typing import List, Tuple
+
+# LIBRARY IMPORT
+import numpy as np
+import pygame as pg
+from pygame import Rect, Surface
+
+# LOCAL IMPORT
+from assets.color import HexColor
+from constants import MINIMAP_SIZE, TILE_SIZE, ZOOM_TILE_SIZES
+from pyadditions.types import Vector2f
+from .quality import QualityGovernor
+
+
+class Camera():
+  """
+  Describes the visible part of the World. All positions of the camera are in
+  grid-cordinates, which are measured in tiles with (0, 0) at the top-left
+  corner of the World (GRID(x, y) is KCS(x + 1, height - y)).
+
+  @param  viewSize    size of the viewport in px
+  @param  worldSize   size of the World in tiles
+  @param  tileSize    current size of a tile in px
+  @param  center      grid-cordinate in the center of the viewport
+  @param  following   True if the camera follows Karel
+  @param  _zoomSteps  available tile-sizes, smallest shows the whole World
+  """
+
+  viewSize: Vector2f
+  worldSize: Vector2f
+  tileSize: int
+  center: Vector2f
+  following: bool
+  _zoomSteps: List[int]
+
+  def __init__(self, viewSize: Vector2f, worldSize: Vector2f) -> None:
+    self.viewSize = Vector2f(int(viewSize.x), int(viewSize.y))
+    self.worldSize = worldSize
+    self.following = True
+
+    fitSize = int(
+        min(viewSize.x / worldSize.x, viewSize.y / worldSize.y, TILE_SIZE)
+    )
+    fitSize = max(1, fitSize)
+    self._zoomSteps = sorted(
+        {size for size in ZOOM_TILE_SIZES if size > fitSize} | {fitSize}
+    )
+    self.tileSize = fitSize
+    self.center = worldSize / 2
+
+  def getFitTileSize(self) -> int:
+    """
+    Returns the tile-size, at which the whole World is visible.
+
+    @return   tile-size in px
+    """
+    return self._zoomSteps[0]
+
+  def showsWholeWorld(self) -> bool:
+    """
+    Checks if the whole World is visible in the viewport.
+
+    @return   True if the whole World is visible
+    """
+    return self.worldSize.x * self.tileSize <= self.viewSize.x and \
+      self.worldSize.y * self.tileSize <= self.viewSize.y
+
+  def getOffset(self) -> Tuple[int, int]:
+    """
+    Returns the position of the top-left corner of the viewport relative to the
+    top-left corner of the World in px. If the World is smaller than the
+    viewport, it will be centered.
+
+    @return   offset in px
+    """
+    offset = []
+    for axis in range(2):
+      worldPx = self.worldSize[axis] * self.tileSize
+      viewPx = self.viewSize[axis]
+      if worldPx <= viewPx:
+        offset.append((worldPx-viewPx) // 2)
+      else:
+        pos = int(self.center[axis] * self.tileSize - viewPx/2)
+        offset.append(min(max(pos, 0), worldPx - viewPx))
+    return tuple(offset)
+
+  def getVisibleRange(self) -> Tuple[int, int, int, int]:
+    """
+    Returns the range of grid-cordinates, that intersect with the viewport.
+
+    @return   (x0, y0, x1, y1) with x1 and y1 exclusive
+    """
+    (ox, oy) = self.getOffset()
+    ts = self.tileSize
+    return (
+        max(0, ox // ts), max(0, oy // ts),
+        min(int(self.worldSize.x), -(-(ox + self.viewSize.x) // ts)),
+        min(int(self.worldSize.y), -(-(oy + self.viewSize.y) // ts))
+    )
+
+  def getTileRect(self, gx: int, gy: int) -> Rect:
+    """
+    Returns the bounds of a tile in the viewport.
+
+    @param  gx  grid-x-cordinate of tile
+    @param  gy  grid-y-cordinate of tile
+    @return     bounds in px relative to the viewport
+    """
+    (ox, oy) = self.getOffset()
+    ts = self.tileSize
+    return Rect(gx*ts - ox, gy*ts - oy, ts, ts)
+
+  def getWorldRect(self) -> Rect:
+    """
+    Returns the bounds of the World in the viewport.
+
+    @return   bounds in px relative to the viewport
+    """
+    (ox, oy) = self.getOffset()
+    return Rect(
+        -ox, -oy, self.worldSize.x * self.tileSize,
+        self.worldSize.y * self.tileSize
+    )
+
+  def viewToGrid(self, pos: Tuple[float, float]) -> Vector2f:
+    """
+    Converts a position in the viewport to a grid-cordinate.
+
+    @param  pos   position in px relative to the viewport
+    @return       grid-cordinate (not rounded)
+    """
+    (ox, oy) = self.getOffset()
+    return Vector2f(
+        (pos[0] + ox) / self.tileSize, (pos[1] + oy) / self.tileSize
+    )
+
+  def _clamp(self) -> None:
+    """Moves center, so that the viewport does not leave the World."""
+    center = []
+    for axis in range(2):
+      halfView = self.viewSize[axis] / self.tileSize / 2
+      worldSize = self.worldSize[axis]
+      if 2 * halfView >= worldSize:
+        center.append(worldSize / 2)
+      else:
+        center.append(
+            min(max(self.center[axis], halfView), worldSize - halfView)
+        )
+    self.center = Vector2f(*center)
+
+  def centerOn(self, pos: Tuple[float, float]) -> None:
+    """
+    Centers the viewport on a grid-cordinate.
+
+    @param  pos   grid-cordinate
+    """
+    self.center = Vector2f(pos[0], pos[1])
+    self._clamp()
+
+  def pan(self, delta: Tuple[float, float]) -> None:
+    """
+    Moves the viewport by delta px and stops following Karel.
+
+    @param  delta   movement in px
+    """
+    self.following = False
+    self.centerOn(self.center + Vector2f(*delta) / self.tileSize)
+
+  def zoom(self, steps: int, anchor: Tuple[float, float] = None) -> None:
+    """
+    Zooms in (steps > 0) or out (steps < 0) by steps zoom-steps. The grid-
+    cordinate at anchor will stay at the same position in the viewport.
+
+    @param  steps   number of zoom-steps
+    @param  anchor  position in px relative to the viewport, default: center
+    """
+    index = self._zoomSteps.index(self.tileSize) + steps
+    index = min(max(index, 0), len(self._zoomSteps) - 1)
+    self.setTileSize(self._zoomSteps[index], anchor)
+
+  def setTileSize(
+      self, tileSize: int, anchor: Tuple[float, float] = None
+  ) -> None:
+    """
+    Sets the tile-size. The grid-cordinate at anchor will stay at the same
+    position in the viewport.
+
+    @param  tileSize  new tile-size in px
+    @param  anchor    position in px relative to the viewport, default: center
+    """
+    if anchor is None:
+      anchor = self.viewSize / 2
+    anchorGrid = self.viewToGrid(anchor)
+    self.tileSize = tileSize
+    self.center = anchorGrid - (
+        Vector2f(*anchor) - self.viewSize / 2
+    ) / tileSize
+    self._clamp()
+
+  def follow(self, pos: Tuple[float, float]) -> None:
+    """
+    Centers the viewport on a grid-cordinate, if the camera is following and
+    the tile at pos is not completely inside the viewport.
+
+    @param  pos   grid-cordinate of the followed tile
+    """
+    if self.following:
+      tileRect = self.getTileRect(*pos)
+      if not Rect((0, 0), tuple(self.viewSize)).contains(tileRect):
+        self.centerOn((pos[0] + 0.5, pos[1] + 0.5))
+
+  def getState(self) -> Tuple[int, Tuple[int, int]]:
+    """
+    Returns the state of the camera, which changes, if the viewport shows
+    another part of the World.
+
+    @return   (tileSize, offset)
+    """
+    return (self.tileSize, self.getOffset())
+
+
+class Minimap():
+  """
+  Low-resolution map of the World with one px per tile, which is scaled down to
+  fit into MINIMAP_SIZE. The visible part of the World is marked with a
+  rectangle.
+
+  @param  FLOOR_COLOR   color of an empty tile
+  @param  WALL_COLOR    color of a tile with walls
+  @param  BEEPER_COLOR  color of a tile with beepers
+  @param  KAREL_COLOR   color of the tile of Karel and the viewport-rectangle
+  @param  rect          bounds of the minimap relative to the level
+  @param  _walls        wall-mask array of the World as [gy, gx]
+  @param  _palette      colors of floor, wall and beeper tiles as [index, rgb]
+  @param  _base         map with one px per tile
+  @param  _scaled       _base scaled to the size of rect, None if outdated
+  """
+
+  FLOOR_COLOR = HexColor("#ffffff")
+  WALL_COLOR = HexColor("#404040")
+  BEEPER_COLOR = HexColor("#8a8a8a")
+  KAREL_COLOR = HexColor("#ff0000")
+
+  rect: Rect
+  _walls: np.ndarray
+  _palette: np.ndarray
+  _base: Surface
+  _scaled: Surface
+
+  def __init__(self, walls: np.ndarray, beepers: np.ndarray) -> None:
+    """
+    constructor
+
+    @param  walls     wall-mask array of the World as [gy, gx]
+    @param  beepers   beeper array of the World as [gy, gx]
+    """
+    self._walls = walls
+    self._palette = np.array(
+        [
+            tuple(color)[:3]
+            for color in (self.FLOOR_COLOR, self.WALL_COLOR, self.BEEPER_COLOR)
+        ],
+        dtype=np.uint8
+    )
+    self.rebuild(beepers)
+
+    (height, width) = walls.shape
+    ratio = min(MINIMAP_SIZE / width, MINIMAP_SIZE / height)
+    self.rect = Rect(0, 0, max(1, width * ratio), max(1, height * ratio))
+
+  def rebuild(self, beepers: np.ndarray) -> None:
+    """
+    Updates the colors of all tiles from the walls of the World and a beeper
+    array.
+
+    @param  beepers   beeper array of the World as [gy, gx]
+    """
+    index = np.where(beepers > 0, 2, np.where(self._walls > 0, 1, 0))
+    self._base = pg.surfarray.make_surface(self._palette[index.T])
+    self._scaled = None
+
+  def updateTile(self, pos: Tuple[int, int], beepers: np.ndarray) -> None:
+    """
+    Updates the color of a tile from the walls of the World and a beeper array.
+
+    @param  pos       grid-cordinate of tile
+    @param  beepers   beeper array of the World as [gy, gx]
+    """
+    (gx, gy) = pos
+    if beepers[gy, gx] > 0:
+      color = self.BEEPER_COLOR
+    elif self._walls[gy, gx]:
+      color = self.WALL_COLOR
+    else:
+      color = self.FLOOR_COLOR
+    self._base.set_at(pos, color)
+    self._scaled = None
+
+  def render(
+      self, destSurf: Surface, camera: Camera, karelPos: Tuple[int, int]
+  ) -> None:
+    """
+    Renders the minimap with the viewport-rectangle and Karel.
+
+    @param  destSurf  destination-surface
+    @param  camera    camera of the viewport
+    @param  karelPos  grid-cordinate of Karel
+    """
+    if self._scaled is None:
+      # tiles are averaged on downscaling, upscaling keeps sharp tiles
+      if self.rect.width < self._base.get_width():
+        self._scaled = QualityGovernor().scale(self._base, self.rect.size)
+      else:
+        self._scaled = pg.transform.scale(self._base, self.rect.size)
+    destSurf.blit(self._scaled, self.rect)
+
+    scale = Vector2f(
+        self.rect.width / self._base.get_width(),
+        self.rect.height / self._base.get_height()
+    )
+    (x0, y0, x1, y1) = camera.getVisibleRange()
+    viewRect = Rect(
+        self.rect.x + x0 * scale.x, self.rect.y + y0 * scale.y,
+        max(2, (x1-x0) * scale.x), max(2, (y1-y0) * scale.y)
+    )
+    pg.draw.rect(destSurf, self.KAREL_COLOR, viewRect, 1)
+    karelRect = Rect(
+        self.rect.x + karelPos[0] * scale.x,
+        self.rect.y + karelPos[1] * scale.y, max(2, scale.x), max(2, scale.y)
+    )
+    pg.draw.rect(destSurf, self.KAREL_COLOR, karelRect)
+    pg.draw.rect(destSurf, HexColor("#000000"), self.rect.inflate(2, 2), 1)
+
+  def collidepoint(self, pos: Tuple[float, float]) -> bool:
+    return self.rect.collidepoint(pos)
+
+  def toGrid(self, pos: Tuple[float, float]) -> Vector2f:
+    """
+    Converts a position on the minimap to a grid-cordinate.
+
+    @param  pos   position in px relative to the level
+    @return       grid-cordinate
+    """
+    return Vector2f(
+        (pos[0] - self.rect.x) / self.rect.width * self._base.get_width(),
+        (pos[1] - self.rect.y) / self.rect.height * self._base.get_height()
+    )
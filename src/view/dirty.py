@@ -0,0 +1,84 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from typing import FrozenSet, List, Tuple
+
+# LIBRARY IMPORT
+from pygame import Rect, Surface
+from pygame_gui.ui_manager import UIManager
+
+# the number of dirty rects, after which they will be merged into one
+MAX_DIRTY_RECTS = 8
+
+
+def mergeRects(rects: List[Rect]) -> List[Rect]:
+  """
+  Merges overlapping rects, so that no region will be redrawn twice. If there
+  are still more than MAX_DIRTY_RECTS left, they will be merged into one.
+
+  @param  rects   list of dirty rects
+  @return         list of non-overlapping dirty rects
+  """
+  merged = []
+  for rect in rects:
+    rect = Rect(rect)
+    if rect.width <= 0 or rect.height <= 0:
+      continue
+    i = rect.collidelist(merged)
+    while i != -1:
+      rect.union_ip(merged.pop(i))
+      i = rect.collidelist(merged)
+    merged.append(rect)
+
+  if len(merged) > MAX_DIRTY_RECTS:
+    return [merged[0].unionall(merged[1:])]
+  return merged
+
+
+class UIDirtyTracker():
+  """
+  Tracks the visible sprites of a UIManager between frames. pygame_gui replaces
+  the image of an element, if it changes its appearance, so comparing images
+  and positions of the visible sprites is enough to find the changed regions.
+
+  @param  _manager  tracked UIManager
+  @param  _last     visible sprites of the last call as (image, rect)
+  """
+
+  _manager: UIManager
+  _last: FrozenSet[Tuple[Surface, Tuple[int, int, int, int]]]
+
+  def __init__(self, manager: UIManager) -> None:
+    self._manager = manager
+    self._last = frozenset()
+
+  def getDirtyRects(self) -> List[Rect]:
+    """
+    Returns the regions of the screen, where sprites have appeared, changed or
+    disappeared since the last call.
+
+    @return   list of dirty rects
+    """
+    current = frozenset(
+        (blitData[0], tuple(blitData[1]))
+        for blitData in self._manager.get_sprite_group().visible
+    )
+    changed = current.symmetric_difference(self._last)
+    self._last = current
+    return [Rect(rect) for (_, rect) in changed]
@@ -26,6 +26,9 @@ from pygame_gui.core import ObjectID
 from pygame_gui.core.interfaces import IContainerLikeInterface, IUIManagerInterface
 from pygame_gui.core import UIElement
 
+# LOCAL-IMPORT
+import assets
+
 
 class GLabel(UILabel):
   """
@@ -87,6 +90,7 @@ class GLabel(UILabel):
     if text != self.text:
       self.text = text
       if self.dynamicSize:
-        self.set_dimensions(self.font.size(text))  # rebuilds in proccess
+        # rebuilds in proccess
+        self.set_dimensions(assets.text.size(self.font, text))
       else:
         self.rebuild()
@@ -0,0 +1,309 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+import re
+import shutil
+from time import perf_counter
+from typing import Any, List, TextIO, Tuple, Union
+
+# LIBRARY IMPORT
+import numpy as np
+from pygame import Rect, Surface
+from pygame.event import Event
+
+# LOCAL IMPORT
+from assets.atlas import WALL_ANGLES, wallBit
+from constants import TERMINAL_FPS
+from game import Level, LevelManager, LevelSnapshot, LevelState
+from pyadditions.io import IOM
+from view.scene import ISceneInterface
+
+# cell-codes of the terminal renderer, indices into _GLYPHS
+_SPACE, _CORNER, _HWALL, _VWALL, _FLOOR = range(5)
+_BEEPERS = 5  # 1 to 9 Beepers, _BEEPERS + 9 for more than 9
+_KAREL = 15  # Karel looking at WALL_ANGLES[n]
+_KAREL_ON_BEEPER = 19
+
+_GLYPHS = np.array(
+    [" ", "+", "-", "|", "."] + [f"\x1b[33m{n}\x1b[0m" for n in "123456789*"] +
+    [f"\x1b[1;31m{c}\x1b[0m" for c in ">^<v"] +
+    [f"\x1b[1;31;43m{c}\x1b[0m" for c in ">^<v"],
+    dtype=object
+)
+
+# unchanged cells between two changed ones, that are rewritten instead of
+# moving the cursor
+_MAX_GAP = 4
+
+
+def _plainText(html: str) -> str:
+  """
+  Converts the HTML of an ErrorWindow to a single line of text.
+
+  @param  html  content of the ErrorWindow
+  @return       content without tags and line-breaks
+  """
+  text = re.sub(r"<br\s*/?>", " ", html)
+  text = re.sub(r"<[^>]*>", "", text)
+  return " ".join(text.split())
+
+
+class HeadlessScene(ISceneInterface):
+  """
+  GameScene without a window (see App.serve). There is no start-button, so a
+  loaded Level is started right away. Errors are only logged.
+
+  @extends  ISceneInterface
+
+  @param  speed   Karel-Actions per second of loaded Levels, None keeps the
+                  speed of the map
+  """
+
+  speed: float
+
+  def __init__(self, speed: float = None) -> None:
+    self.speed = speed
+
+  def reset(self) -> None:
+    level = LevelManager().getCurrentLevel()
+    if self.speed is not None:
+      level.speed = self.speed
+    level.startLevel()
+
+  def showErrorWindow(self, title: str, content: str) -> None:
+    IOM.error(f"{title}: {_plainText(content)}")
+
+  def render(self, screen: Surface) -> None:
+    pass
+
+  def update(self, **kwargs) -> Union[Any, None]:
+    pass
+
+  def proccessEvent(self, event: Event) -> Union[Any, None]:
+    pass
+
+  def getDirtyRects(self) -> List[Rect]:
+    return []
+
+  def dispose(self) -> None:
+    pass
+
+
+class TerminalScene(HeadlessScene):
+  """
+  Renders the Level as text into an ANSI-terminal. Every Tile is drawn as 3
+  chars with its walls in between, the visible part follows Karel. A frame is
+  compared cell by cell with the last one and only runs of changed cells are
+  rewritten through cursor-addressing, so the output only depends on the
+  changes. At most TERMINAL_FPS frames are drawn per second, no matter how many
+  Karel-Actions were applied in between.
+
+  @extends  HeadlessScene
+
+  @param  _stream     output-stream of the terminal
+  @param  _cells      cell-codes of the last frame, None if the terminal has to
+                      be cleared
+  @param  _message    last error as single line
+  @param  _lines      status-line and error-line of the last frame
+  @param  _origin     grid-cordinate of the top-left visible Tile
+  @param  _drawn      state of the last frame
+  @param  _lastFrame  time (perf_counter) of the last frame
+  """
+
+  _stream: TextIO
+  _cells: np.ndarray
+  _message: str
+  _lines: Tuple[str, str]
+  _origin: Tuple[int, int]
+  _drawn: Tuple[Any, ...]
+  _lastFrame: float
+
+  def __init__(self, stream: TextIO, speed: float = None) -> None:
+    super().__init__(speed)
+    self._stream = stream
+    self._cells = None
+    self._message = ""
+    self._lines = None
+    self._origin = (0, 0)
+    self._drawn = None
+    self._lastFrame = 0.0
+
+  def reset(self) -> None:
+    super().reset()
+    self._cells = None
+    self._message = ""
+    self._origin = (0, 0)
+
+  def showErrorWindow(self, title: str, content: str) -> None:
+    self._message = f"{title}: {_plainText(content)}"
+
+  def update(self, **kwargs) -> Union[Any, None]:
+    now = perf_counter()
+    level = LevelManager().getCurrentLevel()
+    if now - self._lastFrame < 1 / TERMINAL_FPS or not level.isRendered():
+      return
+
+    snapshot = level.getSnapshot()
+    size = shutil.get_terminal_size()
+    drawn = (
+        level, snapshot.version, level.state, LevelManager().turbo,
+        self._message, size
+    )
+    if drawn == self._drawn and self._cells is not None:
+      return
+    (self._drawn, self._lastFrame) = (drawn, now)
+
+    cells = self._buildFrame(level, snapshot, size)
+    output = self._diff(cells)
+    lines = (self._getStatus(level, snapshot), self._message)
+    if lines != self._lines:
+      self._lines = lines
+      for (row, line) in ((1, lines[0]), (cells.shape[0] + 2, lines[1])):
+        output.append(f"\x1b[{row};1H\x1b[2K{line[:size.columns - 1]}")
+    self._stream.write("".join(output))
+    self._stream.flush()
+
+  def _buildFrame(
+      self, level: Level, snapshot: LevelSnapshot, size: Tuple[int, int]
+  ) -> np.ndarray:
+    """
+    Builds the cell-codes of the visible Tiles. Walls are looked up one Tile
+    beyond the visible ones, as a wall between two Tiles can belong to either.
+
+    @param  level     current Level
+    @param  snapshot  state of the Level to render
+    @param  size      size of the terminal in chars as (columns, lines)
+    @return           cell-codes as [row, column]
+    """
+    world = level.world
+    (height, width) = world.walls.shape
+    visWidth = max(1, min(width, (size[0] - 1) // 4))
+    visHeight = max(1, min(height, (size[1] - 3) // 2))
+
+    (kx, ky) = world.kcsToGrid(snapshot.karelPosition)
+    x0 = self._follow(self._origin[0], kx, visWidth, width)
+    y0 = self._follow(self._origin[1], ky, visHeight, height)
+    self._origin = (x0, y0)
+    (x1, y1) = (x0 + visWidth, y0 + visHeight)
+
+    # region with one Tile margin, clipped to the World
+    (xa, ya) = (max(0, x0 - 1), max(0, y0 - 1))
+    (xb, yb) = (min(width, x1 + 1), min(height, y1 + 1))
+    walls = world.walls[ya:yb, xa:xb]
+
+    vertical = np.zeros((yb - ya, xb - xa + 1), dtype=bool)
+    vertical[:, 1:] |= (walls & wallBit(0.0)) > 0
+    vertical[:, :-1] |= (walls & wallBit(180.0)) > 0
+    vertical[:, 0] |= xa == 0
+    vertical[:, -1] |= xb == width
+    vertical = vertical[y0 - ya:y1 - ya, x0 - xa:x1 - xa + 1]
+
+    horizontal = np.zeros((yb - ya + 1, xb - xa), dtype=bool)
+    horizontal[:-1, :] |= (walls & wallBit(90.0)) > 0
+    horizontal[1:, :] |= (walls & wallBit(270.0)) > 0
+    horizontal[0, :] |= ya == 0
+    horizontal[-1, :] |= yb == height
+    horizontal = horizontal[y0 - ya:y1 - ya + 1, x0 - xa:x1 - xa]
+
+    corners = np.zeros((visHeight + 1, visWidth + 1), dtype=bool)
+    corners[:, 1:] |= horizontal
+    corners[:, :-1] |= horizontal
+    corners[1:, :] |= vertical
+    corners[:-1, :] |= vertical
+
+    beepers = snapshot.beepers[y0:y1, x0:x1]
+    cells = np.full((2*visHeight + 1, 4*visWidth + 1), _SPACE, dtype=np.uint8)
+    cells[0::2, 0::4] = np.where(corners, _CORNER, _SPACE)
+    for offset in (1, 2, 3):
+      cells[0::2, offset::4] = np.where(horizontal, _HWALL, _SPACE)
+    cells[1::2, 0::4] = np.where(vertical, _VWALL, _SPACE)
+    cells[1::2, 2::4] = np.where(
+        beepers > 0, _BEEPERS - 1 + np.minimum(beepers, 10), _FLOOR
+    )
+
+    if x0 <= kx < x1 and y0 <= ky < y1:
+      direction = WALL_ANGLES.index(snapshot.karelOrientation.angle % 360)
+      onBeeper = snapshot.beepers[ky, kx] > 0
+      base = _KAREL_ON_BEEPER if onBeeper else _KAREL
+      cells[2 * (ky-y0) + 1, 4 * (kx-x0) + 2] = base + direction
+    return cells
+
+  @staticmethod
+  def _follow(start: int, pos: int, visible: int, total: int) -> int:
+    """
+    Moves the visible range, so that it contains a position. The range jumps,
+    so that it does not move with every step.
+
+    @param  start     first visible index
+    @param  pos       index, that has to be visible
+    @param  visible   number of visible indices
+    @param  total     number of indices
+    @return           new first visible index
+    """
+    if pos < start or pos >= start + visible:
+      start = pos - visible//2
+    return max(0, min(start, total - visible))
+
+  def _diff(self, cells: np.ndarray) -> List[str]:
+    """
+    Creates the output, that turns the last frame into a new one. If the size
+    of the frame changed, the terminal is cleared first (including the status-
+    and error-line).
+
+    @param  cells   cell-codes of the new frame
+    @return         list of ANSI-sequences and chars
+    """
+    output = []
+    last = self._cells
+    if last is None or last.shape != cells.shape:
+      output.append("\x1b[2J\x1b[?25l")
+      last = np.full_like(cells, 255)
+      self._lines = None
+    self._cells = cells
+
+    changed = cells != last
+    for row in np.flatnonzero(changed.any(axis=1)):
+      columns = np.flatnonzero(changed[row])
+      runs = np.split(columns, np.flatnonzero(np.diff(columns) > _MAX_GAP) + 1)
+      for run in runs:
+        (start, end) = (run[0], run[-1] + 1)
+        output.append(f"\x1b[{row + 2};{start + 1}H")
+        output.append("".join(_GLYPHS[cells[row, start:end]]))
+    return output
+
+  def _getStatus(self, level: Level, snapshot: LevelSnapshot) -> str:
+    """
+    Creates the status-line above the World.
+
+    @param  level     current Level
+    @param  snapshot  state of the Level to render
+    @return           status-line
+    """
+    (x, y) = snapshot.karelPosition
+    speed = "turbo" if LevelManager().turbo else f"{level.speed:g}"
+    return (
+        f"{level.mapname}  {LevelState.toStr(level.state)}  "
+        f"Karel ({int(x)}, {int(y)}) {snapshot.karelOrientation.name}  "
+        f"beepers in bag: {snapshot.karelBeeperbag:g}  speed: {speed}"
+    )
+
+  def dispose(self) -> None:
+    rows = 0 if self._cells is None else self._cells.shape[0]
+    self._stream.write(f"\x1b[0m\x1b[?25h\x1b[{rows + 3};1H\n")
+    self._stream.flush()
@@ -0,0 +1,115 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+import hashlib
+import os
+from typing import Tuple
+
+# LIBRARY IMPORT
+import numpy as np
+import pygame as pg
+from pygame import Surface
+
+# LOCAL IMPORT
+from constants import LAYER_CACHE_FOLDER, TILE_SIZE
+from pyadditions.io import IOM
+from pyadditions.types import SingletonMeta
+
+
+class LayerCache(metaclass=SingletonMeta):
+  """
+  Persistent on-disk cache of rendered static layers (walls only) of maps. A
+  layer is stored as a raw RGB pixel-buffer and identified by the hash of the
+  map-content, the tile-size, the scale and the hash of the used sprites.
+
+  @extends  SingletonMeta
+
+  @param  folder  folder of the cache-files, None if the cache is disabled
+  """
+
+  folder: str
+
+  def __init__(self) -> None:
+    self.folder = LAYER_CACHE_FOLDER
+
+  def setFolder(self, folder: str) -> None:
+    """
+    Sets the folder of the cache-files.
+
+    @param  folder  folder of the cache-files, None disables the cache
+    """
+    self.folder = folder
+
+  @staticmethod
+  def makeKey(walls: np.ndarray, tileSize: int, spriteHash: str) -> str:
+    """
+    Creates the key of a static layer.
+
+    @param  walls       wall-mask array of the World
+    @param  tileSize    tile-size of the layer in px
+    @param  spriteHash  hash of the sprites, the layer is rendered with
+    @return             key of the static layer
+    """
+    mapHash = hashlib.sha1(str(walls.shape).encode())
+    mapHash.update(np.ascontiguousarray(walls).tobytes())
+    scale = tileSize / TILE_SIZE
+    return f"{mapHash.hexdigest()}_{tileSize}px_{scale:.4f}x_{spriteHash}"
+
+  def _getFilepath(self, key: str) -> str:
+    return os.path.join(self.folder, f"{key}.rgb")
+
+  def load(self, key: str, size: Tuple[int, int]) -> Surface:
+    """
+    Loads a static layer from the cache.
+
+    @param  key   key of the static layer
+    @param  size  size of the static layer in px
+    @return       static layer or None, if it is not cached
+    """
+    if self.folder is None:
+      return None
+    try:
+      with open(self._getFilepath(key), "rb") as stream:
+        data = stream.read()
+    except OSError:
+      return None
+
+    if len(data) != size[0] * size[1] * 3:
+      IOM.debug(f"discarding corrupt static layer '{key}'")
+      return None
+    return pg.image.fromstring(data, size, "RGB")
+
+  def store(self, key: str, surf: Surface) -> None:
+    """
+    Stores a static layer in the cache. Errors will only be logged, as the
+    cache is optional.
+
+    @param  key   key of the static layer
+    @param  surf  static layer
+    """
+    if self.folder is None:
+      return
+    filepath = self._getFilepath(key)
+    try:
+      os.makedirs(self.folder, exist_ok=True)
+      with open(filepath + ".tmp", "wb") as stream:
+        stream.write(pg.image.tostring(surf, "RGB"))
+      os.replace(filepath + ".tmp", filepath)
+    except OSError as err:
+      IOM.debug(f"could not store static layer '{key}': {err}")
@@ -30,6 +30,7 @@ import assets
 from pyadditions.io import IOM
 from pyadditions.types import Vector2f, promiseList
 from constants import WINDOW_DIMENSIONS, WINDOW_TOP_LEFT, GAME_START_EVENT, GAME_FINISHED_EVENT
+from game import LevelManager
 from .elements import GLabel
 
 
@@ -99,7 +100,7 @@ class ClickButtonMenu(UIPanel):
         container=self
     )
     # calculate size of button-label
-    labelDim = Vector2f._make(button.font.size(text))
+    labelDim = Vector2f._make(assets.text.size(button.font, text))
 
     # create button-size
     minButtonSize = Vector2f(
@@ -138,18 +139,25 @@ class ClickButtonMenu(UIPanel):
 class Sidemenu(UIPanel):
   """
   Sidemenu for Main-Game-Scene. Controls speed for karel and also starts the
-  command-queue.
+  command-queue. The turbo-button toggles the turbo-mode (see
+  LevelManager.turbo), which is kept, when another World is loaded.
 
   @param  _container    container of sidemenu
+  @param  _turbo        turbo-mode shown by turboBtn
   @param  startBtn      start button
   @param  speedSlider   slider, that controls speed of Karel
   @param  speedLabel    label that shows speed of Karel
+  @param  turboBtn      button, that toggles the turbo-mode
   """
 
+  START_SPEED = 1.0
+
   _container: UIContainer
+  _turbo: bool
   startBtn: UIButton
   speedSlider: UIHorizontalSlider
   speedLabel: GLabel
+  turboBtn: UIButton
 
   def __init__(self, manager: UIManager, width: float) -> None:
     """
@@ -168,7 +176,7 @@ class Sidemenu(UIPanel):
         starting_layer_height=0,
         manager=manager
     )
-    containerRect = pg.Rect(0, 0, 200, 70)
+    containerRect = pg.Rect(0, 0, 200, 104)
     containerRect.center = (
         self.relative_rect.width * 0.5, self.relative_rect.height * 0.35
     )
@@ -179,10 +187,10 @@ class Sidemenu(UIPanel):
         container=self
     )
     padding = 3  # px
+    rowHeight = (containerRect.height - 4*padding) / 3
     self.startBtn = UIButton(
         relative_rect=pg.Rect(
-            padding, padding, containerRect.width - 2*padding,
-            (containerRect.height - 3*padding) / 2
+            padding, padding, containerRect.width - 2*padding, rowHeight
         ),
         text="start",
         manager=self.ui_manager,
@@ -190,11 +198,10 @@ class Sidemenu(UIPanel):
     )
     self.speedSlider = UIHorizontalSlider(
         relative_rect=pg.Rect(
-            padding, 2*padding + self.startBtn.relative_rect.height,
-            0.7 * (containerRect.width - 2*padding),
-            (containerRect.height - 3*padding) / 2
+            padding, 2*padding + rowHeight,
+            0.7 * (containerRect.width - 2*padding), rowHeight
         ),
-        start_value=1.0,
+        start_value=self.START_SPEED,
         value_range=(0.5, 15.0),
         manager=self.ui_manager,
         container=self._container
@@ -202,15 +209,28 @@ class Sidemenu(UIPanel):
     self.speedLabel = GLabel(
         relative_rect=pg.Rect(
             padding + self.speedSlider.relative_rect.width,
-            2*padding + self.startBtn.relative_rect.height,
-            containerRect.width - 2*padding -
-            self.speedSlider.relative_rect.width,
-            (containerRect.height - 3*padding) / 2
+            2*padding + rowHeight, containerRect.width - 2*padding -
+            self.speedSlider.relative_rect.width, rowHeight
         ),
         text=f"{self.speedSlider.current_value:.2f}",
         manager=self.ui_manager,
         container=self._container
     )
+    self.turboBtn = UIButton(
+        relative_rect=pg.Rect(
+            padding, 3*padding + 2*rowHeight, containerRect.width - 2*padding,
+            rowHeight
+        ),
+        text="turbo: off",
+        manager=self.ui_manager,
+        container=self._container
+    )
+    self._turbo = False
+
+  def reset(self) -> None:
+    """Resets the speed of Karel and enables the start button."""
+    self.speedSlider.set_current_value(self.START_SPEED)
+    self.startBtn.enable()
 
   def process_event(self, event: pg.event.Event) -> bool:
     """
@@ -239,4 +259,16 @@ class Sidemenu(UIPanel):
     if self.startBtn.check_pressed():
       pg.event.post(GAME_START_EVENT)
       IOM.debug(f"POSTED '{GAME_START_EVENT.attr1}'")
+    if self.turboBtn.check_pressed():
+      LevelManager().turbo = not LevelManager().turbo
+      IOM.debug(f"turbo-mode {'on' if LevelManager().turbo else 'off'}")
+
+    # the turbo-mode can also be changed by the client (see setTurbo)
+    if LevelManager().turbo != self._turbo:
+      self._turbo = LevelManager().turbo
+      self.turboBtn.set_text(f"turbo: {'on' if self._turbo else 'off'}")
+      if self._turbo:
+        self.speedSlider.disable()
+      else:
+        self.speedSlider.enable()
     return super().update(time_delta)
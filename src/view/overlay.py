@@ -18,22 +18,29 @@
 
 # STL IMPORT
 from abc import ABC, abstractmethod
+from time import perf_counter
+from typing import List
 
 # LIBRARY IMPORT
+import numpy as np
 import pygame as pg
 
 # LOCAL IMPORT
-from constants import GAME_FONT, WINDOW_TOP_RIGHT
+from constants import FRAME_GRAPH_HEIGHT, FRAME_HISTORY, FRAME_JANK_RATIO, FRAME_OVERLAY_INTERVAL, GAME_FONT, MAXFPS, WINDOW_TOP_RIGHT
 import assets
-from assets.color import Basics
+from assets.color import Basics, HexColor
 
 
 class Overlay(pg.Surface, ABC):
 
   visible: bool
+  rect: pg.Rect
+  _dirtyRects: List[pg.Rect]
 
   def __init__(self, visible: bool) -> None:
     self.visible = visible
+    self.rect = pg.Rect(0, 0, 0, 0)
+    self._dirtyRects = []
 
   @abstractmethod
   def render(self, surf: pg.Surface) -> None:
@@ -42,14 +49,37 @@ class Overlay(pg.Surface, ABC):
   def proccessEvent(self, event: pg.event.Event) -> None:
     pass
 
+  def getDirtyRects(self) -> List[pg.Rect]:
+    """
+    Returns the regions of the screen, that have changed since the last call.
+
+    @return   list of dirty rects
+    """
+    dirtyRects = self._dirtyRects
+    self._dirtyRects = []
+    return dirtyRects
+
+  def _setRect(self, rect: pg.Rect) -> None:
+    """
+    Moves/resizes the overlay and marks the old and new region as dirty.
+
+    @param  rect  new bounds of the overlay
+    """
+    if self.visible:
+      self._dirtyRects += [self.rect.copy(), rect.copy()]
+    self.rect = rect
+
   def toggle(self) -> None:
     self.visible = not self.visible
+    self._dirtyRects.append(self.rect.copy())
 
   def show(self) -> None:
-    self.visible = True
+    if not self.visible:
+      self.toggle()
 
   def hide(self) -> None:
-    self.visible = False
+    if self.visible:
+      self.toggle()
 
 
 class FPSOverlay(Overlay):
@@ -74,11 +104,236 @@ class FPSOverlay(Overlay):
     fps = int(fps)
     if fps != self.lastFps:
       text = f"{fps}"
-      self.textSurf = self.textFont.render(text, True, Basics.RED)
+      self.textSurf = assets.text.render(self.textFont, text, Basics.RED)
       self.lastFps = fps
 
-  def render(self, surf: pg.Surface) -> None:
-    if self.visible:
       labelRect = self.textSurf.get_rect()
       labelRect.topright = tuple(WINDOW_TOP_RIGHT + (-5, 5))
-      surf.blit(self.textSurf, labelRect)
+      self._setRect(labelRect)
+
+  def render(self, surf: pg.Surface) -> None:
+    if self.visible:
+      surf.blit(self.textSurf, self.rect)
+
+
+class FrameStats():
+  """
+  Ring-buffer of the durations of the last FRAME_HISTORY frames of the
+  gameloop. A frame starts right after clock.tick (see begin), so its frame-
+  time includes the wait for maxfps. The work of a frame is split into phases,
+  which are ended by mark.
+
+  @param  PHASES    names of the phases, column 1 to 4 of _frames
+  @param  _frames   durations in ms as [frame, column], column 0 is the frame-
+                    time
+  @param  _index    row of the current frame
+  @param  _count    number of complete frames, at most FRAME_HISTORY - 1
+  @param  _start    time (perf_counter) the current frame started, None before
+                    the first frame
+  @param  _last     time (perf_counter) the last phase ended
+  """
+
+  PHASES = ("events", "update", "render", "flip")
+
+  _frames: np.ndarray
+  _index: int
+  _count: int
+  _start: float
+  _last: float
+
+  def __init__(self) -> None:
+    self._frames = np.zeros((FRAME_HISTORY, 1 + len(self.PHASES)))
+    self._index = 0
+    self._count = 0
+    self._start = None
+    self._last = None
+
+  def begin(self) -> None:
+    """Ends the current frame and starts the next one."""
+    now = perf_counter()
+    if self._start is not None:
+      self._frames[self._index, 0] = (now - self._start) * 1000
+      self._index = (self._index + 1) % FRAME_HISTORY
+      self._count = min(self._count + 1, FRAME_HISTORY - 1)
+    self._frames[self._index] = 0.0
+    (self._start, self._last) = (now, now)
+
+  def mark(self, phase: str) -> None:
+    """
+    Ends a phase of the current frame. The time since the last phase (or the
+    start of the frame) is added to the phase.
+
+    @param  phase   name of the phase, one of PHASES
+    """
+    now = perf_counter()
+    column = 1 + self.PHASES.index(phase)
+    self._frames[self._index, column] += (now - self._last) * 1000
+    self._last = now
+
+  def getFrames(self) -> np.ndarray:
+    """
+    Returns the durations of the complete frames.
+
+    @return   durations in ms as [frame, column], oldest frame first
+    """
+    rows = np.arange(self._index - self._count, self._index) % FRAME_HISTORY
+    return self._frames[rows]
+
+
+class FrameTimeOverlay(Overlay):
+  """
+  Shows the frame-times of the gameloop, e.g. to find render-regressions on
+  large maps: a graph of the last frames with the phases of the work stacked
+  (the rest up to the frame-time is the wait for maxfps), a line at the frame-
+  time budget, the percentiles p50/p95/p99, the number of frames longer than
+  FRAME_JANK_RATIO x the budget and the average time per phase. The overlay is
+  only redrawn every FRAME_OVERLAY_INTERVAL s, so that it barely shows up in
+  the measured frame-times itself.
+
+  @extends  Overlay
+
+  @param  PHASE_COLORS  colors of the phases of FrameStats
+  @param  stats         frame-times of the gameloop
+  @param  budget        frame-time budget in ms
+  @param  textFont      font of the text
+  @param  surf          rendered overlay
+  @param  _palette      colors of the graph as [code, rgb]: the phases, the
+                        wait, the background and the budget
+  @param  _drawnAt      time (perf_counter) of the last redraw
+  """
+
+  PHASE_COLORS = (
+      HexColor("#4e9af1"), HexColor("#4ec27a"), HexColor("#f1a34e"),
+      HexColor("#b07ef1")
+  )
+  WAIT_COLOR = HexColor("#606060")
+  BACKGROUND_COLOR = HexColor("#202020")
+
+  stats: FrameStats
+  budget: float
+  textFont: pg.font.Font
+  surf: pg.Surface
+  _palette: np.ndarray
+  _drawnAt: float
+
+  def __init__(self, maxfps: int, visible: bool = False) -> None:
+    """
+    constructor
+
+    @param  maxfps    maxfps of the game, the budget is derived from (MAXFPS if
+                      the fps are not limited)
+    @param  visible   True if the overlay is shown
+    """
+    super().__init__(visible)
+
+    self.stats = FrameStats()
+    self.budget = 1000.0 / (maxfps if maxfps > 0 else MAXFPS)
+    self.textFont = assets.load.font(GAME_FONT, 12)
+    self.surf = None
+    self._palette = np.array(
+        [
+            tuple(color)[:3] for color in self.PHASE_COLORS +
+            (self.WAIT_COLOR, self.BACKGROUND_COLOR, Basics.RED)
+        ],
+        dtype=np.uint8
+    )
+    self._drawnAt = 0.0
+
+  def proccessEvent(self, event: pg.event.Event) -> None:
+    if event.type == pg.KEYUP:
+      if event.key == pg.K_F4:
+        self.toggle()
+
+  def update(self) -> None:
+    now = perf_counter()
+    if not self.visible or now - self._drawnAt < FRAME_OVERLAY_INTERVAL:
+      return
+    self._drawnAt = now
+
+    frames = self.stats.getFrames()
+    graph = pg.surfarray.make_surface(
+        self._palette.take(self._createGraph(frames), axis=0)
+    )
+    lines = self._createLines(frames)
+
+    width = max([graph.get_width()] + [line.get_width() for line in lines])
+    height = graph.get_height() + sum(line.get_height() for line in lines)
+    self.surf = pg.Surface((width + 8, height + 8))
+    self.surf.fill(self.BACKGROUND_COLOR)
+    self.surf.blit(graph, (4, 4))
+    y = graph.get_height() + 4
+    for line in lines:
+      self.surf.blit(line, (4, y))
+      y += line.get_height()
+
+    rect = self.surf.get_rect()
+    rect.topright = tuple(WINDOW_TOP_RIGHT + (-5, 30))
+    self._setRect(rect)
+
+  def _createGraph(self, frames: np.ndarray) -> np.ndarray:
+    """
+    Creates the graph of the frame-times, one column per frame. The graph
+    shows up to 2x the budget, longer frames are cut off.
+
+    @param  frames  durations of the frames (see FrameStats.getFrames)
+    @return         color-codes as [x, y], indices into _palette
+    """
+    # codes after the phases: the wait, the background and the budget
+    background = len(self.PHASE_COLORS) + 1
+    budget = background + 1
+    scale = 2 * self.budget / FRAME_GRAPH_HEIGHT  # ms per px
+    # ms at the lower edge of every row, from top to bottom
+    levels = np.arange(FRAME_GRAPH_HEIGHT)[::-1] * scale
+    ends = np.cumsum(frames[:, 1:], axis=1)
+    codes = (levels[None, :, None] >= ends[:, None, :]).sum(axis=2)
+    codes[levels[None, :] >= frames[:, :1]] = background
+
+    graph = np.full((FRAME_HISTORY, FRAME_GRAPH_HEIGHT), background)
+    graph[FRAME_HISTORY - len(frames):] = codes
+    graph[:, FRAME_GRAPH_HEIGHT // 2] = budget
+    return graph
+
+  def _createLines(self, frames: np.ndarray) -> List[pg.Surface]:
+    """
+    Renders the percentiles, the jank and the average time per phase.
+
+    @param  frames  durations of the frames (see FrameStats.getFrames)
+    @return         rendered lines
+    """
+    (p50, p95, p99) = (0.0, 0.0, 0.0)
+    (jank, means) = (0, np.zeros(len(FrameStats.PHASES)))
+    if len(frames) > 0:
+      (p50, p95, p99) = np.percentile(frames[:, 0], (50, 95, 99))
+      jank = np.count_nonzero(frames[:, 0] > FRAME_JANK_RATIO * self.budget)
+      means = frames[:, 1:].mean(axis=0)
+
+    def render(text: str, color: HexColor) -> pg.Surface:
+      return assets.text.render(self.textFont, text, color)
+
+    limit = FRAME_JANK_RATIO * self.budget
+    lines = [
+        render(f"p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f} ms", Basics.WHITE),
+        render(
+            f"jank {jank}/{len(frames)} > {limit:.1f} ms",
+            Basics.RED if jank > 0 else Basics.WHITE
+        ),
+    ]
+
+    # average per phase, in the colors of the graph
+    columns = zip(FrameStats.PHASES, means, self.PHASE_COLORS)
+    parts = [
+        render(f"{name} {mean:.2f} ", color) for (name, mean, color) in columns
+    ] + [render("ms", Basics.WHITE)]
+    phases = pg.Surface(
+        (sum(part.get_width() for part in parts), parts[0].get_height()),
+        pg.SRCALPHA
+    )
+    x = 0
+    for part in parts:
+      phases.blit(part, (x, 0))
+      x += part.get_width()
+    return lines + [phases]
+
+  def render(self, surf: pg.Surface) -> None:
+    if self.visible and self.surf is not None:
+      surf.blit(self.surf, self.rect)
@@ -0,0 +1,160 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from time import perf_counter
+from typing import NamedTuple, Tuple
+
+# LIBRARY IMPORT
+import pygame as pg
+from pygame import Surface
+
+# LOCAL IMPORT
+from constants import QUALITY_DEGRADE_DELAY, QUALITY_RESTORE_DELAY, QUALITY_RESTORE_RATIO, QUALITY_SMOOTHING
+from pyadditions.io import IOM
+from pyadditions.types import EnumLike, SingletonMeta
+
+
+class _RenderQualityTuple(NamedTuple):
+  """
+  Describes a quality-level of the rendering. (The different levels are
+  specified in the EnumLike RenderQuality-class)
+
+  @extends  NamedTuple
+  @param    name            name of the quality-level
+  @param    smoothScaling   True if surfaces are scaled with smoothscale
+  @param    worldInterval   the World is redrawn at most every n-th frame
+  @param    debugInterval   factor of the refresh-interval of the DebugWindow
+  """
+
+  name: str
+  smoothScaling: bool
+  worldInterval: int
+  debugInterval: int
+
+
+class RenderQuality(EnumLike):
+  """Enum of all quality-levels as _RenderQualityTuple, from best to worst"""
+
+  HIGH = _RenderQualityTuple("HIGH", True, 1, 1)
+  MEDIUM = _RenderQualityTuple("MEDIUM", False, 2, 2)
+  LOW = _RenderQualityTuple("LOW", False, 4, 10)
+
+  LEVELS = (HIGH, MEDIUM, LOW)
+
+
+class QualityGovernor(metaclass=SingletonMeta):
+  """
+  Adapts the render-quality to the measured work-time of the gameloop. If the
+  average work-time of a frame stays above the frame-time budget (1 / maxfps)
+  for QUALITY_DEGRADE_DELAY s, the quality is lowered by one level. It is
+  raised again, if the projected work-time of the higher level stays below
+  QUALITY_RESTORE_RATIO of the budget for QUALITY_RESTORE_DELAY s.
+
+  @extends  SingletonMeta
+
+  @param  enabled   False if the quality is fixed to RenderQuality.HIGH
+  @param  budget    frame-time budget in ms
+  @param  quality   current quality-level
+  @param  average   moving average of the work-time of a frame in ms
+  @param  _since    time, since which the quality should change, None if not
+  """
+
+  enabled: bool
+  budget: float
+  quality: _RenderQualityTuple
+  average: float
+  _since: float
+
+  def __init__(self) -> None:
+    self.enabled = False
+    self.budget = 0.0
+    self.quality = RenderQuality.HIGH
+    self.average = 0.0
+    self._since = None
+
+  def configure(self, enabled: bool, maxfps: int) -> None:
+    """
+    Enables or disables the adaptive quality.
+
+    @param  enabled   True if the quality should adapt to the work-time
+    @param  maxfps    maxfps of the game, the budget is derived from
+    """
+    self.enabled = enabled and maxfps > 0
+    self.budget = 1000.0 / maxfps if maxfps > 0 else 0.0
+    self._setQuality(RenderQuality.HIGH)
+
+  def measure(self, workTime: float) -> None:
+    """
+    Adds the work-time of a frame (without waiting for maxfps or events) and
+    adapts the quality, if necessary.
+
+    @param  workTime  work-time of the frame in ms
+    """
+    if not self.enabled:
+      return
+    self.average += QUALITY_SMOOTHING * (workTime - self.average)
+
+    levels = RenderQuality.LEVELS
+    level = levels.index(self.quality)
+    if self.average > self.budget and level + 1 < len(levels):
+      (target, delay) = (levels[level + 1], QUALITY_DEGRADE_DELAY)
+    elif level > 0 and self._project(levels[level - 1]) < \
+        QUALITY_RESTORE_RATIO * self.budget:
+      (target, delay) = (levels[level - 1], QUALITY_RESTORE_DELAY)
+    else:
+      self._since = None
+      return
+
+    now = perf_counter()
+    if self._since is None:
+      self._since = now
+    elif now - self._since >= delay:
+      self._setQuality(target)
+
+  def _project(self, quality: _RenderQualityTuple) -> float:
+    """
+    Estimates the average work-time at another quality-level, as the World
+    dominates the work-time and is redrawn more often on higher levels.
+
+    @param  quality   quality-level
+    @return           estimated work-time in ms
+    """
+    return self.average * self.quality.worldInterval / quality.worldInterval
+
+  def _setQuality(self, quality: _RenderQualityTuple) -> None:
+    if quality is not self.quality:
+      IOM.debug(
+          f"render-quality {self.quality.name} -> {quality.name} "
+          f"(average {self.average:.1f} ms, budget {self.budget:.1f} ms)"
+      )
+    self.quality = quality
+    self._since = None
+
+  def scale(self, surf: Surface, size: Tuple[int, int]) -> Surface:
+    """
+    Scales a surface with smoothscale or, on lower quality-levels, with the
+    faster nearest-neighbour scale.
+
+    @param  surf  surface to scale
+    @param  size  new size in px
+    @return       scaled surface
+    """
+    if self.quality.smoothScaling and surf.get_bitsize() >= 24:
+      return pg.transform.smoothscale(surf, size)
+    return pg.transform.scale(surf, size)
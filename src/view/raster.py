@@ -0,0 +1,195 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from typing import Tuple
+
+# LIBRARY IMPORT
+import numpy as np
+import pygame as pg
+from pygame import Surface
+
+# LOCAL IMPORT
+from assets.atlas import WALL_ANGLES, SpriteAtlas
+from constants import FLAT_TILE_SIZE, RASTER_BAND_MIN_PIXELS, RASTER_THREADS
+from pyadditions.types import SingletonFactoryMeta
+
+# thread-pool for band-rasterization, created on first use
+_bandPool: ThreadPoolExecutor = None
+
+
+class TileRasterizer(metaclass=SingletonFactoryMeta):
+  """
+  Rasterizes a region of the World directly from its wall-mask and beeper
+  arrays (indexed by grid-cordinates [gy, gx]) with vectorized NumPy
+  operations. The wall-sprites of the SpriteAtlas are stamped nearest-neighbour
+  into one pixel-array. Below FLAT_TILE_SIZE every tile is a flat colored cell,
+  using the average color of its sprite. There is one rasterizer per tile-size,
+  which can be accessed through 'TileRasterizer(tileSize)'.
+
+  @extends  SingletonFactoryMeta
+
+  @param  tileSize      width and height of a tile in px
+  @param  spriteHash    hash of the wall-sprites, identifies rendered layers
+  @param  _wallPixels   pixels of all wall-sprites as [mask, x, y, rgb]
+  @param  _palette      average colors of all wall-sprites as [mask, rgb], the
+                        last entry is the color of a tile with Beepers
+  """
+
+  tileSize: int
+  spriteHash: str
+  _wallPixels: np.ndarray
+  _palette: np.ndarray
+
+  def __init__(self, tileSize: int) -> None:
+    self.tileSize = tileSize
+    atlas = SpriteAtlas(tileSize)
+
+    masks = range(2**len(WALL_ANGLES))
+    self._wallPixels = np.stack(
+        [pg.surfarray.array3d(atlas.walls(mask)) for mask in masks]
+    )
+    wallColors = self._wallPixels.mean(axis=(1, 2))
+    beeperColor = pg.surfarray.array3d(atlas.tile(0, 1)).mean(axis=(0, 1))
+    self._palette = np.vstack((wallColors, beeperColor)).astype(np.uint8)
+    self.spriteHash = hashlib.sha1(self._wallPixels.tobytes()).hexdigest()[:12]
+
+  def rasterize(self, walls: np.ndarray, beepers: np.ndarray) -> Surface:
+    """
+    Rasterizes a region of the World in a single pass.
+
+    @param  walls     wall-masks of the region as [gy, gx]
+    @param  beepers   number of Beepers of the region as [gy, gx]
+    @return           rasterized region as pygame.Surface
+    """
+    surf = self._rasterizeBase(walls, beepers)
+    if self.tileSize >= FLAT_TILE_SIZE:
+      self.renderBeepers(surf, walls, beepers, (0, 0))
+    return surf
+
+  def render(
+      self, destSurf: Surface, walls: np.ndarray, beepers: np.ndarray,
+      pos: Tuple[int, int]
+  ) -> None:
+    """
+    Rasterizes a region of the World and renders it on destination-surface.
+    Regions with at least RASTER_BAND_MIN_PIXELS px are split into horizontal
+    bands, which are rasterized in parallel by a thread-pool (NumPy and pygame
+    release the GIL while copying pixels). Blitting onto destination-surface
+    only happens on the calling thread.
+
+    @param  destSurf  destination-surface
+    @param  walls     wall-masks of the region as [gy, gx]
+    @param  beepers   number of Beepers of the region as [gy, gx]
+    @param  pos       position of the region on destination-surface in px
+    """
+    ts = self.tileSize
+    (height, width) = walls.shape
+
+    bands = 1
+    if RASTER_THREADS > 1 and width * height * ts * ts >= RASTER_BAND_MIN_PIXELS:
+      bands = min(RASTER_THREADS, height)
+
+    if bands == 1:
+      destSurf.blit(self._rasterizeBase(walls, beepers), pos)
+    else:
+      bandHeight = -(-height // bands)
+      rows = range(0, height, bandHeight)
+      futures = [
+          _getBandPool().submit(
+              self._rasterizeBase, walls[row:row + bandHeight],
+              beepers[row:row + bandHeight]
+          ) for row in rows
+      ]
+      destSurf.blits(
+          [
+              (future.result(), (pos[0], pos[1] + row*ts))
+              for (future, row) in zip(futures, rows)
+          ],
+          doreturn=False
+      )
+    if ts >= FLAT_TILE_SIZE:
+      self.renderBeepers(destSurf, walls, beepers, pos)
+
+  def _rasterizeBase(self, walls: np.ndarray, beepers: np.ndarray) -> Surface:
+    """
+    Rasterizes the walls of a region (and Beepers, if rasterized as flat colored
+    cells). Does not access any shared pygame-objects, so it can be called from
+    multiple threads.
+
+    @param  walls     wall-masks of the region as [gy, gx]
+    @param  beepers   number of Beepers of the region as [gy, gx]
+    @return           rasterized region as pygame.Surface
+    """
+    ts = self.tileSize
+    (height, width) = walls.shape
+
+    if ts < FLAT_TILE_SIZE:
+      index = np.where(beepers > 0, len(self._palette) - 1, walls)
+      pixels = self._palette[index.T]
+      pixels = pixels.repeat(ts, axis=0).repeat(ts, axis=1)
+      return pg.surfarray.make_surface(pixels)
+
+    # [gy, gx, x, y, rgb] -> [gx, x, gy, y, rgb] -> [px, py, rgb]
+    pixels = self._wallPixels[walls].transpose(1, 2, 0, 3, 4)
+    return pg.surfarray.make_surface(pixels.reshape(width * ts, height * ts, 3))
+
+  def renderBeepers(
+      self, destSurf: Surface, walls: np.ndarray, beepers: np.ndarray,
+      pos: Tuple[int, int]
+  ) -> None:
+    """
+    Renders all tiles with Beepers of a region on destination-surface. Beepers
+    are rare, so they are not part of the vectorized rasterization.
+
+    @param  destSurf  destination-surface
+    @param  walls     wall-masks of the region as [gy, gx]
+    @param  beepers   number of Beepers of the region as [gy, gx]
+    @param  pos       position of the region on destination-surface in px
+    """
+    ts = self.tileSize
+    beeperTiles = np.argwhere(beepers > 0)
+
+    if ts < FLAT_TILE_SIZE:
+      color = tuple(self._palette[-1])
+      for (gy, gx) in beeperTiles:
+        destSurf.fill(color, (pos[0] + gx*ts, pos[1] + gy*ts, ts, ts))
+      return
+
+    atlas = SpriteAtlas(ts)
+    blitSequence = []
+    for (gy, gx) in beeperTiles:
+      tileSurf = atlas.tile(int(walls[gy, gx]), int(beepers[gy, gx]))
+      blitSequence.append((tileSurf, (pos[0] + gx*ts, pos[1] + gy*ts)))
+    destSurf.blits(blitSequence, doreturn=False)
+
+
+def _getBandPool() -> ThreadPoolExecutor:
+  """
+  Returns the thread-pool for band-rasterization and creates it on first use.
+
+  @return   thread-pool with RASTER_THREADS workers
+  """
+  global _bandPool
+  if _bandPool is None:
+    _bandPool = ThreadPoolExecutor(
+        max_workers=RASTER_THREADS, thread_name_prefix="raster"
+    )
+  return _bandPool
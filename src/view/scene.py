@@ -18,7 +18,7 @@
 
 # STL IMPORT
 from abc import ABC, abstractmethod
-from typing import Any, Union
+from typing import Any, List, Union
 
 # LIBRARY IMPORT
 from pygame import Rect, Surface
@@ -27,8 +27,10 @@ from pygame_gui.ui_manager import UIManager
 
 # LOCAL IMPORT
 from constants import WINDOW_DIMENSIONS, WINDOW_CENTER, SCREEN_BACKGROUND_COLOR
+from events import UpdateNotifier
 from game import LevelManager
 from pyadditions.io import IOM
+from view.dirty import UIDirtyTracker
 from view.menu import Sidemenu
 import assets
 from assets.color import HexColor
@@ -50,20 +52,80 @@ class ISceneInterface(ABC):
   def proccessEvent(self, event: Event) -> Union[Any, None]:
     raise NotImplementedError()
 
+  @abstractmethod
+  def getDirtyRects(self) -> List[Rect]:
+    """
+    Returns the regions of the screen, that have changed since the last call.
+    The first call after creation has to return the whole screen.
+
+    @return   list of dirty rects
+    """
+    raise NotImplementedError()
+
+  @abstractmethod
+  def dispose(self) -> None:
+    """
+    Tears down all UI-elements and surfaces of the scene. Is called from the
+    main-thread, after the scene has been replaced. The scene MUST NOT be used
+    afterwards.
+    """
+    raise NotImplementedError()
+
+  def showErrorWindow(self, title: str, content: str) -> None:
+    """
+    Shows an error to the user. Scenes without a Level ignore errors.
+
+    @param  title     title of the error
+    @param  content   description of the error as HTML
+    """
+    pass
+
 
 class SceneManager(metaclass=SingletonMeta):
+  """
+  Manages the current scene. The GameScene is pooled, so that loading another
+  World only resets it, instead of creating a new UIManager every time.
+
+  @extends  SingletonMeta
+
+  @param  _cur        current scene
+  @param  _gameScene  pooled GameScene, None if it was not created yet
+  """
 
   _cur: ISceneInterface
+  _gameScene: "GameScene"
 
   def __init__(self) -> None:
     self._cur = WelcomeScene()
+    self._gameScene = None
 
   def setScene(self, newScene: ISceneInterface) -> None:
     self._cur = newScene
+    UpdateNotifier().notify()
 
   def getScene(self) -> ISceneInterface:
     return self._cur
 
+  def setGameScene(self, scene: ISceneInterface) -> None:
+    """
+    Replaces the pooled GameScene, e.g. with a scene that forwards everything
+    to another process (see remote.RemoteScene).
+
+    @param  scene   scene, that is shown for every loaded Level
+    """
+    self._gameScene = scene
+
+  def loadGameScene(self) -> None:
+    """
+    Shows the GameScene for the current Level. The GameScene is created on
+    first use and reset on every following call.
+    """
+    if self._gameScene is None:
+      self._gameScene = GameScene()
+    else:
+      self._gameScene.reset()
+    self.setScene(self._gameScene)
+
 
 class WelcomeScene(ISceneInterface):
 
@@ -72,6 +134,7 @@ class WelcomeScene(ISceneInterface):
   backgroundSurf: Surface
   textSurf: Surface
   textRect: Rect
+  _painted: bool
 
   def __init__(self) -> None:
     self.backgroundSurf = Surface(tuple(WINDOW_DIMENSIONS))
@@ -80,6 +143,7 @@ class WelcomeScene(ISceneInterface):
     self.textSurf = textFont.render(self.TEXT, True, HexColor("#bdbdbd"))
     self.textRect = self.textSurf.get_rect()
     self.textRect.center = tuple(WINDOW_CENTER)
+    self._painted = False
 
   def render(self, screen: Surface) -> None:
     screen.blit(self.backgroundSurf, (0, 0))
@@ -91,45 +155,97 @@ class WelcomeScene(ISceneInterface):
   def proccessEvent(self, event: Event) -> Union[Any, None]:
     pass
 
+  def getDirtyRects(self) -> List[Rect]:
+    if self._painted:
+      return []
+    self._painted = True
+    return [self.backgroundSurf.get_rect()]
+
+  def dispose(self) -> None:
+    self.backgroundSurf = None
+    self.textSurf = None
+
 
 class GameScene(ISceneInterface):
+  """
+  Scene of the game, shows the current Level and the Sidemenu. The scene is
+  pooled by the SceneManager and reset, if another Level is loaded.
+
+  @param  backgroundSurf    background of the scene
+  @param  uiManager         UIManager of the Sidemenu and all ErrorWindows
+  @param  uiTracker         dirty-tracker of uiManager
+  @param  sidemenu          Sidemenu of the scene
+  @param  _errorWindows     ErrorWindows shown since the last reset
+  @param  _painted          False if the whole scene has to be redrawn
+  """
 
   backgroundSurf: Surface
   uiManager: UIManager
+  uiTracker: UIDirtyTracker
   sidemenu: Sidemenu
+  _errorWindows: List[ErrorWindow]
+  _painted: bool
 
   def __init__(self) -> None:
-    if LevelManager().getCurrentLevel() is None:
-      raise Exception("A Level has to loded, before GameScene in initialized")
-
     self.backgroundSurf = Surface(tuple(WINDOW_DIMENSIONS))
     self.backgroundSurf.fill(SCREEN_BACKGROUND_COLOR)
     self.uiManager = assets.load.uimanager("theme/GameScene.json")
+    self.uiTracker = UIDirtyTracker(self.uiManager)
     self.sidemenu = Sidemenu(self.uiManager, 300)
+    self._errorWindows = []
+    self.reset()
+
+  def reset(self) -> None:
+    """Resets the scene for the current Level and kills all ErrorWindows."""
+    level = LevelManager().getCurrentLevel()
+    if level is None:
+      raise Exception("A Level has to loded, before GameScene in initialized")
+    level.rect.center = (
+        (WINDOW_DIMENSIONS.x + 300) / 2, WINDOW_DIMENSIONS.y / 2
+    )
+
+    for window in self._errorWindows:
+      window.kill()
+    self._errorWindows = []
+    self.sidemenu.reset()
+    self._painted = False
 
   def showErrorWindow(self, title: str, content: str) -> None:
     IOM.debug("Creating ErrorWindow")
-    ErrorWindow(self.uiManager, title, content)
+    window = ErrorWindow(self.uiManager, title, content)
+    self._errorWindows = [w for w in self._errorWindows if w.alive()]
+    self._errorWindows.append(window)
 
   def render(self, screen: Surface) -> None:
     screen.blit(self.backgroundSurf, (0, 0))
-
-    level = LevelManager().getCurrentLevel()
-    level.rect.center = (
-        (WINDOW_DIMENSIONS.x + 300) / 2, WINDOW_DIMENSIONS.y / 2
-    )
-    level.render(screen)
+    LevelManager().getCurrentLevel().render(screen)
 
     self.uiManager.draw_ui(screen)
 
   def proccessEvent(self, event: Event) -> Union[Any, None]:
     level = LevelManager().getCurrentLevel()
 
-    self.uiManager.process_events(event)
-    level.proccessEvent(event)
+    # camera-input is only passed to the level, if no UI-element consumed it
+    if not self.uiManager.process_events(event):
+      level.proccessEvent(event)
 
   def update(self, **kwargs) -> Union[Any, None]:
     self.uiManager.update(kwargs["time_delta"])
     LevelManager().getCurrentLevel().update(
         self.sidemenu.speedSlider.current_value
     )
+
+  def getDirtyRects(self) -> List[Rect]:
+    dirtyRects = LevelManager().getCurrentLevel().getDirtyRects()
+    dirtyRects += self.uiTracker.getDirtyRects()
+    if not self._painted:
+      self._painted = True
+      return [self.backgroundSurf.get_rect()]
+    return dirtyRects
+
+  def dispose(self) -> None:
+    self._errorWindows = []
+    self.uiManager.clear_and_reset()
+    self.uiTracker = None
+    self.sidemenu = None
+    self.backgroundSurf = None
@@ -0,0 +1,316 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# STL IMPORT
+import base64
+import struct
+import zlib
+import weakref
+from threading import RLock
+from typing import NamedTuple, Tuple
+
+# LIBRARY IMPORT
+import numpy as np
+
+# LOCAL IMPORT
+from assets.atlas import WALL_ANGLES, wallBit
+from constants import FLAT_TILE_SIZE, SNAPSHOT_CACHE_SIZE, SNAPSHOT_MAX_SIZE
+from game import InvalidArgumentError, Level, LevelSnapshot
+from pyadditions.types import LRUCache, SingletonMeta
+from view.camera import Minimap
+
+# color-codes of the snapshot, indices into SnapshotRenderer.PALETTE
+_FLOOR, _BEEPER, _WALL, _KAREL = range(4)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class _Stamps(NamedTuple):
+  """
+  Pixel-masks of a Tile for a tile-size.
+
+  @extends  NamedTuple
+
+  @param  walls   color-codes of the walls as [wall-mask, py, px]
+  @param  beeper  color-codes of a beeper as [py, px]
+  @param  karel   True where Karel is drawn as [direction, py, px], direction
+                  is the index of the orientation in WALL_ANGLES
+  """
+
+  walls: np.ndarray
+  beeper: np.ndarray
+  karel: np.ndarray
+
+
+def _createStamps(tileSize: int) -> _Stamps:
+  """
+  Creates the pixel-masks of a Tile. Walls are drawn at the edges of the Tile,
+  a beeper as a diamond in its center and Karel as a triangle pointing in his
+  direction.
+
+  @param  tileSize  tile-size in px
+  @return           pixel-masks of the Tile
+  """
+  (py, px) = np.mgrid[0:tileSize, 0:tileSize]
+  thickness = max(1, tileSize // 16)
+  edges = {
+      wallBit(0.0): px >= tileSize - thickness,
+      wallBit(90.0): py < thickness,
+      wallBit(180.0): px < thickness,
+      wallBit(270.0): py >= tileSize - thickness,
+  }
+  walls = np.zeros((16, tileSize, tileSize), dtype=np.uint8)
+  for mask in range(16):
+    for (bit, edge) in edges.items():
+      if mask & bit:
+        walls[mask][edge] = _WALL
+
+  center = (tileSize-1) / 2
+  beeper = np.where(
+      abs(px - center) + abs(py - center) <= tileSize * 0.3, _BEEPER, _FLOOR
+  ).astype(np.uint8)
+
+  # triangle looking east, rotated counter-clockwise for the other directions
+  margin = max(1, tileSize // 6)
+  east = (px >= margin) & (abs(py - center) <= (tileSize-margin-px) / 2)
+  karel = np.array([np.rot90(east, k) for k in range(len(WALL_ANGLES))])
+  return _Stamps(walls, beeper, karel)
+
+
+def encodePNG(codes: np.ndarray, compression: int = 6) -> bytes:
+  """
+  Encodes color-codes as PNG-image with the colors of SnapshotRenderer.PALETTE.
+  Only zlib is needed, so it is safe to call from any thread or process.
+
+  @param  codes         color-codes as [x, y]
+  @param  compression   zlib-level from 0 (none) to 9 (smallest)
+  @return               PNG-image
+  """
+  (width, height) = codes.shape
+  # every row starts with filter-type 0 (none)
+  rows = np.zeros((height, width + 1), dtype=np.uint8)
+  rows[:, 1:] = codes.T
+  chunks = (
+      (b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+      (b"PLTE", SnapshotRenderer.PALETTE.tobytes()),
+      (b"IDAT", zlib.compress(rows.tobytes(), compression)),
+      (b"IEND", b""),
+  )
+  return _PNG_SIGNATURE + b"".join(
+      struct.pack(">I", len(data)) + tag + data +
+      struct.pack(">I", zlib.crc32(tag + data)) for (tag, data) in chunks
+  )
+
+
+def encodeRGB(codes: np.ndarray) -> bytes:
+  """
+  Encodes color-codes as raw RGB-pixels (rows from top to bottom, 3 bytes per
+  px), e.g. as frame of a raw video-stream.
+
+  @param  codes   color-codes as [x, y]
+  @return         raw RGB-pixels
+  """
+  return SnapshotRenderer.PALETTE.take(codes.T, axis=0).tobytes()
+
+
+def pad(codes: np.ndarray, width: int, height: int) -> np.ndarray:
+  """
+  Centers color-codes in an image of a fixed size, the border gets the color
+  of the floor.
+
+  @param  codes   color-codes as [x, y], at most width x height
+  @param  width   width of the image in px
+  @param  height  height of the image in px
+  @return         color-codes of the image as [x, y]
+  """
+  (x, y) = ((width - codes.shape[0]) // 2, (height - codes.shape[1]) // 2)
+  image = np.full((width, height), _FLOOR, dtype=np.uint8)
+  image[x:x + codes.shape[0], y:y + codes.shape[1]] = codes
+  return image
+
+
+class SnapshotRenderer(metaclass=SingletonMeta):
+  """
+  Renders the published state of a Level (see Level.getSnapshot) to PNG-images
+  for the 'snapshot'-command and the export of replays (see export.py). Only
+  NumPy and zlib are used, so images can be created on the server-thread and
+  without a display, while the main-thread goes on applying commands. The
+  encoded images of the latest state are cached by size, so polling an
+  unchanged World costs nothing.
+
+  @extends  SingletonMeta
+
+  @param  PALETTE   colors of floor, beepers, walls and Karel as [code, rgb]
+  @param  _lock     guards the caches of images and pixel-masks
+  @param  _level    weak reference to the Level of the cached images, so an
+                    unloaded Level is not kept alive by the cache
+  @param  _version  snapshot-version of the cached images
+  @param  _images   base64-encoded PNG-images by (width, height)
+  @param  _stamps   _Stamps by tile-size
+  """
+
+  PALETTE = np.array(
+      [
+          tuple(color)[:3] for color in (
+              Minimap.FLOOR_COLOR, Minimap.BEEPER_COLOR, Minimap.WALL_COLOR,
+              Minimap.KAREL_COLOR
+          )
+      ],
+      dtype=np.uint8
+  )
+
+  _lock: RLock
+  _level: weakref.ref
+  _version: int
+  _images: LRUCache
+  _stamps: LRUCache
+
+  def __init__(self) -> None:
+    self._lock = RLock()
+    self._level = None
+    self._version = None
+    self._images = LRUCache(SNAPSHOT_CACHE_SIZE)
+    self._stamps = LRUCache(SNAPSHOT_CACHE_SIZE)
+
+  def getPNG(self, level: Level, width: int, height: int) -> str:
+    """
+    Returns the latest published state of a Level as PNG-image. The image is
+    the largest one, that fits into width x height and keeps the proportions
+    of the World.
+
+    @param  level   Level to render
+    @param  width   maximum width of the image in px
+    @param  height  maximum height of the image in px
+    @return         base64-encoded PNG-image
+    """
+    for value in (width, height):
+      if isinstance(value, bool) or not isinstance(value, int) or \
+          not 0 < value <= SNAPSHOT_MAX_SIZE:
+        raise InvalidArgumentError(f"snapshot-size {value!r}")
+
+    snapshot = level.getSnapshot()
+    with self._lock:
+      if self._level is None or self._level() is not level or \
+          snapshot.version != self._version:
+        self._level = weakref.ref(level)
+        self._version = snapshot.version
+        self._images.clear()
+      return self._images.getOrCreate(
+          (width, height), lambda: base64.b64encode(
+              encodePNG(self.render(level, snapshot, width, height))
+          ).decode("ascii")
+      )
+
+  @staticmethod
+  def getTileSize(level: Level, width: int, height: int) -> int:
+    """
+    Returns the tile-size, at which a Level fits into an image.
+
+    @param  level   Level to render
+    @param  width   maximum width of the image in px
+    @param  height  maximum height of the image in px
+    @return         tile-size in px, 0 if the World is larger than the image
+    """
+    (rows, columns) = level.world.walls.shape
+    return min(width // columns, height // rows)
+
+  def render(
+      self, level: Level, snapshot: LevelSnapshot, width: int, height: int
+  ) -> np.ndarray:
+    """
+    Renders a state of a Level. Below FLAT_TILE_SIZE every Tile is drawn as a
+    single color like on the Minimap, Tiles are skipped if the World is larger
+    than the image.
+
+    @param  level     Level to render
+    @param  snapshot  state of the Level
+    @param  width     maximum width of the image in px
+    @param  height    maximum height of the image in px
+    @return           color-codes as [x, y], indices into PALETTE
+    """
+    walls = level.world.walls
+    (rows, columns) = walls.shape
+    tileSize = self.getTileSize(level, width, height)
+    if tileSize >= FLAT_TILE_SIZE:
+      return self._rasterize(level, snapshot, tileSize, (0, 0), (columns, rows))
+
+    (kx, ky) = level.world.kcsToGrid(snapshot.karelPosition)
+    codes = np.where(
+        snapshot.beepers > 0, _BEEPER, np.where(walls > 0, _WALL, _FLOOR)
+    ).astype(np.uint8)
+    codes[ky, kx] = _KAREL
+    if tileSize >= 1:
+      codes = codes.repeat(tileSize, axis=0).repeat(tileSize, axis=1)
+    else:
+      scale = min(width / columns, height / rows)
+      outWidth = max(1, int(columns * scale))
+      outHeight = max(1, int(rows * scale))
+      codes = codes[np.arange(outHeight) * rows // outHeight]
+      codes = codes[:, np.arange(outWidth) * columns // outWidth]
+      codes[ky * outHeight // rows, kx * outWidth // columns] = _KAREL
+    return codes.T
+
+  def renderTile(
+      self, codes: np.ndarray, level: Level, snapshot: LevelSnapshot,
+      pos: Tuple[int, int]
+  ) -> None:
+    """
+    Redraws a single Tile of an image, that was rendered at a tile-size of at
+    least FLAT_TILE_SIZE (e.g. the old and new Tile of Karel after a move).
+
+    @param  codes     color-codes of the image as [x, y] (see render)
+    @param  level     rendered Level
+    @param  snapshot  state of the Level
+    @param  pos       grid-cordinate of the Tile
+    """
+    tileSize = codes.shape[0] // level.world.walls.shape[1]
+    (gx, gy) = pos
+    codes[gx * tileSize:(gx+1) * tileSize, gy * tileSize:(gy+1) * tileSize] = \
+        self._rasterize(level, snapshot, tileSize, pos, (gx + 1, gy + 1))
+
+  def _rasterize(
+      self, level: Level, snapshot: LevelSnapshot, tileSize: int,
+      start: Tuple[int, int], end: Tuple[int, int]
+  ) -> np.ndarray:
+    """
+    Rasterizes a region of Tiles from the pixel-masks of the tile-size.
+
+    @param  level     Level to render
+    @param  snapshot  state of the Level
+    @param  tileSize  tile-size in px
+    @param  start     grid-cordinate of the top-left Tile of the region
+    @param  end       grid-cordinate after the bottom-right Tile of the region
+    @return           color-codes of the region as [x, y]
+    """
+    ((x0, y0), (x1, y1)) = (start, end)
+    with self._lock:
+      stamps = self._stamps.getOrCreate(
+          tileSize, lambda: _createStamps(tileSize)
+      )
+    tiles = stamps.walls[level.world.walls[y0:y1, x0:x1]]
+    hasBeepers = snapshot.beepers[y0:y1, x0:x1] > 0
+    tiles[hasBeepers] = np.maximum(tiles[hasBeepers], stamps.beeper)
+
+    (kx, ky) = level.world.kcsToGrid(snapshot.karelPosition)
+    if x0 <= kx < x1 and y0 <= ky < y1:
+      direction = WALL_ANGLES.index(snapshot.karelOrientation.angle % 360)
+      tiles[ky - y0, kx - x0][stamps.karel[direction]] = _KAREL
+
+    # [gy, gx, py, px] -> [x, y]
+    (width, height) = ((x1-x0) * tileSize, (y1-y0) * tileSize)
+    return tiles.transpose(1, 3, 0, 2).reshape(width, height)
@@ -18,7 +18,8 @@
 
 # STL IMPORT
 from collections import OrderedDict
-from typing import Any, Dict
+from threading import Lock
+from typing import Any, Dict, Set
 
 # LIBRARY IMPORT
 import pygame as pg
@@ -29,23 +30,82 @@ from pygame_gui.ui_manager import UIManager
 import assets
 from pyadditions.types import Vector2f, SingletonMeta, classname, promiseList
 from .elements import GLabel
-from constants import WINDOW_CENTER, WINDOW_DIMENSIONS
+from .quality import QualityGovernor
+from constants import DEBUG_REFRESH_RATE, WINDOW_CENTER, WINDOW_DIMENSIONS
 
 
 class DebugInformationDict(metaclass=SingletonMeta):
+  """
+  Stores the information shown in the DebugWindow. Every key has a version,
+  which is incremented, if its value changes. Changed keys are collected in a
+  dirty set, so that the DebugWindow only has to refresh changed labels.
+
+  @extends  SingletonMeta
+
+  @param  _internal   current values
+  @param  _versions   number of changes per key
+  @param  _dirty      keys, that changed since the last call of popDirty
+  @param  _active     True if the information is currently shown
+  @param  _lock       lock for access from multiple threads
+  """
 
   _internal: Dict[str, Any]
+  _versions: Dict[str, int]
+  _dirty: Set[str]
+  _active: bool
+  _lock: Lock
 
   def __init__(self) -> None:
     self._internal = {}
+    self._versions = {}
+    self._dirty = set()
+    self._active = False
+    self._lock = Lock()
 
   def update(self, **kwargs: Dict[str, Any]) -> None:
-    for key, value in kwargs.items():
-      self._internal[str(key)] = value
+    with self._lock:
+      for key, value in kwargs.items():
+        key = str(key)
+        if key in self._internal and self._internal[key] == value:
+          continue
+        self._internal[key] = value
+        self._versions[key] = self._versions.get(key, 0) + 1
+        self._dirty.add(key)
 
   def get(self, key: str) -> Any:
     return self._internal.get(key)
 
+  def getVersion(self, key: str) -> int:
+    """
+    Returns the number of changes of a key.
+
+    @param  key   key of the information
+    @return       version of key, 0 if it was never set
+    """
+    return self._versions.get(key, 0)
+
+  def popDirty(self) -> Set[str]:
+    """
+    Returns all keys, that changed since the last call, and clears them.
+
+    @return   set of changed keys
+    """
+    with self._lock:
+      (dirty, self._dirty) = (self._dirty, set())
+    return dirty
+
+  def isActive(self) -> bool:
+    """
+    Checks if the information is currently shown. Producers of information,
+    that changes every frame, can skip formatting it, while it is not shown.
+
+    @return   True if the information is shown
+    """
+    return self._active
+
+  def setActive(self, active: bool) -> None:
+    self._active = active
+
 
 class ErrorWindow(UIWindow):
 
@@ -75,13 +135,32 @@ class ErrorWindow(UIWindow):
 
 
 class DebugWindow(UIWindow):
+  """
+  Window, that shows the information of the DebugInformationDict. Labels are
+  only refreshed refreshRate times per second (less often on lower render-
+  qualities) and only if their information changed.
+
+  @extends  UIWindow
+
+  @param  labelDict       labels of the information, indexed by key
+  @param  refreshRate     maximum number of refreshes per second
+  @param  _labelPos       position of the next label
+  @param  _sinceRefresh   seconds since the last refresh
+  """
 
   MARGIN = 3
 
   _labelPos: Vector2f
   labelDict: OrderedDict[str, GLabel]
+  refreshRate: float
+  _sinceRefresh: float
 
-  def __init__(self, manager: UIManager, resizable: bool):
+  def __init__(
+      self,
+      manager: UIManager,
+      resizable: bool,
+      refreshRate: float = DEBUG_REFRESH_RATE
+  ):
     super().__init__(
         pg.Rect(0, 0, 0, 0),
         manager,
@@ -91,6 +170,8 @@ class DebugWindow(UIWindow):
     )
     self.labelDict = OrderedDict()
     self._labelPos = Vector2f(self.MARGIN, self.MARGIN)
+    self.refreshRate = refreshRate
+    self._sinceRefresh = 0.0
 
   def process_event(self, event: pg.event.Event) -> bool:
     return super().process_event(event)
@@ -136,11 +217,39 @@ class DebugWindow(UIWindow):
     return self.labelDict[key]
 
   def update(self, timedelta: float) -> None:
-    dinfo = DebugInformationDict()
-    for key in self.labelDict:
-      self.labelDict[key].set_text(str(dinfo.get(key)))
+    # under load the labels are refreshed less often
+    interval = QualityGovernor().quality.debugInterval / self.refreshRate
+    self._sinceRefresh += timedelta
+    if self.visible and self._sinceRefresh >= interval:
+      self._sinceRefresh = 0.0
+      self.refreshLabels()
     super().update(timedelta)
 
+  def refreshLabels(self, all_: bool = False) -> None:
+    """
+    Sets the text of all labels, whose information changed since the last
+    refresh.
+
+    @param  all_  refreshes all labels, if True
+    """
+    dinfo = DebugInformationDict()
+    keys = dinfo.popDirty()
+    if all_:
+      keys = self.labelDict.keys()
+    for key in keys:
+      label = self.labelDict.get(key)
+      if label is not None:
+        label.set_text(str(dinfo.get(key)))
+
+  def show(self) -> None:
+    super().show()
+    DebugInformationDict().setActive(True)
+    self.refreshLabels(all_=True)
+
+  def hide(self) -> None:
+    super().hide()
+    DebugInformationDict().setActive(False)
+
   def toggle(self) -> None:
     if self.visible:
       self.hide()
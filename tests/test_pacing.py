@@ -0,0 +1,103 @@
+################################################################################
+# karel_the_robot_python3_backend                                              #
+# Copyright (C) 2021  Hendrik Boeck <hendrikboeck.dev@protonmail.com>          #
+#                                                                              #
+# This program is free software: you can redistribute it and/or modify         #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# This program is distributed in the hope that it will be useful,              #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.        #
+################################################################################
+
+# LIBRARY IMPORT
+import pytest
+
+# LOCAL IMPORT
+from constants import INFINITY, PACING_MAX_LAG, PACING_MAX_RATE, PACING_MIN_RATE
+from pacing import PacingScheduler, VirtualClock
+
+RATES = [PACING_MIN_RATE, 1.0, 15.0, 144.0, 1000.0, PACING_MAX_RATE]
+
+
+def applyActions(scheduler: PacingScheduler, count: int) -> list:
+  """
+  Applies Karel-Actions as fast as the scheduler allows.
+
+  @param  scheduler   scheduler with a VirtualClock
+  @param  count       number of actions
+  @return             virtual times, at which the actions were applied
+  """
+  times = []
+  for _ in range(count):
+    assert scheduler.getWaitTime() == 0
+    times.append(scheduler.clock.now())
+    scheduler.consume()
+  return times
+
+
+def countImmediateActions(scheduler: PacingScheduler) -> int:
+  """
+  Counts the Karel-Actions, that are applied before the clock has to advance.
+
+  @param  scheduler   scheduler with a VirtualClock
+  @return             number of actions
+  """
+  start = scheduler.clock.now()
+  count = 0
+  while scheduler.getWaitTime() == 0 and scheduler.clock.now() == start:
+    scheduler.consume()
+    count += 1
+  return count
+
+
+@pytest.mark.parametrize("rate", RATES)
+def testExactIntervals(rate: float) -> None:
+  scheduler = PacingScheduler(VirtualClock())
+  scheduler.setRate(rate)
+  times = applyActions(scheduler, 200)
+
+  assert times[0] == 0
+  for (before, after) in zip(times, times[1:]):
+    assert after - before == pytest.approx(1 / rate)
+  assert times[-1] == pytest.approx(199 / rate)
+
+
+@pytest.mark.parametrize(
+    ("rate", "expected"), [(0.0, PACING_MIN_RATE), (1e6, PACING_MAX_RATE)]
+)
+def testRateIsClamped(rate: float, expected: float) -> None:
+  scheduler = PacingScheduler(VirtualClock())
+  scheduler.setRate(rate)
+  assert scheduler.rate == expected
+
+
+def testInfinityBypassesPacing() -> None:
+  scheduler = PacingScheduler(VirtualClock())
+  scheduler.setRate(INFINITY)
+  times = applyActions(scheduler, 10000)
+
+  assert scheduler.rate == INFINITY
+  assert set(times) == {0}
+
+
+@pytest.mark.parametrize("rate", RATES)
+def testCapacityAfterIdling(rate: float) -> None:
+  clock = VirtualClock()
+  scheduler = PacingScheduler(clock)
+  scheduler.setRate(rate)
+  applyActions(scheduler, 3)
+
+  # idling longer than PACING_MAX_LAG does not collect more tokens
+  clock.skip(100*PACING_MAX_LAG + 10/rate)
+  assert countImmediateActions(scheduler) == int(max(1, rate * PACING_MAX_LAG))
+
+  # afterwards the actions are paced again
+  (before, after) = applyActions(scheduler, 2)
+  assert after - before == pytest.approx(1 / rate)